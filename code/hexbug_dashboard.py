@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# hexbug_dashboard.py
+# Dashboard with a compact panel for each robotling that publishes to
+# the broker
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# The messages of all robots are received with one wildcard subscription
+# (see `hexbug_fleet.py`). A panel (`WidgetRobotPanel`: state, battery,
+# distance sensors, thermal camera thumbnail) is added for each robot
+# when its first message arrives, until the grid is full. Panels of
+# robots that did not send a message for `PANEL_TIMEOUT_S` seconds are
+# shown as inactive. All panels share fonts, text cache, palette, cone
+# geometry and static layer, and only changed panels are redrawn.
+#
+# For instance, for up to 12 robots in 3 columns:
+#   python .\hexbug_dashboard.py -n 12 -c 3
+# To replay a recorded session of several robots (e.g. at 4x speed):
+#   python .\hexbug_dashboard.py --replay .\logs\fleet1 -s 4
+#
+# ---------------------------------------------------------------------
+import time
+import math
+import threading
+import modules.front_pygame as front
+import modules.mqtt_ingest as ingest
+import modules.frame_pacer as fp
+import modules.render_profile as rp
+import hexbug_mqtt as hx
+from hexbug_fleet import HexBugFleet
+
+WIN_POSITION      = (0, 0)
+WIN_NAME          = "robotling_dashboard"
+WIN_ICON          = "robotling.png"
+
+DASH_ROBOTS       = 12     # Maximal number of panels ...
+DASH_COLUMNS      = 3      # ... and number of columns
+PANEL_TIMEOUT_S   = 3.0    # Panel is inactive if no message for that long
+
+GUI_FPS_MAX       = 30
+LOOP_WAIT_MS      = 250
+
+# ---------------------------------------------------------------------
+class Dashboard(object):
+
+  def __init__(self, nRobots=DASH_ROBOTS, nCols=DASH_COLUMNS,
+               isHeadless=False, fpsMax=GUI_FPS_MAX):
+    """ Initialize window with a grid for `nRobots` panels
+    """
+    self.nRobots = max(nRobots, 1)
+    self.nCols = min(max(nCols, 1), self.nRobots)
+    nRows = int(math.ceil(self.nRobots /self.nCols))
+    self.Win = front.Window(WIN_POSITION, (self.nCols, nRows), WIN_NAME,
+                            WIN_ICON, isHeadless=isHeadless)
+
+    # One wake-up event for all robots, which is set when a message of any
+    # robot was decoded
+    self.evNewFrame = threading.Event()
+    self.Pacer = fp.FramePacer(fpsMax, LOOP_WAIT_MS /1000., self.evNewFrame)
+    self.Prof = rp.RenderProfiler()
+    self.Win.Profiler = self.Prof
+
+    # Robots; a `HexBug` object is created by the fleet for each new GUID
+    self.Fleet = HexBugFleet(fNewRobot=self.newRobot, isVerbose=False)
+    self.Panels = dict()
+    self._tLast = dict()
+    self.nIgnored = 0
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def newRobot(self, guid):
+    """ Returns a `HexBug` object for a new robot (called by the fleet in
+        the thread that received the robot's first message)
+    """
+    robot = hx.HexBug(isVerbose=False)
+    robot.evNewFrame = self.evNewFrame
+
+    # The keys are registered in the same order for all robots, hence the
+    # slot indices are the same
+    self.kState  = robot.registerKey(hx.KEY_STATE)
+    self.kBatt   = robot.registerKey("power/battery_V")
+    self.kDist   = robot.registerKey("sensor/distance_cm")
+    self.kImage  = robot.registerKey("camera_IR/image")
+    self.kSize   = robot.registerKey("camera_IR/size")
+    self.kImgOk  = robot.registerKey("camera_IR/" +hx.KEY_IMG_VALID)
+    return robot
+
+  def addPanel(self, member):
+    """ Add a panel for a fleet member in the next free grid cell
+    """
+    i = len(self.Panels)
+    if i >= self.nRobots:
+      self.nIgnored += 1
+      print("No space left for robotling `{0}`".format(member.guid))
+      self.Panels[member.guid] = None
+      return
+    pos = ((i %self.nCols) *front.WG_STATUS_WIDTH,
+           (i //self.nCols) *front.WG_STATUS_HEIGHT)
+    panel = front.WidgetRobotPanel(self.Win, pos)
+    panel.setLabels(member.guid)
+    panel.setValProperties((hx.LIPO_MIN_V, hx.LIPO_MAX_V),
+                           (hx.LIPO_MAX_V *0.7, hx.LIPO_MIN_V),
+                           (hx.DIST_OBST_CM, hx.DIST_CLIFF_CM),
+                           hx.IR_SCAN_POS_DEG, hx.IR_SCAN_CONE_DEG, (18, 37))
+    panel.draw()
+    self.Panels[member.guid] = panel
+    self._tLast[member.guid] = time.time()
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def run(self):
+    """ Run main loop
+    """
+    while(True):
+      # Wait for new messages (or the timeout) and update panels
+      self.Pacer.wait()
+      t0 = self.Prof.tic()
+      self.update()
+      self.Win.update()
+      self.Pacer.done()
+      self.Win.setCaption(self.Pacer.getStatsStr())
+      self.Prof.toc("frame", t0)
+
+      # Check if user wants to quit (or if a headless replay is done)
+      if self.Win.doQuit() or self.isDone():
+        return
+
+  def isDone(self):
+    """ Returns True if the dashboard is headless and all replayed
+        messages have been shown
+    """
+    return (self.Win.isHeadless and getattr(Ingest, "isDone", False) and
+            sum([len(m.robot.Queue) for m in self.Fleet.members]) == 0)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def update(self):
+    """ Update the panels of robots with new messages
+    """
+    members = self.Fleet.members
+    if len(members) > len(self.Panels):
+      for m in members:
+        if m.guid not in self.Panels:
+          self.addPanel(m)
+
+    t = time.time()
+    for m in members:
+      panel = self.Panels.get(m.guid)
+      if panel is None:
+        continue
+      robot = m.robot
+      if len(robot.processMQTTMsgs()) > 0:
+        self._tLast[m.guid] = t
+        d = robot.getData(self.kState)
+        state = hx.RStateStr.get(d, "n/a") if d is not None else "n/a"
+        panel.update(state, robot.getData(self.kBatt),
+                     robot.getData(self.kDist),
+                     robot.getData(self.kImage), robot.getData(self.kSize),
+                     robot.getData(self.kImgOk) is not False,
+                     "{0:.1f} Hz".format(robot.freqMsg))
+      panel.isActive = t -self._tLast[m.guid] < PANEL_TIMEOUT_S
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def kill(self):
+    """ Destroy window
+    """
+    self.Win.close()
+
+# ---------------------------------------------------------------------
+def parseCmdLn():
+  from argparse import ArgumentParser
+  parser = ArgumentParser()
+  parser.add_argument('-n', '--robots', type=int, default=DASH_ROBOTS)
+  parser.add_argument('-c', '--columns', type=int, default=DASH_COLUMNS)
+  parser.add_argument('--replay', type=str, default="")
+  parser.add_argument('-s', '--speed', type=float, default=1.0)
+  parser.add_argument('--fps', type=float, default=GUI_FPS_MAX)
+  parser.add_argument('--headless', action="store_true")
+  return parser.parse_args()
+
+# ---------------------------------------------------------------------
+if __name__ == '__main__':
+
+  # Check for command line parameter(s)
+  args = parseCmdLn()
+  Dash = Dashboard(args.robots, args.columns, args.headless, args.fps)
+
+  if len(args.replay) > 0:
+    # Replay recorded session of one or more robots
+    from hexbug_replay import TelemetryReplay
+    Ingest = TelemetryReplay(args.replay, Dash.Fleet, args.speed)
+    Ingest.start()
+  else:
+    try:
+      import robotling.NETWORK as nw
+      MQTT_BROKER     = nw.my_mqtt_srv
+      MQTT_PORT       = nw.my_mqtt_port
+      MQTT_ALIVE_S    = nw.my_mqtt_alive_s
+    except:
+      print("Error retrieving broker info from `robotling.NETWORK.py` ...")
+      exit()
+
+    # Create ingest core and subscribe to the messages of all robots
+    Ingest = ingest.IngestCore(
+      ingest.PahoTransport(MQTT_BROKER, MQTT_PORT, MQTT_ALIVE_S))
+    Dash.Fleet.attach(Ingest)
+    Ingest.runInThread()
+
+  try:
+    Dash.run()
+  except KeyboardInterrupt:
+    pass
+
+  # Clean up
+  Dash.kill()
+  print("Dashboard: " +Dash.Pacer.getStatsStr(True))
+  print("Dashboard: " +" | ".join(Dash.Prof.getLines(4)))
+  Ingest.stop()
+  if len(args.replay) > 0:
+    print(Ingest.getStatsStr())
+  else:
+    Ingest.join(2.0)
+  Dash.Fleet.stop()
+  print(Dash.Fleet.getStatsStr())
+  print("... done.")
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# hexbug_fleet.py
+# Receives the telemetry of all robotlings that publish to a broker
+# using one connection and a wildcard subscription ("+/raw")
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, optional recording of the messages of all robots
+# 2026-10-17, decoding errors in the workers are counted per robot
+#
+# A `HexBug` object is created for each robotling (GUID) when its first
+# message arrives. As long as only a few robots are seen, the messages
+# are decoded in the ingest thread; once `nShardMin` robots are known,
+# they are handed to a pool of worker threads. Each robot is assigned to
+# one worker, so that its messages stay in order.
+#
+# The workers do not increase the decoding throughput (only one thread
+# runs Python code at a time); they keep the ingest thread free to read
+# from the broker and limit the delay caused by a robot with expensive
+# messages (or a slow `fOnFrame`) to the robots of the same worker.
+#
+# Counters: a robot's `HexBug` object is only updated by one thread at a
+# time (the ingest thread or the robot's worker) and `FleetMember.nDropped`
+# only by the thread that dispatches the messages. Messages a worker fails
+# to process are counted in `FleetMember.nErrors` (failures in the ingest
+# thread are counted by the `IngestCore`). `fOnFrame` is called from all
+# workers; state it shares between robots must be locked (see e.g. `Relay`
+# in `hexbug_relay.py`).
+#
+# Run as script to print per-robot statistics (and, optionally, to record
+# all messages into a telemetry log in a new directory), e.g.:
+#   python .\hexbug_fleet.py -r .\logs\fleet1
+#
+# ---------------------------------------------------------------------
+import time
+import queue
+import threading
+import hexbug_mqtt as hx
+import modules.mqtt_ingest as ingest
+import modules.telemetry_log as tlog
+
+FLEET_TOPIC       = "+/raw"
+FLEET_WORKERS     = 4     # Number of worker threads
+FLEET_SHARD_MIN   = 3     # Shard decoding if at least that many robots
+WORKER_QUEUE_LEN  = 256   # Capacity of each worker's message queue
+
+STATS_INTERVAL_S  = 2.0
+
+# ---------------------------------------------------------------------
+class FleetMember(object):
+  """A robotling of the fleet"""
+  __slots__ = ("guid", "robot", "shard", "nDropped", "nErrors")
+
+  def __init__(self, guid, robot, shard):
+    self.guid = guid
+    self.robot = robot
+    self.shard = shard
+    self.nDropped = 0
+    self.nErrors = 0
+
+  def getStatsStr(self):
+    """ Return rate and losses of this robot as a one-line string
+    """
+    r = self.robot
+    return ("{0}: {1} @ {2:.1f} Hz, {3} corrupt, {4} dropped, {5} errors"
+            .format(self.guid, r.nMsg, r.freqMsg, r.nMsgCorrupt,
+                    self.nDropped +r.Queue.nDropped, self.nErrors))
+
+# ---------------------------------------------------------------------
+class HexBugFleet(object):
+  """Per-robot `HexBug` objects fed from one wildcard subscription"""
+
+  def __init__(self, fNewRobot=None, fOnFrame=None,
+               nWorkers=FLEET_WORKERS, nShardMin=FLEET_SHARD_MIN,
+               nQueue=WORKER_QUEUE_LEN, recorder=None, isVerbose=True):
+    """ `fNewRobot(guid)` returns a new `HexBug` object (e.g. with
+        registered keys); `fOnFrame(member, frame)` is called for each
+        decoded message in the thread that decoded it (i.e. it must be
+        thread-safe). If a `TelemetryRecorder` is given, it is attached to
+        all robots
+    """
+    self._fNewRobot = fNewRobot
+    self._fOnFrame = fOnFrame
+    self._nWorkers = max(nWorkers, 0)
+    self._nShardMin = nShardMin
+    self._nQueue = nQueue
+    self._isVerbose = isVerbose
+    self.Recorder = recorder
+    self._members = dict()
+    self._queues = []
+    self._workers = []
+    self._Lock = threading.Lock()
+    self.nMsg = 0
+
+  def attach(self, core, topic=FLEET_TOPIC):
+    """ Subscribe to `topic` at the `IngestCore` and process its messages
+    """
+    return core.addHandler(topic, self.setNewMQTTMsg)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getMember(self, guid):
+    """ Returns the fleet member for `guid`; creates it, if needed
+    """
+    m = self._members.get(guid)
+    if m is None:
+      with self._Lock:
+        m = self._members.get(guid)
+        if m is None:
+          if self._fNewRobot:
+            robot = self._fNewRobot(guid)
+          else:
+            robot = hx.HexBug(isVerbose=False)
+          if self.Recorder is not None:
+            robot.attachRecorder(self.Recorder)
+          shard = len(self._members) % self._nWorkers if self._nWorkers else 0
+          m = FleetMember(guid, robot, shard)
+          self._members[guid] = m
+          if self._isVerbose:
+            print("New robotling `{0}`".format(guid))
+    return m
+
+  def setNewMQTTMsg(self, msg):
+    """ Pass a message (topic "<GUID>/raw") to the respective robot
+    """
+    self.nMsg += 1
+    m = self.getMember(msg.topic.split("/", 1)[0])
+    if self._nWorkers == 0 or len(self._members) < self._nShardMin:
+      self._process(m, msg)
+      return
+    if len(self._workers) == 0:
+      self._startWorkers()
+    try:
+      self._queues[m.shard].put_nowait((m, msg))
+    except queue.Full:
+      m.nDropped += 1
+
+  def _process(self, m, msg):
+    frame = m.robot.setNewMQTTMsg(msg)
+    if frame is not None and self._fOnFrame:
+      self._fOnFrame(m, frame)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _startWorkers(self):
+    if self._isVerbose:
+      print("Decoding with {0} workers ...".format(self._nWorkers))
+    for i in range(self._nWorkers):
+      q = queue.Queue(self._nQueue)
+      w = threading.Thread(target=self._work, args=(q,), daemon=True)
+      self._queues.append(q)
+      self._workers.append(w)
+      w.start()
+
+  def _work(self, q):
+    while True:
+      item = q.get()
+      if item is None:
+        return
+      m = item[0]
+      try:
+        self._process(*item)
+      except Exception as e:
+        # Report only the first failure of a robot; all are counted
+        if m.nErrors == 0 and self._isVerbose:
+          print("ERROR: Decoding message from `{0}` failed ({1})"
+                .format(m.guid, e))
+        m.nErrors += 1
+
+  def stop(self):
+    """ Stop the worker threads (if running)
+    """
+    for q in self._queues:
+      q.put(None)
+    for w in self._workers:
+      w.join()
+    self._queues = []
+    self._workers = []
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  @property
+  def members(self):
+    return list(self._members.values())
+
+  @property
+  def nDropped(self):
+    """ Number of messages dropped by the workers' or the robots' queues
+    """
+    return sum([m.nDropped +m.robot.Queue.nDropped for m in self.members])
+
+  @property
+  def nErrors(self):
+    """ Number of messages the workers failed to process
+    """
+    return sum([m.nErrors for m in self.members])
+
+  @property
+  def nWorkersActive(self):
+    return len(self._workers)
+
+  def __len__(self):
+    return len(self._members)
+
+  def getStatsStr(self):
+    """ Return statistics (one line per robot) as a string
+    """
+    s = "{0} robot(s), {1} message(s), {2} worker(s)".format(
+      len(self._members), self.nMsg, len(self._workers))
+    for m in sorted(self.members, key=lambda m: m.guid):
+      s += "\n  " +m.getStatsStr()
+    return s
+
+# ---------------------------------------------------------------------
+def parseCmdLn():
+  from argparse import ArgumentParser
+  parser = ArgumentParser()
+  parser.add_argument('-r', '--record', type=str, default="")
+  return parser.parse_args()
+
+# ---------------------------------------------------------------------
+if __name__ == '__main__':
+
+  try:
+    import robotling.NETWORK as nw
+    MQTT_BROKER     = nw.my_mqtt_srv
+    MQTT_PORT       = nw.my_mqtt_port
+    MQTT_ALIVE_S    = nw.my_mqtt_alive_s
+  except:
+    print("Error retrieving broker info from `robotling.NETWORK.py` ...")
+    exit()
+
+  # Check for command line parameter(s)
+  args = parseCmdLn()
+  Recorder = None
+  if len(args.record) > 0:
+    try:
+      Recorder = tlog.TelemetryRecorder(args.record).start()
+    except FileExistsError:
+      print("Cannot record into `{0}` (not empty)".format(args.record))
+      exit()
+
+  # Create ingest core and fleet, and start receiving
+  Core = ingest.IngestCore(
+    ingest.PahoTransport(MQTT_BROKER, MQTT_PORT, MQTT_ALIVE_S))
+  Fleet = HexBugFleet(recorder=Recorder)
+  Fleet.attach(Core)
+  Core.runInThread()
+
+  try:
+    while True:
+      time.sleep(STATS_INTERVAL_S)
+      for m in Fleet.members:
+        m.robot.processMQTTMsgs()
+      print(Fleet.getStatsStr())
+      if Recorder:
+        print(Recorder.getStatsStr())
+
+  except KeyboardInterrupt:
+    print("User aborted loop")
+
+  # Stop ingest core and workers
+  print("Stopping ingest core ...")
+  Core.stop()
+  Core.join(2.0)
+  Fleet.stop()
+  if Recorder:
+    Recorder.stop()
+  print("... done.")
+
+# ---------------------------------------------------------------------
@@ -7,6 +7,28 @@
 # The MIT License (MIT)
 # Copyright (c) 2018-2019 Thomas Euler
 # 2019-05-06, v1
+# 2026-10-17, all queued messages are processed in each round, so that
+#             time series (motor load, light, battery) have no gaps
+# 2026-10-17, telemetry keys are registered once and read from slots
+# 2026-10-17, time series shared by all widgets in a `TelemetryStore`
+# 2026-10-17, messages are received via the asyncio ingest core
+# 2026-10-17, optionally, all messages are recorded (--record or -r)
+# 2026-10-17, recorded sessions can be replayed instead of connecting to
+#             a broker (--replay and --speed)
+# 2026-10-17, the GUI is redrawn at most `GUI_FPS_MAX` times per second,
+#             when new messages were decoded or after `LOOP_WAIT_MS`;
+#             plots and camera are updated less often if frames take
+#             longer than their budget (`FramePacer`); frame rate and
+#             CPU use are shown in the window title
+# 2026-10-17, headless mode without a window (--headless); the window
+#             content can be exported as PNG snapshots (--png) or as a
+#             raw video stream (--raw) at a fixed rate (--export-fps);
+#             when exporting, a replay passes the next message only after
+#             the previous one has been rendered and exported
+# 2026-10-17, widget updates and drawing, telemetry decoding and display
+#             updates are timed (`RenderProfiler`); key `P` toggles an
+#             overlay with the percentiles, key `C` (and --profile) saves
+#             them as a CSV file
 #
 # The GUID of the hexbug to connect to must be passed as argument:
 #   --guid or -g
@@ -17,18 +39,33 @@
 # with:
 #   robotling_b4e62da1dccd - blue hexbug
 #   robotling_30aea413e508 - orange hexbug
+# To record the session into a telemetry log, pass a new (or empty) directory:
+#   python .\hexbug_gui.py -g robotling_b4e62da1dccd -r .\logs\session1
+# To replay a recorded session (e.g. at 4x speed; 0 = as fast as possible):
+#   python .\hexbug_gui.py -g robotling_b4e62da1dccd --replay .\logs\session1
+#          -s 4
+# To render a replayed session without a window into a raw video stream
+# (see `modules/frame_export.py`), as fast as possible (with --png or --raw,
+# each replayed message is rendered, hence no message is dropped):
+#   python ./hexbug_gui.py -g robotling_b4e62da1dccd --replay ./logs/session1
+#          -s 0 --fps 0 --headless --raw session.raw
 #
 # ---------------------------------------------------------------------
 import sys
 #sys.path.append("..")
 
 import time
+import threading
 import numpy as np
+import pygame
 import modules.front_pygame as front
-import paho.mqtt.client as mqtt
-import json
-import threading
 import modules.data_buffer as db
+import modules.mqtt_ingest as ingest
+import modules.telemetry_log as tlog
+import modules.telemetry_store as ts
+import modules.frame_pacer as fp
+import modules.frame_export as fe
+import modules.render_profile as rp
 import hexbug_mqtt as hx
 
 WIN_SIZE          = (2, 6) # in standard widget sizes
@@ -38,7 +75,12 @@ WIN_NAME          = "robotling_front_end"
 WIN_ICON          = "robotling.png"
 WIN_FLAGS         = 0
 
-LOOP_WAIT_MS      = 10
+GUI_FPS_MAX       = 30
+LOOP_WAIT_MS      = 250    # Redraw at least this often (link statistics)
+
+PROF_CSV          = "gui_profile.csv"
+PROF_OVERLAY_S    = 0.5    # Interval for updating the profiling overlay
+PROF_OVERLAY_N    = 16     # Number of sections shown in the overlay
 MQTT_ROOT_TOPIC   = ""
 
 try:
@@ -53,11 +95,53 @@ except:
 # ---------------------------------------------------------------------
 class FrontEndGUI(object):
 
-  def __init__(self):
-    """ Initialize GUI window
+  def __init__(self, isHeadless=False, fpsMax=GUI_FPS_MAX):
+    """ Initialize GUI window (or, if `isHeadless`, an off-screen surface);
+        `fpsMax` = 0 does not limit the frame rate
     """
     # Create window
-    self.Win = front.Window(WIN_POSITION, WIN_SIZE, WIN_NAME, WIN_ICON)
+    self.Win = front.Window(WIN_POSITION, WIN_SIZE, WIN_NAME, WIN_ICON,
+                            isHeadless=isHeadless)
+
+    # Render scheduler; it is woken up when a new message was decoded
+    self.Pacer = fp.FramePacer(fpsMax, LOOP_WAIT_MS /1000., Robot.evNewFrame)
+    self._isPending = False
+
+    # Optional export of the window content (`FrameExporter`); if set,
+    # `evFrameDone` is set after each frame was rendered and exported
+    self.Export = None
+    self.evFrameDone = None
+
+    # Register the telemetry values shown in the widgets; these are then
+    # extracted already when a message is decoded
+    self.kTime   = Robot.registerKey(hx.KEY_TIMESTAMP)
+    self.kDebug  = Robot.registerKey(hx.KEY_DEBUG)
+    self.kState  = Robot.registerKey(hx.KEY_STATE)
+    self.kBatt   = Robot.registerKey("power/battery_V")
+    self.kHead   = Robot.registerKey("sensor/compass/heading_deg")
+    self.kPitch  = Robot.registerKey("sensor/compass/pitch_deg")
+    self.kRoll   = Robot.registerKey("sensor/compass/roll_deg")
+    self.kDist   = Robot.registerKey("sensor/distance_cm")
+    self.kLoad   = Robot.registerKey("power/motor_load")
+    self.kLight  = Robot.registerKey("sensor/photodiode/intensity")
+    self.kImage  = Robot.registerKey("camera_IR/image")
+    self.kSize   = Robot.registerKey("camera_IR/size")
+    self.kBlobs  = Robot.registerKey("camera_IR/blobs")
+    self.kImgOk  = Robot.registerKey("camera_IR/" +hx.KEY_IMG_VALID)
+
+    # One store for all time series shown in the widgets; it is filled when
+    # a message is decoded and the widgets plot views into it
+    self.Store = ts.TelemetryStore(hx.LOAD_ARR_LEN)
+    self.Store.addField("time_s")
+    self.Store.addField("battery_V", initVal=hx.LIPO_MIN_V)
+    self.Store.addField("motor_load", 2)
+    self.Store.addField("intensity", 2)
+    Robot.attachStore(self.Store, {
+        "time_s": hx.KEY_TIMESTAMP,
+        "battery_V": "power/battery_V",
+        "motor_load": "power/motor_load",
+        "intensity": "sensor/photodiode/intensity"
+      })
 
     # Initialize
     rgV1   = [0., hx.V_MAX]
@@ -80,9 +164,6 @@ class FrontEndGUI(object):
       else:
         return front.IS_OK
 
-    # Array for timestamps
-    self.timeData = db.DataStack(hx.LOAD_ARR_LEN, 0)
-
     # Define widgets
     #
     # Connection to MQTT broker
@@ -162,7 +243,6 @@ class FrontEndGUI(object):
                          sFormat, 1)
     wV = hx.LIPO_MAX_V *0.7
     dV = hx.LIPO_MIN_V
-    self.Batt1Filter = db.DataStack(30, hx.LIPO_MIN_V)
     self.Batt1.addValProperties("voltage", "V", rgV1, [wV, dV], fLower)
     self.Batt1.addValProperties("charge", "%", rgPerc, [60., 20.], fLower)
     self.Batt1.draw()
@@ -172,8 +252,6 @@ class FrontEndGUI(object):
     y1  = 0
     tf1 = "{0}"
     rgLoad = [-50, hx.LOAD_MAX]
-    self.LoadTData = db.DataStack(hx.LOAD_ARR_LEN, 0)
-    self.LoadWData = db.DataStack(hx.LOAD_ARR_LEN, 0)
     self.PlotLoad = front.WidgetPlot(self.Win, (x1, y1), (1,1))
     self.PlotLoad.setLabels("Sensors", "Motor load")
     self.PlotLoad.addValProperties("M(walk)", "-", rgLoad, rgLoad, fRange,
@@ -186,8 +264,6 @@ class FrontEndGUI(object):
     x1  = self.Link.width
     y1  = self.PlotLoad.height
     tf1 = "{0}"
-    self.LightLData = db.DataStack(hx.LOAD_ARR_LEN, 0)
-    self.LightRData = db.DataStack(hx.LOAD_ARR_LEN, 0)
     self.PlotLight = front.WidgetPlot(self.Win, (x1, y1), (1,1))
     self.PlotLight.setLabels("Sensors", "Photodiode (intensity)")
     self.PlotLight.addValProperties("L", "-", rgInt, rgInt, fRange,
@@ -203,8 +279,18 @@ class FrontEndGUI(object):
     self.CameraIR.setLabels("Sensors", "8x8 thermal camera")
     self.CameraIR.setValProperties("temp.", "°C", (18, 37), (16,16), True)
     self.CameraIR.draw()
-    self.icr_nFr = 0
-    self.icr_Frames = np.zeros((100,8,8), dtype=np.uint8)
+
+    # Profiling of widget updates/drawing, decoding and display updates; the
+    # overlay covers the left column
+    self.Prof = rp.RenderProfiler()
+    self.Win.Profiler = self.Prof
+    self.Overlay = front.TextOverlay(self.Win,
+                                     (front.WG_FR_BD_X, front.WG_FR_BD_Y),
+                                     self.Link.width -front.WG_FR_BD_X)
+    self.isOverlay = False
+    self.fNameCSV = PROF_CSV
+    self._tOverlay = 0
+    self.Win.onEvent = self.onEvent
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def run(self):
@@ -213,42 +299,101 @@ class FrontEndGUI(object):
     global dtGUIUpdate_s, roundGUI
 
     while(True):
-      # Update GUI
+      # Wait for new messages (or the timeout) and update GUI
+      self.Pacer.wait()
       t0 = time.time()
       self.update()
+      if self.isOverlay:
+        self.drawOverlay()
       self.Win.update()
+      self.Pacer.done()
+      self.Win.setCaption(self.Pacer.getStatsStr())
       dtGUIUpdate_s = time.time() -t0
+      self.Prof.add("frame", dtGUIUpdate_s *1000)
       roundGUI += 1
 
-      # Check if user wants to quit
-      if self.Win.doQuit():
+      if self.Export is not None:
+        # Export with the robot's time of the latest message as session time
+        t = Robot.getData(self.kTime)
+        self.Export.tick(t if t is not None else time.time())
+      if self.evFrameDone is not None:
+        # Let the replay pass the next message
+        self.evFrameDone.set()
+
+      # Check if user wants to quit (or if a headless replay is done)
+      if self.Win.doQuit() or self.isDone():
         return
 
+  def onEvent(self, event):
+    """ Handle keys: `P` toggles the profiling overlay, `C` saves the
+        profiling data
+    """
+    if event.type != pygame.KEYDOWN:
+      return
+    if event.key == pygame.K_p:
+      self.isOverlay = not self.isOverlay
+      self._tOverlay = 0
+      if not self.isOverlay:
+        self.Win.redrawAll()
+    elif event.key == pygame.K_c:
+      print("Profiling data saved to `{0}`".format(
+            self.Prof.saveCSV(self.fNameCSV)))
+
+  def drawOverlay(self):
+    """ Draw profiling overlay; its content is updated every
+        `PROF_OVERLAY_S` seconds
+    """
+    if time.time() -self._tOverlay > PROF_OVERLAY_S:
+      self._tOverlay = time.time()
+      lines = ["Round {0}, last frame {1:.1f} ms".format(
+                roundGUI, dtGUIUpdate_s *1000),
+               self.Pacer.getStatsStr()]
+      self.Overlay.setLines(lines +self.Prof.getLines(PROF_OVERLAY_N))
+    self.Overlay.draw()
+
+  def updateWidget(self, wg, *args):
+    """ Update widget `wg` (including drawing) and time it
+    """
+    t0 = self.Prof.tic()
+    wg.update(*args)
+    self.Prof.toc(wg.txtID +".update", t0)
+
+  def isDone(self):
+    """ Returns True if the GUI is headless and all replayed messages have
+        been shown
+    """
+    return (self.Win.isHeadless and getattr(Ingest, "isDone", False) and
+            len(Robot.Queue) == 0 and not self._isPending)
+
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self):
     """ Update GUI
     """
-    global isConnected, Client, Robot
-
-    if not isConnected:
-      # Try to connect to broker and start loop thread ...
-      try:
-        Client.connect(MQTT_BROKER, port=MQTT_PORT, keepalive=MQTT_ALIVE_S)
-        Client.loop_start()
-        isConnected = True
-      except ConnectionRefusedError:
-        self.Link.update(["n/a", "n/a", Robot.getStatsStr()])
-        return
+    global Ingest, Robot
+
+    if not Ingest.isConnected:
+      # The ingest core (re)connects to the broker in its own thread ...
+      self.updateWidget(self.Link, ["n/a", "n/a", Robot.getStatsStr(True)])
+      return
 
     # Is connected ...
-    self.Link.update([MQTT_BROKER, MQTT_ROOT_TOPIC, Robot.getStatsStr()])
-    if Robot.processLatestMQTTMsg():
-      # New message received and successfully converted
+    self.updateWidget(self.Link, [SourceName, MQTT_ROOT_TOPIC,
+                                  Robot.getStatsStr(True)])
+    t0 = self.Prof.tic()
+    frames = Robot.processMQTTMsgs()
+    self.Prof.toc("telemetry.process", t0)
+    for f in frames:
+      # Decoded in the thread that receives the messages
+      self.Prof.add("telemetry.decode", f.dtDecode *1000)
+    if len(frames) > 0:
+      # New message(s) received and successfully converted; time series are
+      # taken from the store (which contains all messages), the other
+      # widgets are updated with the latest message
       #
-      # Robot(ling) status and timestamp
-      d = Robot.getData("debug")
+      # Robot(ling) status
+      d = Robot.getData(self.kDebug)
       sDebug = str(d) if d is not None else "n/a"
-      d = Robot.getData("state")
+      d = Robot.getData(self.kState)
       sState = hx.RStateStr[d] if d is not None else "n/a"
       if d is None:
         # No status published, it is likely that the rrobot's software
@@ -256,34 +401,30 @@ class FrontEndGUI(object):
         print("ERROR: Last message from robot: -----")
         print(sDebug +"-------------------------------------")
         sDebug = "ERROR (see history)"
-      self.State.update([sState, sDebug])
-      data = Robot.getData(hx.KEY_TIMESTAMP)
-      if data is not None:
-        self.timeData.shift(data)
+      self.updateWidget(self.State, [sState, sDebug])
 
       # Main battery
-      data = Robot.getData("power/battery_V")
+      data = Robot.getData(self.kBatt)
       self.Batt1.isActive = not data is None
       if self.Batt1.isActive:
-        self.Batt1Filter.shift(data)
-        V = self.Batt1Filter.mean(25)
+        V = self.Store.mean("battery_V", 25)
         C = (V -hx.LIPO_MIN_V)/(hx.LIPO_MAX_V -hx.LIPO_MIN_V) *100
-        self.Batt1.update([V, C])
+        self.updateWidget(self.Batt1, [V, C])
         self.Batt1.txtInfo = "n/a"
 
       # Compass
-      h = Robot.getData("sensor/compass/heading_deg")
-      p = Robot.getData("sensor/compass/pitch_deg")
-      r = Robot.getData("sensor/compass/roll_deg")
+      h = Robot.getData(self.kHead)
+      p = Robot.getData(self.kPitch)
+      r = Robot.getData(self.kRoll)
       self.Compass.isActive = not h is None
       if self.Compass.isActive:
-        self.Compass.update([h, p, r])
+        self.updateWidget(self.Compass, [h, p, r])
 
       # IR distance array
-      data = Robot.getData("sensor/distance_cm")
+      data = Robot.getData(self.kDist)
       self.IRDistArray.isActive = not data is None
       if self.IRDistArray.isActive:
-        self.IRDistArray.update(data)
+        self.updateWidget(self.IRDistArray, data)
         '''
         # ****************
         # ****************
@@ -300,40 +441,41 @@ class FrontEndGUI(object):
         # ****************
         # ****************
         '''
-
-      # Motor load, if provided
-      data = Robot.getData("power/motor_load")
-      self.PlotLoad.isActive = not data is None
-      if self.PlotLoad.isActive:
-        self.LoadTData.shift(data[0])
-        self.LoadWData.shift(data[1])
-        self.PlotLoad.update([self.LoadTData.data, self.LoadWData.data])
-
-      # Light intensity difference, if provided
-      data = Robot.getData("sensor/photodiode/intensity")
-      self.PlotLight.isActive = not data is None
-      if self.PlotLight.isActive:
-        self.LightLData.shift(data[0])
-        self.LightRData.shift(data[1])
-        self.PlotLight.update([self.LightLData.data, self.LightRData.data])
-
-      # Thermal camera image, if provided
-      data = Robot.getData("camera_IR/image")
-      size = Robot.getData("camera_IR/size")
-      blobs = Robot.getData("camera_IR/blobs")
-      self.CameraIR.isActive = not data is None
-      if self.CameraIR.isActive:
-        self.CameraIR.update(data, size, blobs)
-        '''
-        if self.icr_nFr < self.icr_Frames.shape[0]:
-           self.icr_Frames[self.icr_nFr] = np.reshape(data, size)
-           self.icr_nFr += 1
-        else:
-          from tempfile import TemporaryFile
-          outfile = TemporaryFile()
-          np.save("thermodata", self.icr_Frames)
-          quit()
-        '''
+    if len(frames) > 0:
+      self._isPending = True
+
+    if self._isPending and self.Pacer.isFullFrame():
+      # Plots and camera are the most expensive widgets; if frames take too
+      # long, these are only updated in every n-th frame (with the latest
+      # data)
+      self.updateExpensive()
+      self._isPending = False
+
+  def updateExpensive(self):
+    """ Update plots and camera image
+    """
+    # Motor load, if provided
+    data = Robot.getData(self.kLoad)
+    self.PlotLoad.isActive = not data is None
+    if self.PlotLoad.isActive:
+      data = self.Store.view("motor_load")
+      self.updateWidget(self.PlotLoad, [data[:,0], data[:,1]])
+
+    # Light intensity difference, if provided
+    data = Robot.getData(self.kLight)
+    self.PlotLight.isActive = not data is None
+    if self.PlotLight.isActive:
+      data = self.Store.view("intensity")
+      self.updateWidget(self.PlotLight, [data[:,0], data[:,1]])
+
+    # Thermal camera image, if provided
+    data = Robot.getData(self.kImage)
+    size = Robot.getData(self.kSize)
+    blobs = Robot.getData(self.kBlobs)
+    self.CameraIR.isActive = not data is None
+    if self.CameraIR.isActive:
+      isValid = Robot.getData(self.kImgOk) is not False
+      self.updateWidget(self.CameraIR, data, size, blobs, isValid)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def kill(self):
@@ -341,55 +483,27 @@ class FrontEndGUI(object):
     """
     self.Win.close()
 
-# ---------------------------------------------------------------------
-# MQTT-related
-#
-# ---------------------------------------------------------------------
-def onConnect(client, userdata, flags, rc):
-  """ The callback for when the client receives a CONNACK response from
-      the server/broker. Subscribing in on_connect() means that if we
-      lose the connection and reconnect then subscriptions will be
-      renewed.
-  """
-  global isConnected
-  if rc == 0:
-    print("MQTT: Successfully connected to `{0}`".format(MQTT_BROKER))
-    print("MQTT: Subscribing to `{0}` ...".format(MQTT_ROOT_TOPIC))
-    client.subscribe(MQTT_ROOT_TOPIC)
-    isConnected = True
-  else:
-    print("MQTT: Broker `{0}` replied `{1}`".format(MQTT_BROKER, rc))
-
-def onDisconnect(client, userdata, rc):
-  """ Called when the client disconnects from the broker.
-  """
-  global isConnected
-  print("MQTT: Disconnected from broker `{0}`".format(MQTT_BROKER))
-  isConnected = False
-
-def onMessage(client, userdata, msg):
-  """ The callback for when a PUBLISH message is received from the server;
-      passes the latest MQTT message from robotling to the robot's
-      representation object
-  """
-  global Robot
-  Robot.setNewMQTTMsg(msg)
-
-def onLog(client, userdata, level, buf):
-  print("***", level, buf)
-
 # ---------------------------------------------------------------------
 def parseCmdLn():
   from argparse import ArgumentParser
   parser = ArgumentParser()
   parser.add_argument('-g', '--guid', type=str, default="")
+  parser.add_argument('-r', '--record', type=str, default="")
+  parser.add_argument('--replay', type=str, default="")
+  parser.add_argument('-s', '--speed', type=float, default=1.0)
+  parser.add_argument('--fps', type=float, default=GUI_FPS_MAX)
+  parser.add_argument('--headless', action="store_true")
+  parser.add_argument('--png', type=str, default="")
+  parser.add_argument('--raw', type=str, default="")
+  parser.add_argument('--export-fps', type=float, default=fe.EXPORT_FPS)
+  parser.add_argument('--profile', type=str, default="")
+  parser.add_argument('--overlay', action="store_true")
   return parser.parse_args()
 
 # ---------------------------------------------------------------------
 if __name__ == '__main__':
 
   # Initialize
-  isConnected = False
   dtGUIUpdate_s = 0
   roundGUI = 0
 
@@ -401,27 +515,82 @@ if __name__ == '__main__':
 
   # Robotling-related data
   Robot = hx.HexBug(isVerbose=False)
-
-  # Create MQTT client
-  Client = mqtt.Client()
-  Client.on_connect = onConnect
-  Client.on_message = onMessage
-  Client.on_disconnect = onDisconnect
-  #Client.on_log = onLog
+  Recorder = None
+  if len(args.record) > 0:
+    try:
+      Recorder = tlog.TelemetryRecorder(args.record).start()
+    except FileExistsError:
+      print("Cannot record into `{0}` (not empty)".format(args.record))
+      exit()
+    Robot.attachRecorder(Recorder)
+
+  isExport = len(args.png) > 0 or len(args.raw) > 0
+  evFrameDone = None
+  if len(args.replay) > 0:
+    # Replay recorded session, the replay passes the messages to the robot's
+    # representation object (in its own thread); when exporting, it waits
+    # for each message to be rendered and exported (otherwise, at high
+    # speed, most messages would be dropped from the robot's queue)
+    from hexbug_replay import TelemetryReplay
+    topic = MQTT_ROOT_TOPIC if len(args.guid) > 0 else "#"
+    evFrameDone = threading.Event() if isExport else None
+    Ingest = TelemetryReplay(args.replay, Robot, args.speed, topic,
+                             evReady=evFrameDone)
+    SourceName = "replay (x{0})".format(args.speed)
+    Ingest.start()
+  else:
+    # Create ingest core, which passes the messages from the robotling to
+    # the robot's representation object (in the core's thread)
+    Ingest = ingest.IngestCore(
+      ingest.PahoTransport(MQTT_BROKER, MQTT_PORT, MQTT_ALIVE_S))
+    Ingest.addHandler(MQTT_ROOT_TOPIC, Robot.setNewMQTTMsg)
+    SourceName = MQTT_BROKER
+    Ingest.runInThread()
 
   # Create GUI front end and run loop
-  GUI = FrontEndGUI()
-  GUI.run()
+  tGUI = time.time()
+  GUI = FrontEndGUI(args.headless, args.fps)
+  if isExport:
+    isRaw = len(args.raw) > 0
+    GUI.Export = fe.FrameExporter(GUI.Win.surface,
+                                  args.raw if isRaw else args.png,
+                                  args.export_fps, isRaw)
+    GUI.evFrameDone = evFrameDone
+  GUI.isOverlay = args.overlay
+  if len(args.profile) > 0:
+    GUI.fNameCSV = args.profile
+  try:
+    GUI.run()
+  except KeyboardInterrupt:
+    # The only way to stop a headless GUI connected to a broker
+    pass
+  tGUI = time.time() -tGUI
 
   # Clean up GUI
   GUI.kill()
-
-  if isConnected:
-    # Stop MQTT client
-    print("MQTT: Stopping client loop ...")
-    Client.loop_stop()
-    print("MQTT: Disconnecting from broker ...")
-    Client.disconnect()
-    print("... done.")
+  if GUI.Export is not None:
+    GUI.Export.close()
+    print("Export: " +GUI.Export.getStatsStr())
+  if len(args.profile) > 0:
+    print("GUI: profiling data saved to `{0}`".format(
+          GUI.Prof.saveCSV(args.profile)))
+  print("GUI: {0} rounds @ {1:.1f} Hz".format(roundGUI, roundGUI /tGUI))
+  print("GUI: " +GUI.Pacer.getStatsStr(True))
+
+  if len(args.replay) > 0:
+    # Stop replay and report throughput
+    Ingest.stop()
+    print(Ingest.getStatsStr())
+    print("GUI: " +GUI.Win.TextCache.getStatsStr())
+  else:
+    # Stop ingest core (disconnects from broker)
+    print("MQTT: Stopping ingest core ...")
+    Ingest.stop()
+    Ingest.join(2.0)
+  if Recorder:
+    print("Closing recording ...")
+    Recorder.stop()
+    print(Recorder.getStatsStr())
+  print("... done.")
 
 # ---------------------------------------------------------------------
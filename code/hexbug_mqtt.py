@@ -7,17 +7,53 @@
 # The MIT License (MIT)
 # Copyright (c) 2018-19 Thomas Euler
 # 2019-05-04, v1
+# 2026-10-17, received messages are kept in a bounded queue instead of
+#             a single slot, so that no frame is silently overwritten
+# 2026-10-17, messages are decoded in the MQTT network thread; key paths
+#             are compiled once (`KeyPath`) and registered keys are
+#             extracted into slots when a message is decoded
+# 2026-10-17, optional columnar store (`TelemetryStore`) that is filled
+#             with selected values when a message is decoded
+# 2026-10-17, decoder for binary telemetry frames (`FrameDecoder`); JSON
+#             messages are still accepted
+# 2026-10-17, reconstruction of camera images sent as quantized keyframes
+#             and deltas (`ImageDeltaDecoder`)
+# 2026-10-17, per-frame sequence numbers and timestamps; loss/reordering
+#             counters, robot-to-host clock offset and latency histograms
+#             (transit, queueing, decoding); the message rate is computed
+#             from the arrival times of the last messages
+# 2026-10-17, optional recording of all decoded messages (`attachRecorder`)
+# 2026-10-17, `evNewFrame` is set when a message was added to the queue
+# 2026-10-17, malformed image deltas are counted as corrupt messages
+# 2026-10-17, for replayed messages, transit time and clock offset are
+#             computed with the recorded arrival time (`tRecorded`)
 #
 # ---------------------------------------------------------------------
 import time
+import struct
 import numpy as np
 import json
 import threading
-import modules.data_buffer as db
+from collections import deque
+import modules.frame_queue as fq
+import modules.latency_stats as ls
 from robotling.hexbug_config import *
 from robotling.hexbug_global import *
 
 
+# Capacity of the queue of received messages (~3 s at 20 Hz)
+MSG_QUEUE_LEN   = 64
+
+# Host-side key that marks if a reconstructed camera image is valid
+KEY_IMG_VALID   = "image_valid"
+
+# Fields of binary frames with at least that many values are decoded into
+# NumPy arrays, smaller ones into lists
+NP_MIN_COUNT    = 16
+
+# Number of messages over which the message rate is computed
+RATE_WINDOW     = 50
+
 # ----------------------------------------------------------------------------
 # Robot states
 class RStates:
@@ -40,83 +76,455 @@ RStateStr = dict([
   (RStates.WAKING_UP, "Sleeping/waking up"),
   (RStates.SEEK_BLOB, "Follow blob")])
 
+# ----------------------------------------------------------------------------
+class KeyPath(object):
+  """Accessor for a value in a (nested) message dictionary; the key path
+     (e.g. "sensor/compass/heading_deg") is split only once"""
+  __slots__ = ("path", "keys")
+
+  def __init__(self, keyStrList):
+    if isinstance(keyStrList, (list, tuple)):
+      self.keys = tuple(keyStrList)
+    else:
+      self.keys = tuple(keyStrList.split("/"))
+    self.path = "/".join(self.keys)
+
+  def get(self, d):
+    """ Returns the value in `d` or raises a `KeyError`
+    """
+    try:
+      for key in self.keys:
+        d = d[key]
+      return d
+    except (TypeError, IndexError):
+      raise KeyError(self.path)
+
+# ----------------------------------------------------------------------------
+class KeyRegistry(object):
+  """Cache of compiled key paths; registered paths are assigned a slot index
+     and extracted from each message when it is decoded"""
+
+  def __init__(self):
+    self._paths = dict()
+    self._slots = []
+    self._slotIndex = dict()
+
+  def compile(self, keyStrList):
+    """ Return the (cached) `KeyPath` object for `keyStrList`
+    """
+    key = keyStrList if isinstance(keyStrList, str) else tuple(keyStrList)
+    kp = self._paths.get(key)
+    if kp is None:
+      kp = KeyPath(keyStrList)
+      self._paths[key] = kp
+    return kp
+
+  def register(self, keyStrList):
+    """ Register a key path and return its slot index
+    """
+    kp = self.compile(keyStrList)
+    iSlot = self._slotIndex.get(kp.path)
+    if iSlot is None:
+      iSlot = len(self._slots)
+      self._slots.append(kp)
+      self._slotIndex[kp.path] = iSlot
+    return iSlot
+
+  def flatten(self, d):
+    """ Return a list with the values of all registered key paths in `d`
+        (`None` for missing keys)
+    """
+    slots = [None] *len(self._slots)
+    for iSlot, kp in enumerate(self._slots):
+      try:
+        slots[iSlot] = kp.get(d)
+      except KeyError:
+        pass
+    return slots
+
+  def getPath(self, iSlot):
+    return self._slots[iSlot]
+
+  def __len__(self):
+    return len(self._slots)
+
+# ----------------------------------------------------------------------------
+class FrameDecoder(object):
+  """Decoder for binary telemetry frames (see `TLM_FIELDS` in
+     `hexbug_global.py`). For each frame layout (i.e. set of fields and
+     number of values per field), a `struct.Struct` is compiled once, which
+     unpacks all small fields in one call; large arrays (e.g. the camera
+     image) are skipped by the struct and read as NumPy arrays directly from
+     the payload (vectorized scaling)"""
+
+  def __init__(self):
+    self._layouts = dict()
+
+  def _compile(self, flags, nHead, counts):
+    fmt = "<"
+    fields = []
+    iC = 0
+    iVal = 0
+    offs = nHead
+    for iF, (keys, typ, scale, shape) in enumerate(TLM_FIELDS):
+      if not flags & (1 << iF):
+        continue
+      n = counts[iC]
+      iC += 1
+      nBytes = struct.calcsize("<{0}{1}".format(n, typ))
+      if n >= NP_MIN_COUNT:
+        # Read as NumPy array, struct skips these bytes
+        fmt += "{0}x".format(nBytes)
+        fields.append((keys, scale, shape, None, (np.dtype("<" +typ), n, offs)))
+      else:
+        fmt += "{0}{1}".format(n, typ)
+        fields.append((keys, scale, shape, (iVal, iVal +n), None))
+        iVal += n
+      offs += nBytes
+    return struct.Struct(fmt), offs, fields
+
+  def decode(self, payload):
+    """ Decode a binary frame into a (nested) dictionary, such as it would
+        result from the respective JSON message. Large arrays are returned
+        as NumPy arrays. Raises `ValueError` if the frame is corrupt
+    """
+    if len(payload) < 6:
+      raise ValueError("Frame too short")
+    magic, ver, flags = struct.unpack_from("<BBI", payload)
+    if magic != TLM_MAGIC or ver != TLM_VERSION:
+      raise ValueError("Unknown frame type or version")
+    nHead = 6 +2*bin(flags).count("1")
+    key = bytes(payload[:nHead])
+    layout = self._layouts.get(key)
+    if layout is None:
+      if len(payload) < nHead:
+        raise ValueError("Frame too short")
+      counts = struct.unpack_from("<{0}H".format((nHead -6)//2), payload, 6)
+      layout = self._compile(flags, nHead, counts)
+      self._layouts[key] = layout
+    st, nBytes, fields = layout
+    if len(payload) != nBytes:
+      raise ValueError("Frame size does not match layout")
+    vals = st.unpack_from(payload, nHead)
+
+    data = dict()
+    for keys, scale, shape, iv, npv in fields:
+      if iv is not None:
+        if shape == 0:
+          v = vals[iv[0]] *scale if scale else vals[iv[0]]
+        else:
+          v = vals[iv[0]:iv[1]]
+          v = [x *scale for x in v] if scale else list(v)
+          if shape > 1:
+            v = [v[i:i+shape] for i in range(0, len(v), shape)]
+      else:
+        v = np.frombuffer(payload, dtype=npv[0], count=npv[1], offset=npv[2])
+        v = v *scale if scale else v.copy()
+        if shape > 1:
+          v = v.reshape(-1, shape)
+      d = data
+      for k in keys[:-1]:
+        sub = d.get(k)
+        if sub is None:
+          sub = d[k] = dict()
+        d = sub
+      d[keys[-1]] = v
+    return data
+
+# Decoder shared by all robot representations
+Decoder = FrameDecoder()
+
+def decodePayload(payload):
+  """ Decode an MQTT message payload, which can be a JSON string or a binary
+      telemetry frame, into a dictionary; raises `ValueError` if corrupt
+  """
+  if payload[:1] == b"{":
+    return json.loads(payload.decode('utf-8'))
+  return Decoder.decode(payload)
+
+# ----------------------------------------------------------------------------
+class ImageDeltaDecoder(object):
+  """Reconstructs camera images sent as quantized keyframes and deltas (see
+     `KEY_IMG_QHEAD` in `hexbug_global.py`). Messages have to be applied in
+     the order they were received. If a delta does not follow the previous
+     image or refers to a keyframe that was not received, the image is
+     marked invalid until the next keyframe arrives; the same happens if
+     a keyframe or delta is malformed (e.g. pixel index out of range)"""
+
+  def __init__(self):
+    self._img = None
+    self._seq = -1
+    self._keySeq = -1
+    self.isValid = False
+    self.nKeyframes = 0
+    self.nDeltas = 0
+    self.nResync = 0
+    self.nCorrupt = 0
+
+  def apply(self, cam):
+    """ Reconstruct the image in the camera dictionary `cam` (in place);
+        adds `KEY_IMAGE` (as float array) and `KEY_IMG_VALID`. Returns
+        False if the image data is malformed
+    """
+    head = cam.get(KEY_IMG_QHEAD)
+    if head is None:
+      return True
+    try:
+      seq = int(head[0])
+      keySeq = int(head[1])
+      offs = float(head[2])
+      scale = float(head[3])
+      key = cam.get(KEY_IMG_KEY)
+      if key is not None:
+        # Keyframe
+        self._img = _toPixels(key)
+        if self._img.size == 0:
+          raise ValueError("Empty keyframe")
+        self._keySeq = keySeq
+        self.isValid = True
+        self.nKeyframes += 1
+      else:
+        # Delta to previous image
+        self.nDeltas += 1
+        if (self._img is None or keySeq != self._keySeq or
+            seq != (self._seq +1) & 0xFFFF):
+          if self.isValid:
+            self.nResync += 1
+          self.isValid = False
+        if self.isValid:
+          self._applyDelta(cam)
+    except (ValueError, TypeError, IndexError):
+      self.nCorrupt += 1
+      if self.isValid:
+        self.nResync += 1
+      self.isValid = False
+      cam.pop(KEY_IMAGE, None)
+      cam[KEY_IMG_VALID] = False
+      return False
+    self._seq = seq
+    if self._img is not None:
+      cam[KEY_IMAGE] = self._img *scale +offs
+    cam[KEY_IMG_VALID] = self.isValid
+    return True
+
+  def _applyDelta(self, cam):
+    # Checks indices and values of a delta before changing the image
+    didx = np.asarray(cam.get(KEY_IMG_DIDX, []), dtype=np.intp)
+    dval = _toPixels(cam.get(KEY_IMG_DVAL, []))
+    if didx.ndim != 1 or dval.shape != didx.shape:
+      raise ValueError("Image delta with mismatching indices and values")
+    if len(didx) > 0:
+      if didx.min() < 0 or didx.max() >= self._img.size:
+        raise IndexError("Image delta with pixel index out of range")
+      self._img[didx] = dval
+
+def _toPixels(v):
+  # Quantized pixel values as uint8 array; raises `ValueError` if not a
+  # vector of values in [0, 255]
+  a = np.asarray(v)
+  if a.ndim != 1 or (a.size > 0 and (a.min() < 0 or a.max() > 255)):
+    raise ValueError("Invalid quantized pixel values")
+  return a.astype(np.uint8)
+
+# ----------------------------------------------------------------------------
+class Frame(object):
+  """A decoded telemetry message; `tRecv` is the (host) time the message
+     arrived, `seq` the robot's sequence number (or `None`)"""
+  __slots__ = ("data", "slots", "tRecv", "seq", "dtDecode")
+
+  def __init__(self, data, slots, tRecv, seq=None, dtDecode=0.):
+    self.data = data
+    self.slots = slots
+    self.tRecv = tRecv
+    self.seq = seq
+    self.dtDecode = dtDecode
+
 # ----------------------------------------------------------------------------
 class HexBug(object):
   """Hijacked-HexBug representation"""
 
-  def __init__(self, isVerbose=True):
-    self.sCurrMsg = ""
+  def __init__(self, isVerbose=True, nQueue=MSG_QUEUE_LEN,
+               policy=fq.DROP_OLDEST):
+    self.Queue = fq.FrameQueue(nQueue, policy)
+    self.evNewFrame = threading.Event()
+    self.Keys = KeyRegistry()
+    self.Store = None
+    self.Recorder = None
+    self.ImgDecoder = ImageDeltaDecoder()
+    self._storeSlots = []
     self.nMsg = 0
     self.nMsgCorrupt = 0
     self.Data = dict()
-    self.freqMsgFilter = db.DataStack(50, 25)
+    self.Frame = Frame(self.Data, [], 0)
     self.freqMsg = 0
-    self._tLastMsg = time.time()
-    self._isNewMsg = False
-    self._Lock = threading.Lock()
+    self._tArrivals = deque(maxlen=RATE_WINDOW)
     self._isVerbose = isVerbose
 
+    # Link statistics
+    self.Seq = ls.SeqTracker()
+    self.Clock = ls.ClockOffset()
+    self.LatTransit = ls.LatencyHistogram()
+    self.LatQueue = ls.LatencyHistogram()
+    self.LatDecode = ls.LatencyHistogram()
+
+  def registerKey(self, keyStrList):
+    """ Register a key path, such as "sensor/compass/heading_deg"; the value
+        is extracted when a message is decoded and can then be retrieved
+        with `getData` using the returned slot index. Register keys before
+        messages are received
+    """
+    return self.Keys.register(keyStrList)
+
+  def attachStore(self, store, fields):
+    """ Attach a `TelemetryStore`; `fields` is a dictionary that maps field
+        names of the store to key paths. The values are appended to the
+        store (with the time of reception) when a message is decoded
+    """
+    self._storeSlots = [(name, self.registerKey(key))
+                        for name, key in fields.items()]
+    self.Store = store
+
+  def attachRecorder(self, recorder):
+    """ Attach a `TelemetryRecorder`; all messages that are decoded without
+        error are then queued for recording (as received)
+    """
+    self.Recorder = recorder
+
   def setNewMQTTMsg(self, msg):
-    """ Acquire lock and save the passed MQTT message as a string
+    """ Decode the passed MQTT message and add it to the queue of received
+        messages (called from the MQTT client's network thread); returns
+        the `Frame` or `None`, if the message is corrupt
     """
+    t0 = time.time()
+    tMono = getattr(msg, "timestamp", None)
+    t = t0 if tMono is None else t0 -max(time.monotonic() -tMono, 0)
+    self.nMsg += 1
+    self._tArrivals.append(t)
+    if len(self._tArrivals) > 1:
+      dt = t -self._tArrivals[0]
+      self.freqMsg = (len(self._tArrivals) -1) /dt if dt > 0 else 0
     try:
-      self._Lock.acquire()
-      self.sCurrMsg = msg.payload.decode('utf-8')
-      self._isNewMsg = True
-    finally:
-      self._Lock.release()
-
-    if self._isNewMsg:
-      self.nMsg += 1
+      data = decodePayload(msg.payload)
+    except ValueError:
+      self.nMsgCorrupt += 1
+      return None
+    cam = data.get(KEY_CAM_IR)
+    if cam is not None and not self.ImgDecoder.apply(cam):
+      # The other values of the message are still used
+      self.nMsgCorrupt += 1
+    slots = self.Keys.flatten(data)
+    if self.Store is not None:
+      self.Store.append(t, {name: slots[i] for name, i in self._storeSlots})
+    if self.Recorder is not None:
+      self.Recorder.record(msg.topic, msg.payload, t)
+    dtDecode = time.time() -t0
+    self.LatDecode.add(dtDecode *1000)
+
+    # Robot-to-host transit time and sequence (of a replayed message, as
+    # when it was recorded)
+    tRobot = data.get(KEY_TIMESTAMP)
+    if tRobot is not None:
+      tHost = getattr(msg, "tRecorded", t)
+      nResets = self.Clock.nResets
+      offs = self.Clock.update(tRobot, tHost)
+      if self.Clock.nResets != nResets:
+        self.Seq.reset()
+      self.LatTransit.add((tHost -tRobot -offs) *1000)
+    seq = data.get(KEY_SEQ)
+    if seq is not None:
+      self.Seq.update(seq)
+
+    frame = Frame(data, slots, t, seq, dtDecode)
+    self.Queue.put(frame)
+    self.evNewFrame.set()
+    return frame
+
+  def processMQTTMsgs(self, nMax=0):
+    """ Remove all (or the `nMax` oldest) decoded messages from the queue
+        and return these as a list of `Frame` objects, oldest first. The
+        latest message becomes the current one (`Data`)
+    """
+    frames = self.Queue.drain(nMax)
+    if len(frames) > 0:
       t = time.time()
-      self.freqMsgFilter.shift(1/(t -self._tLastMsg))
-      self.freqMsg = self.freqMsgFilter.mean(nBox=50)
-      self._tLastMsg = t
+      for f in frames:
+        self.LatQueue.add((t -f.tRecv -f.dtDecode) *1000)
+      self.Frame = frames[-1]
+      self.Data = self.Frame.data
+    return frames
 
   def processLatestMQTTMsg(self):
-    """ Convert latest MQTT message string into a directory
+    """ Process all pending MQTT messages; the latest becomes the current
+        one. Returns True if at least one new valid message was available
     """
-    res = False
-    if self._isNewMsg and len(self.sCurrMsg) > 0:
-      try:
-        self._Lock.acquire()
-        try:
-          self.Data = json.loads(str(self.sCurrMsg))
-          self._isNewMsg = False
-          res = True
-        except:
-          self.nMsgCorrupt += 1
-      finally:
-        self._Lock.release()
-    return res
-
-  def getData(self, keyStrList):
-    """ Returns data for `keyStrList` or `None`, if the keys were not found.
-       `keyStrList` can be a list of strings, e.g. if the key is composed
-       (e.g. ["sensor","compass","heading_deg"]), or a string, such as
-       "sensor/compass/heading_deg"
+    return len(self.processMQTTMsgs()) > 0
+
+  def getData(self, key, frame=None):
+    """ Returns data for `key` or `None`, if the key was not found. `key`
+       can be a slot index (see `registerKey`), a list of strings, e.g. if
+       the key is composed (e.g. ["sensor","compass","heading_deg"]), or a
+       string, such as "sensor/compass/heading_deg". If `frame` is given,
+       the value is taken from this message (as returned by
+       `processMQTTMsgs`) instead of the latest one
     """
+    f = self.Frame if frame is None else frame
+    if isinstance(key, int):
+      if key < len(f.slots):
+        return f.slots[key]
+      kp = self.Keys.getPath(key)
+    else:
+      kp = self.Keys.compile(key)
     try:
-      if not isinstance(keyStrList,list):
-        keyStrList = keyStrList.split("/")
-      n =  len(keyStrList)
-      if n == 1:
-        return self.Data[keyStrList[0]]
-      elif n == 2:
-        return self.Data[keyStrList[0]][keyStrList[1]]
-      elif n == 3:
-        return self.Data[keyStrList[0]][keyStrList[1]][keyStrList[2]]
-      else:
-        print("ERROR: `keyStrList` contains no or more than 3 keys")
+      return kp.get(f.data)
     except KeyError:
       if self._isVerbose:
-        print("ERROR: Key `{0}`not found".format(keyStrList))
+        print("ERROR: Key `{0}`not found".format(kp.path))
     return None
 
-  def getStatsStr(self):
-    """ Return statistics on received messages as a string
+  @property
+  def nDropped(self):
+    """ Number of decoded messages that were dropped from the queue before
+        they were processed
+    """
+    return self.Queue.nDropped
+
+  def getLatency(self):
+    """ Returns a dictionary with the 50th, 95th and 99th percentile (in
+        [ms]) of the transit, queueing and decoding latency
+    """
+    return {"transit": self.LatTransit.percentiles(),
+            "queue": self.LatQueue.percentiles(),
+            "decode": self.LatDecode.percentiles()}
+
+  def resetStats(self):
+    """ Reset loss/reordering counters and latency histograms
+    """
+    self.Seq.reset()
+    self.LatTransit.reset()
+    self.LatQueue.reset()
+    self.LatDecode.reset()
+
+  def getStatsStr(self, isShort=False):
+    """ Return statistics on received messages as a string; with `isShort`,
+        only the most important ones in two short lines (e.g. for the GUI)
     """
-    return "{0} @ {1:.1f} Hz, {2} corrupt".format(self.nMsg, self.freqMsg,
-                                                  self.nMsgCorrupt)
+    def _fmt(ps):
+      return "/".join(["-" if p is None else
+                       "{0:.1f}".format(p) if p < 10 else
+                       "{0:.0f}".format(p) for p in ps])
+
+    lat = self.getLatency()
+    if isShort:
+      return ("{0} @ {1:.1f} Hz, {2} lost, {3} dropped\n"
+              "p95 tx {4} q {5} dec {6} ms".format(
+        self.nMsg, self.freqMsg, self.Seq.nLost +self.nMsgCorrupt,
+        self.nDropped, _fmt(lat["transit"][1:2]), _fmt(lat["queue"][1:2]),
+        _fmt(lat["decode"][1:2])))
+    return ("{0} @ {1:.1f} Hz, {2} corrupt\n{3}\n"
+            "{4} lost, {5} reordered\n"
+            "p50/95/99 tx {6} q {7} dec {8} ms".format(
+      self.nMsg, self.freqMsg, self.nMsgCorrupt, self.Queue.getStatsStr(),
+      self.Seq.nLost, self.Seq.nReordered, _fmt(lat["transit"]),
+      _fmt(lat["queue"]), _fmt(lat["decode"])))
 
 # ---------------------------------------------------------------------
@@ -7,17 +7,58 @@
 # The MIT License (MIT)
 # Copyright (c) 2018-2019 Thomas Euler
 # 2019-08-26, v1
+# 2026-10-17, based on the asyncio ingest core (`modules/mqtt_ingest.py`);
+#             binary telemetry frames are relayed as well
+# 2026-10-17, fleet mode (relays all robotlings, see `hexbug_fleet.py`)
+# 2026-10-17, topics are compiled once per message schema (`TopicTable`)
+#             and the leaves of a message are published as one batch;
+#             instead of printing each leaf, the throughput is reported
+# 2026-10-17, leaves are only relayed if they changed by more than a per-
+#             topic deadband (and not more often than a minimal interval);
+#             relayed values are retained by the broker (`RELAY_RULES`)
+# 2026-10-17, rolled-up streams (min/max/mean/count per numeric leaf) at
+#             fixed intervals, e.g. "<GUID>/rollup/10s/power/battery_V"
+#             (only for the leaves in `ROLLUP_FIELDS`)
+# 2026-10-17, optionally, all leaves are stored in an SQLite database
+#             (see `modules/telemetry_db.py`)
+# 2026-10-17, relayed messages pass a bounded outbound queue, which is
+#             drained by a dedicated publisher task (`Publisher`)
+# 2026-10-17, delta-coded camera images are reconstructed per robotling
+#             and relayed (and stored) as "camera_IR/image"
+# 2026-10-17, state shared between robots (change filter, counters) is
+#             locked, as fleet workers relay from several threads
+# 2026-10-17, the publisher waits for events (connection, sent messages,
+#             new messages) instead of polling
+# 2026-10-17, the topic table of a new root topic is created under the
+#             lock (with a re-check), so that it exists only once
 #
 # The GUID of the hexbug to connect to must be passed as argument:
 #   --guid or -g
 # for instance:
 #   python .\hexbug_relay.py -g robotling_b4e62da1dccd
+# or, to relay the messages of all robotlings:
+#   python .\hexbug_relay.py --fleet
+# To relay all leaves of every message (no change detection), add --all
+# The intervals of the rolled-up streams can be set with --rollup, e.g.
+#   python .\hexbug_relay.py --fleet --rollup 1,10,60
+# (`--rollup 0` disables them)
+# To store all leaves (before change detection) in a database, use --db:
+#   python .\hexbug_relay.py --fleet --db .\logs\telemetry.db
+# The capacity of the outbound queue and what is dropped if it is full
+# (oldest, newest or lowest priority message) can be set, e.g.
+#   python .\hexbug_relay.py --fleet --queue 1000 --drop lowest
 #
 # ---------------------------------------------------------------------
+import time
 import json
+import asyncio
 import threading
-import time
-import paho.mqtt.client as mqtt
+import numpy as np
+from collections import deque
+import hexbug_mqtt as hx
+from hexbug_fleet import HexBugFleet
+from modules.telemetry_db import TelemetryDB
+from modules.mqtt_ingest import IngestCore, PahoTransport, topicMatches
 
 try:
   import robotling.NETWORK as nw
@@ -28,117 +69,619 @@ except:
   print("Error retrieving broker info from `robotling.NETWORK.py` ...")
   exit()
 
+STATS_INTERVAL_S  = 5.0
+
+# Change detection: topic filter (below the robot's root topic), deadband
+# (a value is relayed if it differs by more than this from the last relayed
+# value; for lists, the largest difference counts) and minimal interval
+# between two messages of that topic in [s]. The first matching rule is used
+RELAY_RULES       = [
+  ("timestamp_s",             0,     1.0),
+  ("seq",                     0,     1.0),
+  ("power/battery_V",         0.02,  1.0),
+  ("power/motor_load",        5,     0.),
+  ("sensor/compass/+",        1.0,   0.),
+  ("sensor/distance_cm",      1,     0.),
+  ("sensor/photodiode/+",     10,    0.),
+  ("camera_IR/image",         0.5,   0.2),
+  ("#",                       0,     0.)]
+
+# Intervals of the rolled-up streams in [s] and how often the streams are
+# checked for completed intervals (if no messages arrive)
+ROLLUP_INTERVALS  = (1, 10)
+ROLLUP_TOPIC      = "rollup"
+ROLLUP_FLUSH_S    = 0.5
+
+# Leaves that are rolled up: topic filters (below the robot's root topic);
+# state, sequence number and time stamp are not meaningful as statistics
+ROLLUP_FIELDS     = [
+  "power/battery_V",
+  "power/motor_load",
+  "sensor/compass/+",
+  "sensor/distance_cm",
+  "sensor/photodiode/+"]
+
+# Outbound queue: capacity (in messages), messages handed to the transport
+# at once and the number of messages the transport may hold (not yet sent)
+# before the publisher waits
+PUB_QUEUE_LEN     = 4096
+PUB_BATCH         = 256
+PUB_PENDING_MAX   = 1024
+
+# Overflow policies of the outbound queue
+PUB_DROP_OLDEST   = "oldest"
+PUB_DROP_NEWEST   = "newest"
+PUB_DROP_LOWEST   = "lowest"
+
+# Priorities of the topics (below the robot's root topic) for the policy
+# "lowest": if the queue is full, the oldest message of the lowest priority
+# is dropped (or the new one, if its priority is even lower); messages of
+# higher priority are sent first. The first matching rule is used
+PUB_PRIORITIES    = [
+  ("state",                   3),
+  ("power/#",                 3),
+  ("sensor/#",                2),
+  ("camera_IR/#",             0),
+  (ROLLUP_TOPIC +"/#",        1),
+  ("#",                       1)]
+
 # ---------------------------------------------------------------------
-def onConnect(client, userdata, flags, rc):
-  global isConnected
-  if rc == 0:
-    print("Successfully connected to `{0}`".format(MQTT_BROKER))
-    print("Subscribing to `{0}` ...".format(MQTT_ROOT_TOPIC))
-    client.subscribe(MQTT_ROOT_TOPIC +"/raw")
-    isConnected = True
-  else:
-    print("Broker `{0}` replied `{1}`".format(MQTT_BROKER, rc))
+def _walk(d, sig, vals):
+  # Collects the leaf values of `d` and a signature of its structure
+  for k, v in d.items():
+    sig.append(k)
+    if isinstance(v, dict):
+      _walk(v, sig, vals)
+      sig.append(None)
+    else:
+      vals.append(v)
 
-def onDisconnect(client, userdata, rc):
-  global isConnected
-  print("Disconnected from broker `{0}`".format(MQTT_BROKER))
-  isConnected = False
+def _topics(d, prefix, topics):
+  for k, v in d.items():
+    if isinstance(v, dict):
+      _topics(v, prefix +k +"/", topics)
+    else:
+      topics.append(prefix +k)
 
-def onMessage(client, userdata, msg):
-  global lastMsg, isNewMsg
-  try:
-    Lock.acquire()
-    lastMsg = msg.payload.decode('utf-8')
-    isNewMsg = True
-  finally:
-    Lock.release()
+# Fields of delta-coded camera images, which are not relayed (the image is
+# reconstructed into "camera_IR/image" instead)
+IMG_WIRE_KEYS     = (hx.KEY_IMG_QHEAD, hx.KEY_IMG_KEY, hx.KEY_IMG_DIDX,
+                     hx.KEY_IMG_DVAL)
+
+def _withoutImgWire(data):
+  # Returns `data` or, if it contains a delta-coded image, a copy without
+  # the delta fields (and without the image, if it is not valid)
+  cam = data.get(hx.KEY_CAM_IR)
+  if cam is None or hx.KEY_IMG_QHEAD not in cam:
+    return data
+  data = dict(data)
+  cam = {k: v for k, v in cam.items() if k not in IMG_WIRE_KEYS}
+  if not cam.get(hx.KEY_IMG_VALID, False):
+    cam.pop(hx.KEY_IMAGE, None)
+  data[hx.KEY_CAM_IR] = cam
+  return data
+
+def _toPayload(v):
+  return str(v.tolist() if isinstance(v, np.ndarray) else v)
+
+# ---------------------------------------------------------------------
+class TopicTable(object):
+  """Maps the leaves of decoded messages to "proper" topics below a root
+     topic; the topic strings are built only once per message schema (the
+     set of nested keys) and then reused"""
+
+  def __init__(self, rootTopic):
+    self._prefix = rootTopic +"/"
+    self._tables = dict()
+
+  def leaves(self, data):
+    """ Returns a list of topics and a list of the respective values
+    """
+    sig = []
+    vals = []
+    _walk(data, sig, vals)
+    key = tuple(sig)
+    topics = self._tables.get(key)
+    if topics is None:
+      topics = []
+      _topics(data, self._prefix, topics)
+      # Keep the first list, if another thread compiled the schema as well
+      topics = self._tables.setdefault(key, topics)
+    return topics, vals
+
+  @property
+  def nSchemas(self):
+    return len(self._tables)
+
+# ---------------------------------------------------------------------
+def _isChanged(v, last, deadband):
+  if isinstance(v, (int, float)) and isinstance(last, (int, float)):
+    return abs(v -last) > deadband if deadband > 0 else v != last
+  if isinstance(v, (list, tuple, np.ndarray)):
+    try:
+      a = np.asarray(v, dtype=np.float64)
+      b = np.asarray(last, dtype=np.float64)
+    except (ValueError, TypeError):
+      return v != last
+    if a.shape != b.shape:
+      return True
+    return a.size > 0 and np.max(np.abs(a -b)) > deadband
+  return v != last
+
+# ---------------------------------------------------------------------
+class ChangeFilter(object):
+  """Decides per topic if a leaf is relayed, using the first matching rule
+     in `rules` (see `RELAY_RULES`)"""
+
+  def __init__(self, rules=RELAY_RULES):
+    self._rules = [("+/" +p, db, dt) for p, db, dt in rules]
+    self._topics = dict()
+    self._Lock = threading.Lock()
+    self.nIn = 0
+    self.nDeadband = 0
+    self.nInterval = 0
+
+  def _getState(self, topic):
+    # [deadband, minimal interval, last relayed value, time relayed]
+    st = self._topics.get(topic)
+    if st is None:
+      db, dt = 0, 0.
+      for p, db1, dt1 in self._rules:
+        if topicMatches(p, topic):
+          db, dt = db1, dt1
+          break
+      st = self._topics[topic] = [db, dt, None, 0.]
+    return st
+
+  def apply(self, topics, vals, t):
+    """ Returns the (topic, value) tuples that are to be relayed at time `t`
+        (thread-safe)
+    """
+    res = []
+    with self._Lock:
+      for topic, v in zip(topics, vals):
+        st = self._getState(topic)
+        if st[2] is not None:
+          if not _isChanged(v, st[2], st[0]):
+            self.nDeadband += 1
+            continue
+          if t -st[3] < st[1]:
+            self.nInterval += 1
+            continue
+        st[2] = v
+        st[3] = t
+        res.append((topic, v))
+      self.nIn += len(vals)
+    return res
+
+  def getStatsStr(self):
+    """ Return the number of suppressed leaves as a string
+    """
+    n = self.nDeadband +self.nInterval
+    return "{0} suppressed ({1:.0f}%; {2} deadband, {3} interval)".format(
+      n, 100. *n /max(self.nIn, 1), self.nDeadband, self.nInterval)
+
+# ---------------------------------------------------------------------
+class Rollup(object):
+  """Minimum, maximum, mean and count of numeric leaves (scalars and
+     vectors; those matching `fields`, see `ROLLUP_FIELDS`) of one robot
+     over consecutive intervals (aligned to multiples of the interval);
+     the statistics are updated incrementally with each message and
+     published when an interval is complete"""
+
+  def __init__(self, rootTopic, interval_s, fields=ROLLUP_FIELDS):
+    self._root = rootTopic +"/"
+    self._prefix = "{0}{1}/{2:g}s/".format(self._root, ROLLUP_TOPIC,
+                                           interval_s)
+    self._dt = interval_s
+    self._fields = ["+/" +p for p in fields]
+    self._tEnd = 0.
+    self._acc = dict()
+    self._topics = dict()
+    self._isRolled = dict()
+    self._Lock = threading.Lock()
+
+  def _isField(self, topic):
+    isRolled = self._isRolled.get(topic)
+    if isRolled is None:
+      isRolled = any(topicMatches(p, topic) for p in self._fields)
+      self._isRolled[topic] = isRolled
+    return isRolled
+
+  def add(self, topics, vals, t):
+    """ Add the leaves of a message received at time `t`; returns the
+        (topic, payload) tuples of a completed interval (or an empty list)
+    """
+    with self._Lock:
+      res = self._close(t)
+      for topic, v in zip(topics, vals):
+        if isinstance(v, bool) or not self._isField(topic):
+          continue
+        if isinstance(v, (int, float)):
+          a = self._acc.get(topic)
+          if a is None or not isinstance(a[1], float):
+            self._acc[topic] = [1, float(v), v, v]
+          else:
+            a[0] += 1
+            a[1] += v
+            if v < a[2]:
+              a[2] = v
+            elif v > a[3]:
+              a[3] = v
+        elif isinstance(v, (list, tuple, np.ndarray)) and len(v) > 0:
+          try:
+            x = np.asarray(v, dtype=np.float64)
+          except (ValueError, TypeError):
+            continue
+          if x.ndim != 1:
+            continue
+          a = self._acc.get(topic)
+          if a is None or isinstance(a[1], float) or a[1].shape != x.shape:
+            self._acc[topic] = [1, x.copy(), x.copy(), x.copy()]
+          else:
+            a[0] += 1
+            a[1] += x
+            np.minimum(a[2], x, out=a[2])
+            np.maximum(a[3], x, out=a[3])
+      return res
+
+  def flush(self, t):
+    """ Returns the (topic, payload) tuples of a completed interval
+    """
+    with self._Lock:
+      return self._close(t)
+
+  def _close(self, t):
+    if t < self._tEnd:
+      return []
+    res = []
+    for topic, (n, s, vMin, vMax) in self._acc.items():
+      rTopic = self._topics.get(topic)
+      if rTopic is None:
+        rTopic = self._topics[topic] = self._prefix +topic[len(self._root):]
+      isArr = isinstance(s, np.ndarray)
+      res.append((rTopic, json.dumps({
+          "t": self._tEnd, "n": n,
+          "min": vMin.tolist() if isArr else vMin,
+          "max": vMax.tolist() if isArr else vMax,
+          "mean": (s /n).tolist() if isArr else s /n
+        })))
+    self._acc = dict()
+    self._tEnd = (t //self._dt +1) *self._dt
+    return res
+
+# ---------------------------------------------------------------------
+class Publisher(object):
+  """Bounded outbound queue; `put` can be called from any thread, the
+     queue is drained by `run`, a task in the ingest core's event loop,
+     which waits while the transport is disconnected or has a backlog"""
+
+  def __init__(self, core, nMax=PUB_QUEUE_LEN, policy=PUB_DROP_OLDEST,
+               retain=False, priorities=PUB_PRIORITIES):
+    if policy not in (PUB_DROP_OLDEST, PUB_DROP_NEWEST, PUB_DROP_LOWEST):
+      raise ValueError("Unknown drop policy `{0}`".format(policy))
+    self._core = core
+    self._nMax = max(nMax, 1)
+    self._policy = policy
+    self._retain = retain
+    self._rules = [("+/" +p, pr) for p, pr in priorities]
+    self._prios = dict()
+    self._queues = dict()
+    self._levels = []
+    self._Lock = threading.Lock()
+    self._loop = None
+    self._evData = None
+    self._n = 0
+    self.nPut = 0
+    self.nPublished = 0
+    self.nDropped = 0
+    self.nDroppedPrio = dict()
+    self.highWater = 0
+
+  def _getPriority(self, topic):
+    if self._policy != PUB_DROP_LOWEST:
+      return 0
+    pr = self._prios.get(topic)
+    if pr is None:
+      pr = 0
+      for p, pr1 in self._rules:
+        if topicMatches(p, topic):
+          pr = pr1
+          break
+      self._prios[topic] = pr
+    return pr
+
+  def _getQueue(self, pr):
+    q = self._queues.get(pr)
+    if q is None:
+      q = self._queues[pr] = deque()
+      self._levels = sorted(self._queues)
+    return q
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def put(self, msgs):
+    """ Queue a list of (topic, payload) tuples; returns the number of
+        messages dropped due to an overflow
+    """
+    nDropped = 0
+    with self._Lock:
+      wasEmpty = self._n == 0
+      for topic, payload in msgs:
+        pr = self._getPriority(topic)
+        if self._n >= self._nMax:
+          # Queue is full, apply overflow policy
+          if self._policy == PUB_DROP_NEWEST:
+            prDrop = None
+          else:
+            prDrop = next(p for p in self._levels if len(self._queues[p]) > 0)
+            if pr < prDrop:
+              prDrop = None
+          nDropped += 1
+          if prDrop is None:
+            self.nDroppedPrio[pr] = self.nDroppedPrio.get(pr, 0) +1
+            continue
+          self.nDroppedPrio[prDrop] = self.nDroppedPrio.get(prDrop, 0) +1
+          self._queues[prDrop].popleft()
+          self._n -= 1
+        self._getQueue(pr).append((topic, payload))
+        self._n += 1
+      self.nPut += len(msgs)
+      self.nDropped += nDropped
+      self.highWater = max(self.highWater, self._n)
+      isWake = wasEmpty and self._n > 0 and self._loop is not None
+    if isWake:
+      self._loop.call_soon_threadsafe(self._evData.set)
+    return nDropped
+
+  def _drain(self, nMax):
+    # Returns up to `nMax` messages, those of the highest priority first
+    msgs = []
+    with self._Lock:
+      for pr in reversed(self._levels):
+        q = self._queues[pr]
+        while len(q) > 0 and len(msgs) < nMax:
+          msgs.append(q.popleft())
+      self._n -= len(msgs)
+    return msgs
+
+  async def run(self):
+    """ Publish the queued messages (until cancelled)
+    """
+    self._loop = asyncio.get_running_loop()
+    self._evData = asyncio.Event()
+    core = self._core
+    while True:
+      await core.waitWritable(PUB_PENDING_MAX)
+      msgs = self._drain(PUB_BATCH)
+      if len(msgs) == 0:
+        await self._evData.wait()
+        self._evData.clear()
+        continue
+      core.publishMany(msgs, retain=self._retain)
+      self.nPublished += len(msgs)
+      await asyncio.sleep(0)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def __len__(self):
+    return self._n
+
+  @property
+  def capacity(self):
+    return self._nMax
+
+  def getStatsStr(self):
+    """ Return queue depth and drops as a string
+    """
+    s = "{0} published, queue {1}/{2} (max. {3}), {4} dropped ({5})".format(
+      self.nPublished, self._n, self._nMax, self.highWater, self.nDropped,
+      self._policy)
+    if self._policy == PUB_DROP_LOWEST and self.nDropped > 0:
+      s += " by priority " +", ".join(["{0}: {1}".format(pr, n)
+        for pr, n in sorted(self.nDroppedPrio.items())])
+    return s
+
+# ---------------------------------------------------------------------
+class Relay(object):
+  """Resends the leaves of decoded messages under their own topics"""
+
+  def __init__(self, core, changeFilter=None, retain=True,
+               rollups=ROLLUP_INTERVALS, db=None, publisher=None):
+    """ If a `ChangeFilter` is given, only the leaves it passes are relayed;
+        `retain` lets the broker keep the last relayed value of each topic.
+        For each interval in `rollups` (in [s]), a rolled-up stream is
+        published. If a (started) `TelemetryDB` is given, all leaves are
+        stored in it. Messages are queued in `publisher` (by default, a
+        `Publisher` with default settings); its `run` task must be started
+        in the core's event loop
+    """
+    self._core = core
+    self._filter = changeFilter
+    self.DB = db
+    if publisher is None:
+      publisher = Publisher(core, retain=retain)
+    self.Out = publisher
+    self._intervals = [dt for dt in rollups if dt > 0]
+    self._tables = dict()
+    self._rollups = dict()
+    self._imgDecoders = dict()
+    self._Lock = threading.Lock()
+    self.nRollupMsg = 0
+    self.nMsg = 0
+    self.nLeaves = 0
+    self.nCorrupt = 0
+    self._tStats = time.time()
+    self._nMsgStats = 0
+    self._nLeavesStats = 0
+
+  def onMessage(self, msg):
+    """ Decode message (convert it into a dictionary), reconstruct the
+        camera image (if delta-coded) and relay it
+    """
+    try:
+      data = hx.decodePayload(msg.payload)
+    except ValueError:
+      self.nCorrupt += 1
+      return
+    rootTopic = msg.topic.rsplit("/", 1)[0]
+    cam = data.get(hx.KEY_CAM_IR)
+    if cam is not None:
+      dec = self._imgDecoders.get(rootTopic)
+      if dec is None:
+        dec = self._imgDecoders[rootTopic] = hx.ImageDeltaDecoder()
+      if not dec.apply(cam):
+        self.nCorrupt += 1
+    self.relay(rootTopic, data)
+
+  def onFleetFrame(self, member, frame):
+    """ Relay a message decoded by the fleet (called by the thread that
+        decoded it; the robot's `HexBug` object has already reconstructed
+        the camera image)
+    """
+    self.relay(member.guid, frame.data)
+    member.robot.processMQTTMsgs()
+
+  def relay(self, rootTopic, data):
+    """ Publish the leaves of `data` below `rootTopic` as one batch; the
+        fields of delta-coded images are dropped
+    """
+    data = _withoutImgWire(data)
+    table = self._tables.get(rootTopic)
+    if table is None:
+      with self._Lock:
+        table = self._tables.get(rootTopic)
+        if table is None:
+          # Rollups first, as `_tables` is read without the lock
+          self._rollups[rootTopic] = [Rollup(rootTopic, dt)
+                                      for dt in self._intervals]
+          table = self._tables[rootTopic] = TopicTable(rootTopic)
+    topics, vals = table.leaves(data)
+    t = time.time()
+    if self.DB is not None:
+      self.DB.add(rootTopic, t, topics, vals)
+    if self._filter is not None:
+      leaves = self._filter.apply(topics, vals, t)
+    else:
+      leaves = zip(topics, vals)
+    msgs = [(topic, _toPayload(v)) for topic, v in leaves]
+    nLeaves = len(msgs)
+    for r in self._rollups[rootTopic]:
+      msgs += r.add(topics, vals, t)
+    if len(msgs) > 0:
+      self.Out.put(msgs)
+    with self._Lock:
+      self.nLeaves += nLeaves
+      self.nRollupMsg += len(msgs) -nLeaves
+      self.nMsg += 1
+
+  def flush(self):
+    """ Publish the rolled-up streams of intervals that are complete (e.g.
+        if a robot stopped sending)
+    """
+    t = time.time()
+    msgs = []
+    with self._Lock:
+      allRollups = list(self._rollups.values())
+    for rollups in allRollups:
+      for r in rollups:
+        msgs += r.flush(t)
+    if len(msgs) > 0:
+      with self._Lock:
+        self.nRollupMsg += len(msgs)
+      self.Out.put(msgs)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self):
+    """ Return throughput since the last call as a string
+    """
+    t = time.time()
+    dt = max(t -self._tStats, 1E-6)
+    s = ("{0:.1f} msg/s, {1:.0f} leaves/s ({2} relayed, {3} corrupt), "
+         "{4} rollups".format(
+      (self.nMsg -self._nMsgStats) /dt, (self.nLeaves -self._nLeavesStats) /dt,
+      self.nMsg, self.nCorrupt, self.nRollupMsg))
+    self._tStats = t
+    self._nMsgStats = self.nMsg
+    self._nLeavesStats = self.nLeaves
+    if self._filter is not None:
+      s += ", " +self._filter.getStatsStr()
+    s += "\n  outbound: " +self.Out.getStatsStr()
+    if self.DB is not None:
+      s += "\n  database: " +self.DB.getStatsStr()
+    return s
 
 # ---------------------------------------------------------------------
 def parseCmdLn():
   from argparse import ArgumentParser
   parser = ArgumentParser()
   parser.add_argument('-g', '--guid', type=str, default="")
+  parser.add_argument('-f', '--fleet', action='store_true')
+  parser.add_argument('-a', '--all', action='store_true')
+  parser.add_argument('--rollup', type=str,
+                      default=",".join([str(dt) for dt in ROLLUP_INTERVALS]))
+  parser.add_argument('--db', type=str, default="")
+  parser.add_argument('--queue', type=int, default=PUB_QUEUE_LEN)
+  parser.add_argument('--drop', type=str, default=PUB_DROP_OLDEST,
+                      choices=[PUB_DROP_OLDEST, PUB_DROP_NEWEST,
+                               PUB_DROP_LOWEST])
   return parser.parse_args()
 
-def parseRawMsg(d):
-  for k, v in d.items():
-    if isinstance(v, dict):
-      for p in parseRawMsg(v):
-        yield [k] + p
-    else:
-      yield [k, v]
+async def main(core, relay):
+  # Run ingest core and publisher, complete rolled-up streams and report
+  # throughput periodically
+  task = asyncio.create_task(core.run())
+  pub = asyncio.create_task(relay.Out.run())
+  tStats = time.time()
+  try:
+    while not task.done():
+      await asyncio.sleep(ROLLUP_FLUSH_S)
+      relay.flush()
+      if time.time() -tStats > STATS_INTERVAL_S:
+        tStats = time.time()
+        print(relay.getStatsStr())
+  finally:
+    pub.cancel()
+    core.stop()
+    await task
 
 # ---------------------------------------------------------------------
 if __name__ == '__main__':
 
-  # Initialize variables
-  Lock = threading.Lock()
-  isConnected = False
-  isNewMsg = False
-  lastMsg = ""
-
   # Check for command line parameter(s)
   args = parseCmdLn()
   MQTT_ROOT_TOPIC = args.guid
-  if len(MQTT_ROOT_TOPIC) == 0:
+  if len(MQTT_ROOT_TOPIC) == 0 and not args.fleet:
     print("No robotling GUID given (parameter --guid or -g)")
 
-  # Create MQTT client
-  Client = mqtt.Client()
-  Client.on_connect = onConnect
-  Client.on_message = onMessage
-  Client.on_disconnect = onDisconnect
+  # Create ingest core and relay all raw messages (of one robotling or,
+  # in fleet mode, of all robotlings)
+  Core = IngestCore(PahoTransport(MQTT_BROKER, MQTT_PORT, MQTT_ALIVE_S))
+  rollups = [float(dt) for dt in args.rollup.split(",") if len(dt) > 0]
+  DB = None
+  if len(args.db) > 0:
+    DB = TelemetryDB(args.db).start()
+  Out = Publisher(Core, args.queue, args.drop, retain=not args.all)
+  if args.all:
+    Relayer = Relay(Core, rollups=rollups, db=DB, publisher=Out)
+  else:
+    Relayer = Relay(Core, ChangeFilter(), rollups=rollups, db=DB,
+                    publisher=Out)
+  Fleet = None
+  if args.fleet:
+    Fleet = HexBugFleet(fOnFrame=Relayer.onFleetFrame)
+    Fleet.attach(Core)
+  else:
+    Core.addHandler(MQTT_ROOT_TOPIC +"/raw", Relayer.onMessage)
 
   try:
-    while True:
-      if not isConnected:
-        # If not connected, try to connect to broker and start the client's
-        # internal loop thread ...
-        try:
-          print("Trying to connect to `{0}` ...".format(MQTT_BROKER))
-          Client.connect(MQTT_BROKER, port=MQTT_PORT, keepalive=MQTT_ALIVE_S)
-          Client.loop_start()
-          isConnected = True
-        except ConnectionRefusedError:
-          time.sleep(0.5)
-      else:
-        # Is connected to broker ...
-        data = None
-        if isNewMsg and len(lastMsg) > 0:
-          try:
-            Lock.acquire()
-            try:
-              # Load data from last message and decode it
-              # (convert it into a dictionary)
-              data = json.loads(str(lastMsg))
-            except:
-              print("Corrupt message")
-          finally:
-            Lock.release()
-            isNewMsg = False
-
-        if data:
-          # New valid data available, resend under "proper" topics
-          for ln in parseRawMsg(data):
-            topic = MQTT_ROOT_TOPIC +"/"
-            msg = str(ln.pop())
-            for j, s in enumerate(ln):
-              if j > 0 and len(ln) > 1:
-                topic += "/"
-              topic += s
-            print(s, msg)  
-            Client.publish(topic, payload=msg, qos=0, retain=False)
-
-      # Sleep for a bit
-      time.sleep(0.05)
-
+    asyncio.run(main(Core, Relayer))
   except KeyboardInterrupt:
     print("User aborted loop")
-
-  # Stop MQTT client and disconnect
-  print("Stop MQTT client loop and disconnect ...")
-  Client.loop_stop()
-  Client.disconnect()
+  if Fleet:
+    Fleet.stop()
+    print(Fleet.getStatsStr())
+  if DB:
+    DB.stop()
+  print(Relayer.getStatsStr())
   print("... done.")
 
 # ---------------------------------------------------------------------
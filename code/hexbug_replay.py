@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# hexbug_replay.py
+# Replays recorded telemetry (see `modules/telemetry_log.py`) without a
+# robot or broker
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, replayed messages carry their recorded time, so that the
+#             target's transit time and clock statistics are those of the
+#             recording; throughput is also reported during replay
+#
+# The recorded messages are passed to `setNewMQTTMsg` of a target (a
+# `HexBug` or a `HexBugFleet`), i.e. they take the same decoding path as
+# live messages. Replay runs in real time (speed 1), N times faster or
+# slower, or as fast as possible (speed 0). Achieved throughput, delay
+# relative to the schedule and frames dropped by the target are reported.
+# If the consumer of the target must see every message (e.g. the GUI when
+# exporting frames), an event can be passed (`evReady`), which the replay
+# waits for before it passes a message (backpressure).
+#
+# Run as script to benchmark decoding, e.g.:
+#   python .\hexbug_replay.py .\logs\session1 --speed 0
+#   python .\hexbug_replay.py .\logs\fleet1 --speed 4 --fleet
+# To benchmark the GUI, see the `--replay` option of `hexbug_gui.py`.
+#
+# ---------------------------------------------------------------------
+import time
+import threading
+import hexbug_mqtt as hx
+import modules.telemetry_log as tlog
+from modules.mqtt_ingest import Message, topicMatches
+
+SLEEP_MIN_S       = 0.001 # Do not sleep for shorter than this
+STATS_INTERVAL_S  = 2.0
+READY_POLL_S      = 0.1   # Check for `stop` while waiting for the consumer
+
+# ---------------------------------------------------------------------
+class ReplayedMessage(Message):
+  """Message with the time at which it was recorded (`tRecorded`, in
+     [s] since the epoch); the target uses it instead of the time of
+     arrival for the robot-to-host transit time and clock offset"""
+  __slots__ = ("tRecorded",)
+
+  def __init__(self, topic, payload, tRecorded):
+    Message.__init__(self, topic, payload)
+    self.tRecorded = tRecorded
+
+# ---------------------------------------------------------------------
+class TelemetryReplay(object):
+  """Feeds the messages of a telemetry log into a target"""
+
+  def __init__(self, log, target, speed=1.0, topic="#", t0=None, t1=None,
+               nLoops=1, evReady=None):
+    """ `log` is a `TelemetryLog` (or the path of a log), `speed` the replay
+        speed (0 = as fast as possible); only messages of which the topic
+        matches `topic` and with a time in [`t0`, `t1`] are replayed.
+        `nLoops` = 0 replays until `stop` is called. If `evReady` (a
+        `threading.Event`) is given, each message is passed only after the
+        event was set (by the consumer, e.g. when it has processed the
+        previous message); the event is then cleared
+    """
+    self.Log = log if isinstance(log, tlog.TelemetryLog) else \
+               tlog.TelemetryLog(log)
+    self.name = "replay of `{0}`".format(self.Log.path)
+    self._target = target
+    self._speed = max(speed, 0)
+    self._topic = topic
+    self._t0 = t0
+    self._t1 = t1
+    self._nLoops = nLoops
+    self._evReady = evReady
+    self._isRunning = False
+    self._thread = None
+    self.isConnected = False  # True from start until stopped (as for a
+    self.isDone = False       # connection of an `IngestCore`)
+    self.nReplayed = 0
+    self.nBytes = 0
+    self.tReady_s = 0.
+    self.tLagMax_s = 0.
+    self.tSpan_s = 0.
+    self.tWall_s = 0.
+    self._tSpanLoop = 0.      # Recorded time replayed in the current loop
+    self._tStart = None
+
+  def start(self):
+    """ Replay in a new (daemon) thread
+    """
+    self._thread = threading.Thread(target=self.run, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    """ Stop replay (can be called from any thread)
+    """
+    self._isRunning = False
+    self.isConnected = False
+    if self._thread is not None and \
+       self._thread is not threading.current_thread():
+      self._thread.join()
+      self._thread = None
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def run(self):
+    """ Replay (blocking)
+    """
+    self._isRunning = True
+    self.isConnected = True
+    if self._evReady is not None:
+      self._evReady.set()
+    self._tStart = time.time()
+    iLoop = 0
+    try:
+      while self._isRunning and (self._nLoops == 0 or iLoop < self._nLoops):
+        self._replayOnce()
+        iLoop += 1
+    finally:
+      self.tWall_s = time.time() -self._tStart
+      self.isDone = True
+
+  def _replayOnce(self):
+    tWall0 = None
+    tLog0 = None
+    tLog = None
+    for t, topic, payload in self.Log.messages(self._t0, self._t1):
+      if not self._isRunning:
+        break
+      if self._topic != "#" and not topicMatches(self._topic, topic):
+        continue
+      if tWall0 is None:
+        tWall0 = time.time()
+        tLog0 = t
+      tLog = t
+      if self._speed > 0:
+        # Wait until the message is due
+        dt = tWall0 +(t -tLog0) /self._speed -time.time()
+        if dt > SLEEP_MIN_S:
+          time.sleep(dt)
+        elif -dt > self.tLagMax_s:
+          self.tLagMax_s = -dt
+      if self._evReady is not None and not self._waitReady():
+        break
+      self._target.setNewMQTTMsg(ReplayedMessage(topic, payload, t))
+      self.nReplayed += 1
+      self.nBytes += len(payload)
+      self._tSpanLoop = tLog -tLog0
+    self._tSpanLoop = 0.
+    if tLog is not None:
+      self.tSpan_s += tLog -tLog0
+
+  def _waitReady(self):
+    # Wait until the consumer is ready for the next message; returns False
+    # if the replay was stopped meanwhile
+    t0 = time.time()
+    while not self._evReady.wait(READY_POLL_S):
+      if not self._isRunning:
+        return False
+    self._evReady.clear()
+    self.tReady_s += time.time() -t0
+    return True
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self):
+    """ Return throughput and drops (so far, if still running) as a string
+    """
+    if self.isDone:
+      tWall = self.tWall_s
+    else:
+      tWall = time.time() -self._tStart if self._tStart is not None else 0
+    rate = self.nReplayed /tWall if tWall > 0 else 0
+    speed = (self.tSpan_s +self._tSpanLoop) /tWall if tWall > 0 else 0
+    s = ("{0} replayed in {1:.1f} s ({2:.0f} msg/s, {3:.2f} MB/s, x{4:.1f}),"
+         " max. lag {5:.0f} ms, {6} dropped".format(
+      self.nReplayed, tWall, rate, self.nBytes /1E6 /tWall if tWall else 0,
+      speed, self.tLagMax_s *1000, getattr(self._target, "nDropped", 0)))
+    if self._evReady is not None:
+      s += ", {0:.1f} s waiting for consumer".format(self.tReady_s)
+    return s
+
+# ---------------------------------------------------------------------
+def parseCmdLn():
+  from argparse import ArgumentParser
+  parser = ArgumentParser()
+  parser.add_argument('log', type=str)
+  parser.add_argument('-s', '--speed', type=float, default=1.0)
+  parser.add_argument('-g', '--guid', type=str, default="")
+  parser.add_argument('-f', '--fleet', action='store_true')
+  parser.add_argument('-n', '--loops', type=int, default=1)
+  return parser.parse_args()
+
+# ---------------------------------------------------------------------
+if __name__ == '__main__':
+
+  # Check for command line parameter(s)
+  args = parseCmdLn()
+
+  # Create target (one robot or a fleet) and replay; the decoded messages
+  # are consumed periodically, as the GUI would do
+  if args.fleet:
+    from hexbug_fleet import HexBugFleet
+    Target = HexBugFleet(isVerbose=False)
+    robots = lambda: [m.robot for m in Target.members]
+  else:
+    Target = hx.HexBug(isVerbose=False)
+    robots = lambda: [Target]
+  topic = args.guid +"/raw" if len(args.guid) > 0 else "#"
+  Replay = TelemetryReplay(args.log, Target, args.speed, topic,
+                           nLoops=args.loops).start()
+  print("Replaying {0} ({1:.1f} s) at speed {2} ...".format(
+    Replay.name, Replay.Log.tLast -Replay.Log.tFirst, args.speed))
+
+  try:
+    tStats = time.time()
+    while not Replay.isDone:
+      time.sleep(0.05)
+      for r in robots():
+        r.processMQTTMsgs()
+      if time.time() -tStats > STATS_INTERVAL_S:
+        tStats = time.time()
+        print("{0} replayed ...".format(Replay.nReplayed))
+
+  except KeyboardInterrupt:
+    print("User aborted replay")
+
+  Replay.stop()
+  if args.fleet:
+    Target.stop()
+  print(Target.getStatsStr())
+  print(Replay.getStatsStr())
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# frame_export.py
+# Export of the window content as PNG snapshots or as a raw video stream
+# at a fixed frame rate
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# `tick` is called after each redraw with the session time of the shown
+# content (e.g. the robot's timestamp of the latest message), not with
+# the wall time; hence, replayed sessions can be exported faster (or
+# slower) than real time. Gaps in the session time are limited to
+# `EXPORT_GAP_MAX_S` and time jumping back (e.g. after a reboot of the
+# robot) is ignored.
+#
+# PNG snapshots are written into a directory as `frame_<index>.png`,
+# whenever a new frame is due. A raw stream (RGB, 8 bit per channel,
+# no header) is written into a file or a named pipe; missed frames are
+# filled with the last frame to keep the frame rate constant. Such a
+# stream can be converted into a video, for example:
+#   ffmpeg -f rawvideo -pix_fmt rgb24 -s 604x606 -r 10 -i session.raw
+#          -vf pad=ceil(iw/2)*2:ceil(ih/2)*2 session.mp4
+#
+# ---------------------------------------------------------------------
+import os
+import time
+import pygame
+
+EXPORT_FPS       = 10     # Frames per second of session time
+EXPORT_GAP_MAX_S = 2.0    # Longer gaps in session time are shortened
+
+# ---------------------------------------------------------------------
+class FrameExporter(object):
+  """Writes a surface as PNG snapshots or raw RGB frames"""
+
+  def __init__(self, surf, path, fps=EXPORT_FPS, isRaw=False):
+    """ `surf` is the surface to export (e.g. `Window.surface`); `path` is
+        a directory for PNG snapshots or, with `isRaw`, the file (or
+        named pipe) for the raw stream
+    """
+    self._surf = surf
+    self.path = path
+    self.fps = fps
+    self.isRaw = isRaw
+    self._file = None
+    self._frame = None
+    self._tLast = None
+    self.tSession_s = 0.
+    self.nFrames = 0
+    self.nWritten = 0
+    self.nBytes = 0
+    self.dtWrite_s = 0.
+    if isRaw:
+      self._file = open(path, "wb")
+    else:
+      os.makedirs(path, exist_ok=True)
+
+  def close(self):
+    """ Close the raw stream
+    """
+    if self._file is not None:
+      self._file.close()
+      self._file = None
+
+  @property
+  def size(self):
+    return self._surf.get_size()
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def tick(self, t):
+    """ Export the surface if a frame is due at session time `t` [s];
+        returns the number of frames written
+    """
+    if self._tLast is not None:
+      self.tSession_s += min(max(t -self._tLast, 0), EXPORT_GAP_MAX_S)
+    self._tLast = t
+    iFrame = int(self.tSession_s *self.fps)
+    if iFrame < self.nFrames:
+      return 0
+
+    t0 = time.time()
+    if self.isRaw:
+      # Repeat the previous frame for frames that were missed, then
+      # write the current one
+      for _ in range(iFrame -self.nFrames):
+        self._write(self._frame)
+      self._frame = pygame.image.tostring(self._surf, "RGB")
+      self._write(self._frame)
+      n = iFrame -self.nFrames +1
+    else:
+      fName = os.path.join(self.path, "frame_{0:06d}.png".format(iFrame))
+      pygame.image.save(self._surf, fName)
+      n = 1
+    self.nFrames = iFrame +1
+    self.nWritten += n
+    self.dtWrite_s += time.time() -t0
+    return n
+
+  def _write(self, frame):
+    if frame is not None:
+      self._file.write(frame)
+      self.nBytes += len(frame)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self):
+    """ Return statistics as a string
+    """
+    dt = self.dtWrite_s /self.nWritten *1000 if self.nWritten > 0 else 0
+    s = "{0} frames ({1}x{2} @ {3} fps, {4:.1f} s), {5:.1f} ms/frame".format(
+      self.nWritten, *self.size, self.fps, self.tSession_s, dt)
+    if self.isRaw:
+      s += ", {0:.1f} MB".format(self.nBytes /1E6)
+    return s
+
+# ---------------------------------------------------------------------
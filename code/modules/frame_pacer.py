@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# frame_pacer.py
+# Render scheduler for the GUI: caps the frame rate, waits for new data
+# (or a timeout) and reduces the update rate of expensive widgets if a
+# frame takes longer than its budget
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# A frame is started with `wait`, which returns at the earliest
+# 1/`fpsMax` seconds after the previous frame was started and then as
+# soon as the wake event is set (e.g. by the thread that decodes the
+# messages) or `tWait_s` has passed. The frame is ended with `done`.
+#
+# The duration of the frames is smoothed; if it exceeds the budget, the
+# degradation level is increased by one, and expensive widgets are only
+# updated every (level+1)-th frame (see `isFullFrame`). If it falls below
+# half of the budget, the level is decreased again. After a change, the
+# average is reset to 3/4 of the budget. With `fpsMax` = 0, the frame
+# rate is not limited and there is no degradation.
+#
+# ---------------------------------------------------------------------
+import time
+import threading
+
+PACE_FPS_MAX     = 30     # Maximal frame rate
+PACE_WAIT_S      = 0.25   # Maximal time to wait for new data in [s]
+PACE_LEVEL_MAX   = 7      # Highest degradation level
+PACE_SMOOTH      = 0.1    # Weight of a new frame time in the average
+PACE_STATS_S     = 2.0    # Interval for frame rate and CPU use in [s]
+
+# ---------------------------------------------------------------------
+class FramePacer(object):
+  """Frame rate cap, wake-up on new data and adaptive degradation"""
+
+  def __init__(self, fpsMax=PACE_FPS_MAX, tWait_s=PACE_WAIT_S, evWake=None,
+               levelMax=PACE_LEVEL_MAX):
+    self.evWake = evWake if evWake is not None else threading.Event()
+    self.dtMin_s = 1. /fpsMax if fpsMax > 0 else 0.
+    self.tWait_s = max(tWait_s, self.dtMin_s)
+    self.levelMax = levelMax
+    self.level = 0
+    self.nFrames = 0
+    self.nWoken = 0
+    self.nSkipped = 0
+    self.dtFrame_s = 0.
+    self.fps = 0.
+    self.cpu = 0.
+    self.cpuThread = 0.
+    self._tFrame = 0.
+    self._stats0 = self._getTimes()
+    self._statsAll = self._stats0
+
+  def _getTimes(self):
+    return (time.time(), time.process_time(), time.thread_time(),
+            self.nFrames)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def wait(self):
+    """ Wait for the next frame; returns True if new data was signalled
+        via the wake event and False if the wait timed out
+    """
+    t = time.time()
+    if t < self._tFrame +self.dtMin_s:
+      time.sleep(self._tFrame +self.dtMin_s -t)
+    isNew = self.evWake.wait(max(self._tFrame +self.tWait_s -time.time(), 0))
+    self.evWake.clear()
+    self.nWoken += int(isNew)
+    self._tFrame = time.time()
+    return isNew
+
+  def isFullFrame(self):
+    """ Returns True if expensive widgets are to be updated in the current
+        frame, which depends on the degradation level
+    """
+    isFull = self.nFrames %(self.level +1) == 0
+    self.nSkipped += int(not isFull)
+    return isFull
+
+  def done(self):
+    """ End the current frame; adjusts the degradation level and updates
+        the frame rate and CPU use every `PACE_STATS_S` seconds
+    """
+    t = time.time()
+    dt = t -self._tFrame
+    self.dtFrame_s += (dt -self.dtFrame_s) *PACE_SMOOTH
+    if self.dtMin_s == 0:
+      pass
+    elif self.dtFrame_s > self.dtMin_s and self.level < self.levelMax:
+      self.level += 1
+      self.dtFrame_s = self.dtMin_s *3/4
+    elif self.dtFrame_s < self.dtMin_s /2 and self.level > 0:
+      self.level -= 1
+      self.dtFrame_s = self.dtMin_s *3/4
+    self.nFrames += 1
+    if t -self._stats0[0] >= PACE_STATS_S:
+      stats = self._getTimes()
+      self.fps, self.cpu, self.cpuThread = self._getRates(self._stats0, stats)
+      self._stats0 = stats
+
+  def _getRates(self, s0, s1):
+    dt = s1[0] -s0[0]
+    if dt <= 0:
+      return 0., 0., 0.
+    return ((s1[3] -s0[3]) /dt, (s1[1] -s0[1]) /dt *100,
+            (s1[2] -s0[2]) /dt *100)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self, isTotal=False):
+    """ Return frame rate, CPU use of the process (all threads) and of
+        the rendering thread, and the degradation level as a string; with
+        `isTotal`, averages since the pacer was created are returned
+    """
+    if isTotal:
+      fps, cpu, cpuThr = self._getRates(self._statsAll, self._getTimes())
+      return ("{0} frames @ {1:.1f} fps ({2} on new data), CPU {3:.0f}% "
+              "(GUI {4:.0f}%), {5} partial frames".format(
+              self.nFrames, fps, self.nWoken, cpu, cpuThr, self.nSkipped))
+    return "{0:.1f} fps, CPU {1:.0f}% (GUI {2:.0f}%), level {3}".format(
+      self.fps, self.cpu, self.cpuThread, self.level)
+
+# ---------------------------------------------------------------------
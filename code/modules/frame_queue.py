@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# frame_queue.py
+# Bounded, thread-safe ring queue for received telemetry frames
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# ---------------------------------------------------------------------
+import threading
+
+# Overflow policies
+DROP_OLDEST      = 0   # Overwrite the oldest queued frame
+DROP_NEWEST      = 1   # Reject the incoming frame
+COALESCE         = 2   # Merge the incoming frame into the newest queued one
+
+PolicyStr = dict([
+  (DROP_OLDEST,  "drop-oldest"),
+  (DROP_NEWEST,  "drop-newest"),
+  (COALESCE,     "coalesce")])
+
+# ---------------------------------------------------------------------
+class FrameQueue(object):
+  """Ring queue of frames with a fixed capacity and an overflow policy.
+     Frames are put by the network thread and drained in batches by the
+     consumer (e.g. the GUI)."""
+
+  def __init__(self, n, policy=DROP_OLDEST, fCoalesce=None):
+    """ `n` is the capacity; `fCoalesce(old, new)` returns the merged frame
+        if `policy` is COALESCE (default: the new frame replaces the old one)
+    """
+    self._nMax = max(n, 1)
+    self._buf = [None] *self._nMax
+    self._iHead = 0
+    self._n = 0
+    self._policy = policy
+    self._fCoalesce = fCoalesce
+    self._Lock = threading.Lock()
+    self.reset()
+
+  def reset(self):
+    """ Reset counters (not the queue content)
+    """
+    self.nPut = 0
+    self.nDropped = 0
+    self.nCoalesced = 0
+    self.highWater = 0
+
+  def clear(self):
+    """ Remove all queued frames
+    """
+    with self._Lock:
+      self._buf = [None] *self._nMax
+      self._iHead = 0
+      self._n = 0
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def put(self, frame):
+    """ Add a frame; returns False if a frame was lost due to an overflow
+    """
+    with self._Lock:
+      self.nPut += 1
+      if self._n < self._nMax:
+        self._buf[(self._iHead +self._n) % self._nMax] = frame
+        self._n += 1
+        self.highWater = max(self.highWater, self._n)
+        return True
+
+      # Queue is full, apply overflow policy
+      self.nDropped += 1
+      if self._policy == DROP_NEWEST:
+        pass
+      elif self._policy == COALESCE:
+        i = (self._iHead +self._n -1) % self._nMax
+        if self._fCoalesce:
+          frame = self._fCoalesce(self._buf[i], frame)
+        self._buf[i] = frame
+        self.nCoalesced += 1
+      else:
+        self._buf[self._iHead] = frame
+        self._iHead = (self._iHead +1) % self._nMax
+      return False
+
+  def get(self):
+    """ Remove and return the oldest frame or `None`, if queue is empty
+    """
+    with self._Lock:
+      if self._n == 0:
+        return None
+      frame = self._buf[self._iHead]
+      self._buf[self._iHead] = None
+      self._iHead = (self._iHead +1) % self._nMax
+      self._n -= 1
+      return frame
+
+  def drain(self, nMax=0):
+    """ Remove and return all (or the `nMax` oldest) frames as a list,
+        oldest first
+    """
+    with self._Lock:
+      n = self._n if nMax <= 0 else min(nMax, self._n)
+      frames = [None] *n
+      for j in range(n):
+        i = (self._iHead +j) % self._nMax
+        frames[j] = self._buf[i]
+        self._buf[i] = None
+      self._iHead = (self._iHead +n) % self._nMax
+      self._n -= n
+      return frames
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def __len__(self):
+    return self._n
+
+  @property
+  def capacity(self):
+    return self._nMax
+
+  @property
+  def policy(self):
+    return self._policy
+
+  def getStatsStr(self):
+    """ Return queue statistics as a string
+    """
+    return "{0} dropped ({1}), max. {2}/{3}".format(
+      self.nDropped, PolicyStr[self._policy], self.highWater, self._nMax)
+
+# ---------------------------------------------------------------------
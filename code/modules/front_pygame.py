@@ -9,11 +9,39 @@
 # 2019-05-01, v1
 # 2019-08-03, `WidgetCamera` added
 # 2020-09-27, small bug fixes
+# 2026-10-17, `WidgetCamera` indicates images that are not valid (e.g.
+#             missing keyframe)
+# 2026-10-17, widgets are only redrawn if their content changed and only
+#             the redrawn parts of the window are updated (dirty rects)
+# 2026-10-17, static content of widgets (background, labels, scales) is
+#             pre-rendered into an off-screen layer
+# 2026-10-17, rendered texts are kept in an LRU cache (`TextCache`)
+# 2026-10-17, `WidgetPlot.plot` scales data with numpy and reduces time
+#             series longer than the plot width to per-pixel min/max
+# 2026-10-17, `WidgetCamera` renders images with preallocated buffers and
+#             a palette look-up table; the scaled image is reused until a
+#             new image arrives (also fixes the removed `np.float`)
+# 2026-10-17, `Window.setCaption` adds a text to the window title
+# 2026-10-17, headless mode (`isHeadless`): the window content is drawn
+#             into an off-screen surface using SDL's dummy video driver
+# 2026-10-17, optional profiling (`Window.Profiler`, a `RenderProfiler`)
+#             of widget drawing and display updates; `TextOverlay` shows
+#             text on top of the widgets
+# 2026-10-17, compact per-robot panel (`WidgetRobotPanel`) for a fleet
+#             dashboard; color palettes and cone geometry are computed
+#             once per module, static layers can be shared by widgets
+#             of the same kind (`isLayerShared`)
+# 2026-10-17, `WidgetDistanceArray` scales precomputed cone directions by
+#             the distances; `WidgetCompass` rotates a precomputed needle
+# 2026-10-17, `WidgetCamera` is only redrawn (and its image only rendered
+#             and scaled again) if image, size or blobs changed
 #
 # ---------------------------------------------------------------------
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 
+import time
+from collections import OrderedDict
 import numpy as np
 import matplotlib.pyplot as plt
 import pygame
@@ -43,10 +71,16 @@ WG_PLT_LBL_WIDTH = WG_STATUS_WIDTH //5
 WG_PLT_LN_THICK  = 1
 WG_ANTIALIAS_TXT = True
 WG_IRCAM_PALETTE = "inferno"
+WG_TXT_CACHE_LEN = 1024      # Maximal number of cached text surfaces ...
+WG_TXT_CACHE_KB  = 8192      # ... and their maximal total size in [kB]
 IS_OK            = 0
 IS_WARN          = 1
 IS_DANGER        = 2
 
+WG_PANEL_ARC_N   = 6         # Number of points per cone arc
+WG_PANEL_DIST_MAX= 40        # Distance [cm] shown as full cone length
+WG_PANEL_THUMB   = 64        # Size of thermal camera thumbnail in pixels
+
 # ---------------------------------------------------------------------
 class Color:
   BKG_WIN = (0x09, 0x09, 0x09)
@@ -72,45 +106,191 @@ class Color:
   GOOD1   = (0x00, 0x72, 0x41) #(10, 100, 30)
   GOOD2   = (0x21, 0x83, 0x59) #(20, 200, 60)
 
+# =====================================================================
+# Color palettes and geometry shared by all widgets
+#
+# ---------------------------------------------------------------------
+_palettes = dict()
+_coneDirs = dict()
+
+def getPalette(cmap_name=WG_IRCAM_PALETTE):
+  """ Returns a color palette from matplotlib.pyplot as a pygame palette
+      (list of 256 RGB tuples) and as a look-up table (256x3, uint8)
+  """
+  pal = _palettes.get(cmap_name)
+  if pal is None:
+    cmap = plt.cm.get_cmap(cmap_name)
+    lst = []
+    for i in range(256):
+      rgba = cmap(i/256.)
+      lst.append((rgba[0]*255, rgba[1]*255, rgba[2]*255))
+    pal = _palettes[cmap_name] = (lst, np.array(lst).astype(np.uint8))
+  return pal
+
+def getConeDirs(pos_deg, cone_deg, nArc=WG_PANEL_ARC_N):
+  """ Returns unit vectors (x,y) along the arc of each sensor's cone, with
+      the sensors at angles `pos_deg` (0 = up) and cones `cone_deg` wide,
+      as an array (sensors, `nArc`, 2)
+  """
+  key = (tuple(pos_deg), cone_deg, nArc)
+  dirs = _coneDirs.get(key)
+  if dirs is None:
+    dw = np.radians(cone_deg /2)
+    a = np.radians(np.array(pos_deg, dtype=np.float64) -90)
+    a = a[:,None] -dw +np.arange(nArc) *(dw *2 /(nArc -1))
+    dirs = _coneDirs[key] = np.stack([np.cos(a), np.sin(a)], axis=-1)
+  return dirs
+
+def _isEqual(a, b):
+  # True if `a` and `b` (e.g. lists of blobs or arrays) have equal values
+  try:
+    return bool(np.array_equal(a, b))
+  except ValueError:
+    return False
+
+# =====================================================================
+# Cache for rendered texts
+#
+# ---------------------------------------------------------------------
+class TextCache(object):
+  """Least-recently-used cache of text surfaces, keyed by text, font, color
+     and antialiasing; bounded by the number of surfaces and their size"""
+
+  def __init__(self, nMax=WG_TXT_CACHE_LEN, kBMax=WG_TXT_CACHE_KB):
+    self._nMax = nMax
+    self._nBytesMax = kBMax *1024
+    self._surfs = OrderedDict()
+    self.nBytes = 0
+    self.nHits = 0
+    self.nMisses = 0
+    self.nEvicted = 0
+
+  def clear(self):
+    self._surfs.clear()
+    self.nBytes = 0
+
+  def render(self, txt, font, col, antialias=WG_ANTIALIAS_TXT):
+    """ Returns the surface with `txt` rendered in `font` and color `col`
+    """
+    key = (txt, font, col, antialias)
+    img = self._surfs.get(key)
+    if img is not None:
+      self._surfs.move_to_end(key)
+      self.nHits += 1
+      return img
+    self.nMisses += 1
+    img = font.render(txt, antialias, col)
+    self._surfs[key] = img
+    self.nBytes += img.get_width() *img.get_height() *img.get_bytesize()
+    while len(self._surfs) > self._nMax or \
+          (self.nBytes > self._nBytesMax and len(self._surfs) > 1):
+      _, old = self._surfs.popitem(last=False)
+      self.nBytes -= old.get_width() *old.get_height() *old.get_bytesize()
+      self.nEvicted += 1
+    return img
+
+  def __len__(self):
+    return len(self._surfs)
+
+  @property
+  def hitRate(self):
+    n = self.nHits +self.nMisses
+    return self.nHits /n if n > 0 else 0.
+
+  def getStatsStr(self):
+    """ Return hit rate and size as a string
+    """
+    return "text cache: {0:.1f}% hits, {1} surfaces ({2:.0f} kB), {3} evicted"\
+      .format(self.hitRate *100, len(self._surfs), self.nBytes /1024.,
+              self.nEvicted)
+
 # =====================================================================
 # Window class for widgets
 #
 # ---------------------------------------------------------------------
 class Window(object):
 
-  def __init__(self, pos, size, title="", logo="", font_fact=1.0):
-    """ Initiate pygame and generate a window
+  def __init__(self, pos, size, title="", logo="", font_fact=1.0,
+               isHeadless=False):
+    """ Initiate pygame and generate a window; with `isHeadless`, no
+        window is opened and the content is only drawn into an off-screen
+        surface (`surface`)
     """
+    self.isHeadless = isHeadless
+    if isHeadless:
+      # The video driver must be selected before pygame is initialized
+      os.environ["SDL_VIDEODRIVER"] = "dummy"
     pygame.init()
     self.onEvent = None
+    self.Profiler = None
+    self.Widgets = []
+    self.Layers = dict()
     self._ffact = font_fact
 
     # Get fonts
     w = pygame.display.Info().current_w
     self._fontSm = pygame.font.SysFont(WG_FONT, int(WG_FONT_SIZE1 *self._ffact))
     self._fontLg = pygame.font.SysFont(WG_FONT, int(WG_FONT_SIZE2 *self._ffact))
+    self.TextCache = TextCache()
 
     # Set title and icon, if any
     self.title = title
+    self._caption = title
     pygame.display.set_caption(self.title)
 
     # Calculate size in standard widget sizes and create window
     self._size = [0]*2
     self._size[0] = int((WG_STATUS_WIDTH +WG_DX_SPACE) *size[0])
     self._size[1] = int((WG_STATUS_HEIGHT +WG_DY_SPACE) *size[1])
-    self._surf = pygame.display.set_mode(self._size)
+    if isHeadless:
+      self._surf = pygame.Surface(self._size)
+    else:
+      self._surf = pygame.display.set_mode(self._size)
     #pygame.display.set_mode(flags=pygame.NOFRAME)
     self._surf.fill(Color.BKG_WIN)
 
+    # Screen rectangles redrawn since the last update
+    self._dirtyRects = []
+    self._isFullUpdate = True
+
   def clear(self):
     """ Clear window
     """
     self._surf.fill(Color.BKG_WIN)
+    self._isFullUpdate = True
+
+  def addDirtyRect(self, rect):
+    """ Mark a rectangle of the window as changed
+    """
+    self._dirtyRects.append(pygame.Rect(rect))
 
   def update(self):
-    """ Update the window content
+    """ Update the changed parts of the window content (or all of it, after
+        the window was cleared); returns the number of updated rectangles
     """
-    pygame.display.flip()
+    n = len(self._dirtyRects)
+    t0 = time.perf_counter()
+    if self.isHeadless:
+      # Nothing to show, the off-screen surface is already up to date
+      pass
+    elif self._isFullUpdate:
+      pygame.display.flip()
+    elif n > 0:
+      pygame.display.update(self._dirtyRects)
+    if self.Profiler is not None and not self.isHeadless:
+      self.Profiler.toc("display.update", t0)
+    self._isFullUpdate = False
+    self._dirtyRects = []
+    return n
+
+  def redrawAll(self):
+    """ Clear window and redraw all widgets, e.g. after an overlay was
+        removed
+    """
+    self.clear()
+    for wg in self.Widgets:
+      wg.invalidate()
+      wg.redraw()
 
   def close(self):
     """ Close window and quit pygame
@@ -129,6 +309,14 @@ class Window(object):
   def surface(self):
     return self._surf
 
+  def setCaption(self, txt):
+    """ Show `txt` after the title in the window caption
+    """
+    caption = self.title +" - " +txt if len(txt) > 0 else self.title
+    if caption != self._caption:
+      self._caption = caption
+      pygame.display.set_caption(caption)
+
   def doQuit(self):
     """ Checks if user wants to quit program
     """
@@ -139,18 +327,66 @@ class Window(object):
         self.onEvent(event)
     return False
 
+# =====================================================================
+# Text overlay
+#
+# ---------------------------------------------------------------------
+class TextOverlay(object):
+  """Box with text lines that is drawn on top of the widgets; as it hides
+     parts of them, it must be drawn after the widgets in each round"""
+
+  def __init__(self, win, pos, width):
+    self._win = win
+    self.pos = pos
+    self.width = width
+    self._surf = None
+    self.lines = []
+
+  @property
+  def rectScr(self):
+    if self._surf is None:
+      return pygame.Rect(self.pos, (0, 0))
+    return pygame.Rect(self.pos, self._surf.get_size())
+
+  def setLines(self, lines, col=Color.STD):
+    """ Render the text lines into the box
+    """
+    font = self._win.smFont
+    dy = font.get_linesize()
+    self.lines = lines
+    self._surf = pygame.Surface(
+      (self.width, dy *len(lines) +WG_FR_BD_Y *2), 0, self._win.surface)
+    self._surf.fill(Color.BKG_WIN)
+    pygame.draw.rect(self._surf, Color.STD_LOW, self._surf.get_rect(), 1)
+    for i, txt in enumerate(lines):
+      # Not cached, as the texts are usually changing numbers
+      img = font.render(txt, WG_ANTIALIAS_TXT, col)
+      self._surf.blit(img, (WG_FR_BD_X, WG_FR_BD_Y +i *dy))
+
+  def draw(self):
+    if self._surf is not None:
+      self._win.surface.blit(self._surf, self.pos)
+      self._win.addDirtyRect(self.rectScr)
+
 # =====================================================================
 # Widget Base Class
 #
 # ---------------------------------------------------------------------
 class Widget(object):
+  # If True, widgets of this class with the same size and layer key use the
+  # same static layer (i.e. the layer must not depend on anything else)
+  isLayerShared = False
 
   def __init__(self, win, pos, size, dims=(1,1)):
     """ Initialize widget
     """
     self._win = win
+    self._win.Widgets.append(self)
     self._surf = win.surface
     self._isActive = True
+    self._isDirty = True
+    self._layer = None
+    self._layerKey = None
     self.pos = pos
     self.size = size
     self.dyTxtSm = self.getTextSize("Ag", self._win.smFont)[1]
@@ -213,7 +449,9 @@ class Widget(object):
     return font.size(txt)
 
   def putText(self, txt, pos, font, col):
-    img = font.render(txt, WG_ANTIALIAS_TXT, col)
+    if len(txt) == 0:
+      return
+    img = self._win.TextCache.render(txt, font, col)
     self._surf.blit(img, pos)
 
   def putTextPair(self, label, txt, pos, font, col1, col2):
@@ -239,6 +477,12 @@ class Widget(object):
   def height(self):
     return self.size[1]
 
+  @property
+  def rectScr(self):
+    """ Rectangle covered by the widget on the screen
+    """
+    return pygame.Rect(self.pos, self.size)
+
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def setLabels(self, sHeader, sID, sInfo):
     """ Set basic text labels
@@ -246,6 +490,28 @@ class Widget(object):
     self.txtHeader = sHeader
     self.txtID = sID
     self.txtInfo = sInfo
+    self._isDirty = True
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  @property
+  def isDirty(self):
+    return self._isDirty
+
+  def invalidate(self):
+    """ Mark widget to be redrawn with the next `update`
+    """
+    self._isDirty = True
+
+  def redraw(self):
+    """ Draw widget, if its content changed since it was last drawn
+    """
+    if self._isDirty:
+      if self._win.Profiler is None:
+        self.draw()
+      else:
+        t0 = time.perf_counter()
+        self.draw()
+        self._win.Profiler.toc(self.txtID +".draw", t0)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   @property
@@ -254,7 +520,10 @@ class Widget(object):
 
   @isActive.setter
   def isActive(self, value):
+    if value == self._isActive:
+      return
     self._isActive = value
+    self._isDirty = True
     if value:
       self.colStd = Color.STD
       self.colHigh = Color.HIGH
@@ -266,19 +535,66 @@ class Widget(object):
       self.update()
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def getRects(self):
+    """ Returns the upper-left corner and the rectangle of the widget's
+        background
     """
     xy1 = (self.pos[0] +WG_FR_BD_X, self.pos[1] +WG_FR_BD_Y)
     r1  = [xy1[0], xy1[1], self.size[0] -WG_FR_BD_X, self.size[1] -WG_FR_BD_Y]
+    return xy1, r1
+
+  def getLayerKey(self):
+    """ Returns what the static content depends on; the static layer is
+        rebuilt if this changes
+    """
+    return (self.txtHeader, self.txtID, self.txtInfo, self._isActive)
+
+  def drawStatic(self):
+    """ Draw static content (background, labels, scales, ...); it is drawn
+        once into an off-screen layer, with the widget at position (0,0)
+    """
+    xy1, r1 = self.getRects()
     self.rect(r1, self.colBkg, isFilled=True)
     return xy1, r1
 
+  def _buildLayer(self):
+    if self.isLayerShared:
+      key = (type(self).__name__, tuple(self.size), self.getLayerKey())
+      self._layer = self._win.Layers.get(key)
+      if self._layer is not None:
+        return
+    if self._layer is None:
+      self._layer = pygame.Surface(self.size, 0, self._surf)
+    self._layer.fill(Color.BKG_WIN)
+    surf, pos = self._surf, self.pos
+    self._surf, self.pos = self._layer, (0, 0)
+    try:
+      self.drawStatic()
+    finally:
+      self._surf, self.pos = surf, pos
+    if self.isLayerShared:
+      self._win.Layers[key] = self._layer
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def draw(self):
+    """ Draw widget; the static content is copied from the layer, widgets
+        draw their values on top
+    """
+    key = self.getLayerKey()
+    if self._layer is None or key != self._layerKey:
+      self._buildLayer()
+      self._layerKey = key
+    xy1, r1 = self.getRects()
+    self._surf.blit(self._layer, xy1, (WG_FR_BD_X, WG_FR_BD_Y, r1[2], r1[3]))
+    self._win.addDirtyRect(self.rectScr)
+    self._isDirty = False
+    return xy1, r1
+
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self):
-    """ Update fields and redraw
+    """ Update fields and redraw, if needed
     """
-    self.draw()
+    self.redraw()
 
 # =====================================================================
 # Text Info Widget Class
@@ -305,20 +621,31 @@ class WidgetInfo(Widget):
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self, sInfoLines, cols=[]):
-    """ Update info line(s) and redraw
+    """ Update info line(s) and redraw, if they changed
     """
-    self.Infos = sInfoLines
     if len(cols) == 0:
-      self.Colors = [self.colStd] *len(sInfoLines)
-    else:
+      cols = [self.colStd] *len(sInfoLines)
+    if sInfoLines != self.Infos or cols != self.Colors:
+      self.Infos = sInfoLines
       self.Colors = cols
-    self.draw()
+      self._isDirty = True
+    self.redraw()
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def getInfoLines(self, iLine):
+    txt = self.Infos[iLine] if iLine < len(self.Infos) else "-"
+    return txt.split("\n")
+
+  def getLayerKey(self):
+    # The positions of the labels depend on the number of lines per info
+    nLines = tuple([len(self.getInfoLines(i))
+                    for i in range(len(self.InfoLabels))])
+    return super(WidgetInfo, self).getLayerKey() +(nLines,)
+
+  def drawStatic(self):
+    """ Draw header, ID and info labels
     """
-    xy1, r1 = super(WidgetInfo, self).draw()
+    xy1, r1 = super(WidgetInfo, self).drawStatic()
 
     # Print header and ID
     x1 = xy1[0] +WG_DX_SPACE
@@ -329,10 +656,25 @@ class WidgetInfo(Widget):
 
     for iLine, label in enumerate(self.InfoLabels):
       y1 += self.dyTxtSm +WG_DY_SPACE
-      txt = self.Infos[iLine] if iLine < len(self.Infos) else "-"
-      txt = txt.split("\n")
-      for iTxt, txt1 in enumerate(txt):
-        self.putTextPair(label if iTxt == 0 else "", txt1, (x1, y1),
+      self.putTextPair(label, "", (x1, y1),
+                       self._win.smFont, self.colStd, self.colStd)
+      nTxt = len(self.getInfoLines(iLine))
+      if nTxt > 1:
+        y1 += (self.dyTxtSm +WG_DY_SPACE) *nTxt
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetInfo, self).draw()
+
+    # Print info lines
+    x1 = xy1[0] +WG_DX_SPACE
+    y1 = xy1[1] +WG_DY_SPACE *2 +self.dyTxtSm
+    for iLine in range(len(self.InfoLabels)):
+      y1 += self.dyTxtSm +WG_DY_SPACE
+      txt = self.getInfoLines(iLine)
+      for txt1 in txt:
+        self.putTextPair("", txt1, (x1, y1),
                          self._win.smFont, self.colStd, self.Colors[iLine])
         if len(txt) > 1:
           y1 += self.dyTxtSm +WG_DY_SPACE
@@ -418,12 +760,10 @@ class WidgetStatusBar(WidgetStatus):
     super(WidgetStatusBar, self).__init__(img, pos)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def drawStatic(self):
+    """ Draw header, ID and info text
     """
-    xy1, r1 = super(WidgetStatus, self).draw()
-
-    # Print header, ID and info text
+    xy1, r1 = super(WidgetStatusBar, self).drawStatic()
     x1 = xy1[0] +WG_DX_SPACE
     y1 = xy1[1] +WG_DY_SPACE
     self.putText(self.txtHeader, (x1, y1), self._win.smFont, self.colStd)
@@ -431,7 +771,13 @@ class WidgetStatusBar(WidgetStatus):
     self.putText(self.txtID, (x1, y1), self._win.lgFont, self.colHigh)
     y1 += self.dyTxtSm +WG_DY_SPACE
     self.putText(self.txtInfo, (x1, y1), self._win.smFont, self.colStd)
-    y1 += self.dyTxtSm +WG_DY_SPACE +6
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetStatus, self).draw()
+    x1 = xy1[0] +WG_DX_SPACE
+    y1 = xy1[1] +WG_DY_SPACE *4 +self.dyTxtSm *3 +6
 
     val = self.getValDic(self.barValInd)
     if val == {}:
@@ -463,14 +809,18 @@ class WidgetStatusBar(WidgetStatus):
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self, vals=None):
-    """ Update fields and redraw
+    """ Update fields and redraw, if they changed
     """
     if not vals is None:
       for iVal, val in enumerate(self.vals):
-        if iVal < len(vals):
-          self.vals[iVal]["val"] = vals[iVal]
-      self.barValTxt = self.sValFormat.format(*vals)
-    self.draw()
+        if iVal < len(vals) and val["val"] != vals[iVal]:
+          val["val"] = vals[iVal]
+          self._isDirty = True
+      txt = self.sValFormat.format(*vals)
+      if txt != self.barValTxt:
+        self.barValTxt = txt
+        self._isDirty = True
+    self.redraw()
 
 # =====================================================================
 # Compass Widget Class
@@ -502,10 +852,42 @@ class WidgetCompass(WidgetStatus):
     self.maxAnglePR = maxAnglePR
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def getCentre(self):
+    if self.isFirst:
+      # Calculate some parameters for compass display (relative to the
+      # widget's position)
+      r = int(WG_STATUS_HEIGHT *0.44)
+      self.xyo = (int(WG_FR_BD_X +WG_STATUS_WIDTH *0.45),
+                  int(WG_FR_BD_Y +WG_STATUS_HEIGHT *0.5) -WG_DY_SPACE*2)
+      self.r = r
+      size = self.getTextSize("N", self._win.smFont)
+      self.txOff = int(size[0] /2)
+      self.tyOff = int(size[1] /2)
+
+      # Heading needle (a ring segment of +/-3°) pointing north, as complex
+      # numbers (x +iy) relative to the centre; it is rotated for each
+      # heading (in steps of 1°) only once (see `getNeedle`)
+      da = np.radians(np.linspace(-3, 3, 4))
+      ra = np.array([r -2] *4 +[r -8] *4)
+      self.needle = ra *np.exp(-1j *(np.pi/2 +np.concatenate([da, da[::-1]])))
+      self._needles = dict()
+      self.isFirst = False
+    return (self.pos[0] +self.xyo[0], self.pos[1] +self.xyo[1])
+
+  def getNeedle(self, head):
+    # Needle points (relative to the centre) for heading `head`
+    iHead = int(round(head)) % 360
+    pts = self._needles.get(iHead)
+    if pts is None:
+      z = self.needle *np.exp(1j *np.radians(iHead))
+      pts = np.stack([z.real, z.imag], axis=-1)
+      self._needles[iHead] = pts
+    return pts
+
+  def drawStatic(self):
+    """ Draw header, ID, labels and compass scale
     """
-    xy1, r1 = super(WidgetCompass, self).draw()
+    xy1, r1 = super(WidgetCompass, self).drawStatic()
 
     # Print header, ID and info text
     x1 = xy1[0] +WG_DX_SPACE
@@ -516,54 +898,58 @@ class WidgetCompass(WidgetStatus):
     y1 += self.dyTxtLg +WG_DY_SPACE
 
     x1 += int(WG_STATUS_WIDTH *0.5)
+    for label in ["heading", "roll", "pitch"]:
+      self.putTextPair(label, "", (x1, y1),
+                        self._win.smFont, self.colStd, self.colStd)
+      y1 += self.dyTxtSm +WG_DY_SPACE
+
+    # Draw compass
+    xyo = self.getCentre()
+    self.circle(xyo, self.r, Color.BKG_PLT, width=1)
+    self.line((xyo[0] -10, xyo[1], xyo[0] +10, xyo[1]), Color.BKG_PLT)
+    self.line((xyo[0], xyo[1] -10, xyo[0], xyo[1] +10), Color.BKG_PLT)
+    xy = (xyo[0] -self.txOff, xyo[1] -self.r +1)
+    self.putText("N", xy, self._win.smFont, Color.STD)
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetCompass, self).draw()
+
+    # Print values
+    x1 = xy1[0] +WG_DX_SPACE +int(WG_STATUS_WIDTH *0.5)
+    y1 = xy1[1] +WG_DY_SPACE *3 +self.dyTxtSm +self.dyTxtLg
     txt = "{0:.0f}°".format(self.head)
-    self.putTextPair("heading", txt if self.head >= 0 else "n/a", (x1, y1),
+    self.putTextPair("", txt if self.head >= 0 else "n/a", (x1, y1),
                       self._win.smFont, self.colStd, self.colStd)
     y1 += self.dyTxtSm +WG_DY_SPACE
     txt = "{0:.0f}°".format(self.roll)
-    self.putTextPair("roll", txt, (x1, y1),
+    self.putTextPair("", txt, (x1, y1),
                       self._win.smFont, self.colStd, self.colStd)
     y1 += self.dyTxtSm +WG_DY_SPACE
     txt = "{0:.0f}°".format(self.ptch)
-    self.putTextPair("pitch", txt, (x1, y1),
+    self.putTextPair("", txt, (x1, y1),
                       self._win.smFont, self.colStd, self.colStd)
 
-    if self.isFirst:
-      # Calculate some parameters for compass display
-      r = int(WG_STATUS_HEIGHT *0.44)
-      self.xyo = (int(xy1[0] +WG_STATUS_WIDTH *0.45),
-                  int(xy1[1] +WG_STATUS_HEIGHT *0.5) -WG_DY_SPACE*2)
-      self.ln1 = (self.xyo[0] -10, self.xyo[1], self.xyo[0] +10, self.xyo[1])
-      self.ln2 = (self.xyo[0], self.xyo[1] -10, self.xyo[0], self.xyo[1] +10)
-      self.r = r
-      size = self.getTextSize("N", self._win.smFont)
-      self.txOff = int(size[0] /2)
-      self.tyOff = int(size[1] /2)
-      self.isFirst = False
-
-    # Draw compass
-    self.circle(self.xyo, self.r, Color.BKG_PLT, width=1)
-    self.line(self.ln1, Color.BKG_PLT)
-    self.line(self.ln2, Color.BKG_PLT)
-    xy = (self.xyo[0] -self.txOff, self.xyo[1] -self.r +1)
-    self.putText("N", xy, self._win.smFont, Color.STD)
-
-    ang = (-self.head +90 +360) % 360
-    self.arc(self.xyo, self.r-2, ang-3, ang+3, Color.HIGH, width=6)
-    xc = int(self.xyo[0] +self.roll /180 *self.r)
-    yc = int(self.xyo[1] -self.ptch /180 *self.r)
+    # Draw heading and tilt
+    xyo = self.getCentre()
+    self.polygon(self.getNeedle(self.head) +xyo, Color.HIGH, isFilled=True)
+    xc = int(xyo[0] +self.roll /180 *self.r)
+    yc = int(xyo[1] -self.ptch /180 *self.r)
     ok = abs(self.roll) < self.maxAnglePR and abs(self.ptch) < self.maxAnglePR
     self.circle((xc, yc), 11, Color.GOOD2 if ok else Color.DANGER2, width=1)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self, hpr=None):
-    """ Update legend and redraw
+    """ Update legend and redraw, if the orientation changed
     """
     if not hpr is None:
-      self.head = hpr[0]
-      self.roll = hpr[1]
-      self.ptch = hpr[2]
-    self.draw()
+      if (self.head, self.roll, self.ptch) != tuple(hpr[:3]):
+        self.head = hpr[0]
+        self.roll = hpr[1]
+        self.ptch = hpr[2]
+        self._isDirty = True
+    self.redraw()
 
 # =====================================================================
 # Camera sensor Widget Class
@@ -576,8 +962,11 @@ class WidgetCamera(WidgetStatus):
     """
     self.img = None
     self.imgData = None
+    self.isValid = True
     self.isFirst = True
     self.rot = rotation
+    self._isNewImg = False
+    self._bufKey = None
     self.setValProperties("n/a", "[-]", (0,255))
     width = WG_STATUS_WIDTH
     height = WG_STATUS_HEIGHT *2
@@ -602,12 +991,34 @@ class WidgetCamera(WidgetStatus):
     d["smooth"] = smooth
     d["blobList"] = []
     self.vals = [d]
+    self._isNewImg = True
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self, cmap_name=WG_IRCAM_PALETTE):
-    """ Draw widget
+  def getImageDims(self):
+    # Width and height of the (rotated) image in sensor pixels
+    idx, idy = self.vals[0]["imgSize"]
+    return (idy, idx) if self.rot % 180 == 90 else (idx, idy)
+
+  def getImageOrigin(self, xy1):
+    # Upper-left corner of the image
+    idx = self.getImageDims()[0]
+    pdx = self.vals[0]["pixelSize"][0]
+    ix0 = xy1[0] +int((WG_STATUS_WIDTH -idx*pdx)/2)
+    iy0 = xy1[1] +WG_DY_SPACE *7 +self.dyTxtSm +self.dyTxtLg
+    return ix0, iy0
+
+  def getLayerKey(self):
+    # The color bar is only shown with an image and is placed next to it
+    d = self.vals[0]
+    key = (d["label"], d["unit"], d["min"], d["max"], d["pixelSize"])
+    if not self.img is None:
+      key += (tuple(d["imgSize"]),)
+    return super(WidgetCamera, self).getLayerKey() +key
+
+  def drawStatic(self):
+    """ Draw header, ID and, if an image is shown, labelled color bar
     """
-    xy1, r1 = super(WidgetCamera, self).draw()
+    xy1, r1 = super(WidgetCamera, self).drawStatic()
 
     # Print header, ID and info text
     #
@@ -616,56 +1027,56 @@ class WidgetCamera(WidgetStatus):
     self.putText(self.txtHeader, (x1, y1), self._win.smFont, self.colStd)
     y1 += self.dyTxtSm +WG_DY_SPACE
     self.putText(self.txtID, (x1, y1), self._win.lgFont, self.colHigh)
-    y1 += self.dyTxtLg +WG_DY_SPACE
 
+    if not self.img is None:
+      # Display color bar and label it
+      ix0, iy0 = self.getImageOrigin(xy1)
+      idx = self.getImageDims()[0]
+      pdx = self.vals[0]["pixelSize"][0]
+      imin = self.vals[0]["min"]
+      imax = self.vals[0]["max"]
+      self._surf.blit(self.cbar, [ix0 +idx*pdx +WG_DX_SPACE*2, iy0])
+      x1 = ix0 +idx*pdx +WG_DX_SPACE*4 +self.cbar_dxy[0]
+      y1 = iy0 -self.dyTxtSm//2
+      tx = "{0}".format(imax)
+      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
+      y1 += self.cbar_dxy[1]
+      tx = "{0}".format(imin)
+      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
+      y1 -= self.cbar_dxy[1]//2
+      tx = "{0} [{1}]".format(self.vals[0]["label"], self.vals[0]["unit"])
+      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
+
+  def draw(self, cmap_name=WG_IRCAM_PALETTE):
+    """ Draw widget
+    """
     if self.isFirst:
-      # Retrieve a color palette from matplotlib.pyplot and convert it into
-      # a pygame palette
-      cmap = plt.cm.get_cmap(cmap_name)
-      self.pal = []
-      for i in range(256):
-        rgba = cmap(i/256.)
-        self.pal.append((rgba[0]*255, rgba[1]*255, rgba[2]*255))
+      # Retrieve a color palette (as pygame palette and look-up table from
+      # quantized values to RGB)
+      self.pal, self.palLUT = getPalette(cmap_name)
 
       # ... and a color bar
       cb = np.array([v for v in range(256, 0, -1)], dtype=np.uint8)
 
       self.cbar = pygame.image.frombuffer(cb, (1, 256), "P")
-      self.cbar_dxy = (16, int(r1[3]/2))
+      self.cbar_dxy = (16, int((self.size[1] -WG_FR_BD_Y)/2))
       self.cbar = pygame.transform.scale(self.cbar, self.cbar_dxy)
       self.cbar.set_palette(self.pal)
       self.isFirst = False
 
+    xy1, r1 = super(WidgetCamera, self).draw()
+
     # If image data available, show camera image
     if not self.img is None:
       # Define image position and scaling
       idx, idy = self.img.shape
       pdx, pdy = self.vals[0]["pixelSize"]
-      imin = self.vals[0]["min"]
-      imax = self.vals[0]["max"]
-      ix0 = xy1[0] +int((WG_STATUS_WIDTH -idx*pdx)/2)
-      iy0 = y1 +WG_DY_SPACE*4
-
-      # Clip image range and then rescale it to 0..255
-      self.img = np.clip(self.img, imin, imax)
-      self.img -= imin
-      self.img /= imax -imin +1
-      self.img *= 255
-
-      # Convert to bytes and create a pygame surface
-      self.img = np.array(self.img, dtype=np.uint8)
-      image = pygame.image.frombuffer(self.img, (idx, idy), "P")
-      if self.rot != 0:
-        image = pygame.transform.rotate(image, self.rot)
-
-      # Scale surface (image), apply color palette and bit to widget
-      image.set_palette(self.pal)
-      if self.vals[0]["smooth"]:
-        image = image.convert()
-        image = pygame.transform.smoothscale(image, (idx*pdx, idx*pdy))
-      else:
-        image = pygame.transform.scale(image, (idx*pdx, idx*pdy))
-      self._surf.blit(image, [ix0, iy0])
+      ix0, iy0 = self.getImageOrigin(xy1)
+
+      # Render the image only if it changed, then blit it to the widget
+      if self._isNewImg:
+        self.renderImage()
+      self._surf.blit(self._imgScaled, [ix0, iy0])
 
       # Draw blobs, if any
       for iB, blob in enumerate(self.vals[0]["blobList"]):
@@ -682,30 +1093,108 @@ class WidgetCamera(WidgetStatus):
         else:
           self.circle((xb, yb), rb, Color.WARN2, width=1)
 
-      # Display color bar and label it
-      self._surf.blit(self.cbar, [ix0 +idx*pdx +WG_DX_SPACE*2, iy0])
-      x1 = ix0 +idx*pdx +WG_DX_SPACE*4 +self.cbar_dxy[0]
-      y1 = iy0 -self.dyTxtSm//2
-      tx = "{0}".format(imax)
-      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
-      y1 += self.cbar_dxy[1]
-      tx = "{0}".format(imin)
-      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
-      y1 -= self.cbar_dxy[1]//2
-      tx = "{0} [{1}]".format(self.vals[0]["label"], self.vals[0]["unit"])
-      self.putText(tx, (x1, y1), self._win.smFont, self.colStd)
+      # Mark image if it is not valid (e.g. keyframe missing)
+      if not self.isValid:
+        self.putText("no keyframe", (ix0 +WG_DX_SPACE, iy0 +WG_DY_SPACE),
+                     self._win.smFont, Color.DANGER2)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def allocBuffers(self):
+    # (Re)allocate the buffers and surfaces for the current image size and
+    # display properties
+    d = self.vals[0]
+    idx, idy = self.img.shape
+    pdx, pdy = d["pixelSize"]
+    self._bufKey = (self.img.shape, self.rot, d["pixelSize"], d["smooth"])
+    self._imgF = np.empty((idx, idy), dtype=np.float64)
+    self._imgQ = np.empty((idx, idy), dtype=np.uint8)
+
+    # View of the quantized image as surface array (x,y), rotated (counter-
+    # clockwise) in steps of 90°
+    self._imgQView = self._imgQ.reshape(-1).reshape(idy, idx).T
+    if self.rot % 90 == 0:
+      self._imgQView = np.rot90(self._imgQView, (-self.rot //90) % 4)
+    self._imgRGB = np.empty(self._imgQView.shape +(3,), dtype=np.uint8)
+    self._imgSmall = pygame.Surface(self._imgQView.shape, 0, self._surf)
+    if self.rot % 90 == 0:
+      dxy = (self._imgQView.shape[0] *pdx, self._imgQView.shape[1] *pdy)
+    else:
+      dxy = (idx*pdx, idx*pdy)
+    self._imgScaled = pygame.Surface(dxy, 0, self._surf)
+
+  def renderImage(self):
+    """ Quantize image, apply color palette, rotate and scale it
+    """
+    d = self.vals[0]
+    if self._bufKey != (self.img.shape, self.rot, d["pixelSize"], d["smooth"]):
+      self.allocBuffers()
+    imin = d["min"]
+    imax = d["max"]
+
+    # Clip image range and then rescale it to 0..255 (in place)
+    imgF = self._imgF
+    np.clip(self.img, imin, imax, out=imgF)
+    imgF -= imin
+    imgF /= imax -imin +1
+    imgF *= 255
+    np.copyto(self._imgQ, imgF, casting="unsafe")
+
+    # Look up colors and copy them into the (unscaled) surface
+    np.take(self.palLUT, self._imgQView, axis=0, out=self._imgRGB)
+    pygame.surfarray.blit_array(self._imgSmall, self._imgRGB)
+    image = self._imgSmall
+    if self.rot % 90 != 0:
+      image = pygame.transform.rotate(image, self.rot)
+
+    # Scale into the reused output surface
+    dxy = self._imgScaled.get_size()
+    if d["smooth"]:
+      pygame.transform.smoothscale(image, dxy, self._imgScaled)
+    else:
+      pygame.transform.scale(image, dxy, self._imgScaled)
+    self._isNewImg = False
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def update(self, data=None, size=(0,0), blobs=[]):
-    """ Update legend and redraw
+  def update(self, data=None, size=(0,0), blobs=[], isValid=True):
+    """ Update legend and redraw; `isValid` is False if the image could not
+        be reconstructed correctly
     """
+    if isValid != self.isValid:
+      self.isValid = isValid
+      self._isDirty = True
     if not data is None:
-      self.vals[0]["imgSize"] = size
-      self.vals[0]["blobList"] = blobs
-      self.img = np.resize(np.array(data, dtype=np.float), size)
-    else:
+      d = self.vals[0]
+      isNew = self.setImage(data, size)
+      if (isNew or d["imgSize"] is None or
+          tuple(d["imgSize"]) != tuple(size) or
+          not _isEqual(d["blobList"], blobs)):
+        d["imgSize"] = size
+        d["blobList"] = blobs
+        self._isDirty = True
+    elif not self.img is None:
       self.img = None
-    self.draw()
+      self._isDirty = True
+    self.redraw()
+
+  def setImage(self, data, size):
+    # Copy image data into the (reused) image buffer; as `np.resize`, the
+    # data is repeated or truncated to fit the image size. Returns False
+    # if the image did not change (the scaled image is then reused)
+    size = tuple(size)
+    isNew = self.img is None
+    if self.imgData is None or self.imgData.shape != size:
+      self.imgData = np.zeros(size, dtype=np.float64)
+      isNew = True
+    a = np.asarray(data, dtype=np.float64).reshape(-1)
+    buf = self.imgData.reshape(-1)
+    if a.size != buf.size:
+      a = np.resize(a, buf.size)
+    if not isNew and np.array_equal(buf, a):
+      return False
+    buf[:] = a
+    self.img = self.imgData
+    self._isNewImg = True
+    return True
 
 # =====================================================================
 # Distance sensor array Widget Class
@@ -745,12 +1234,17 @@ class WidgetDistanceArray(WidgetStatus):
     d["pos_deg"] = pos_deg
     d["cone_deg"] = cone_deg
     self.vals = [d]
+    self.dirs = getConeDirs(pos_deg, cone_deg) if len(pos_deg) > 0 else None
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def getLayerKey(self):
+    return super(WidgetDistanceArray, self).getLayerKey() +\
+           (len(self.distData) > 0,)
+
+  def drawStatic(self):
+    """ Draw header, ID and, if there is data, the sensor array's base
     """
-    xy1, r1 = super(WidgetDistanceArray, self).draw()
+    xy1, r1 = super(WidgetDistanceArray, self).drawStatic()
 
     # Print header, ID and info text
     #
@@ -759,7 +1253,17 @@ class WidgetDistanceArray(WidgetStatus):
     self.putText(self.txtHeader, (x1, y1), self._win.smFont, self.colStd)
     y1 += self.dyTxtSm +WG_DY_SPACE
     self.putText(self.txtID, (x1, y1), self._win.lgFont, self.colHigh)
-    y1 += self.dyTxtLg +WG_DY_SPACE
+
+    if len(self.distData) > 0:
+      px = int(xy1[0] +self.size[0]/2)
+      py = int(xy1[1] +self.size[1]*5/6)
+      self.circle([px,py], 15, Color.BKG_PLT, width=1) #STD_LOW
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetDistanceArray, self).draw()
+    y1 = xy1[1] +WG_DY_SPACE *3 +self.dyTxtSm +self.dyTxtLg
 
     if self.isFirst:
       # Calculate some parameters for distance array display
@@ -771,27 +1275,23 @@ class WidgetDistanceArray(WidgetStatus):
 
     nDist = len(self.distData)
     if nDist > 0:
-      # Draw IR distance sensors
+      # Draw IR distance sensors; the cones' directions are precomputed
+      # (see `setValProperties`) and scaled by the measured distances
       #
       _d = self.vals[0]
-      dw = np.radians(_d["cone_deg"] /2)
       dx = 18
       px = int(xy1[0] +self.size[0]/2)
       py = int(xy1[1] +self.size[1]*5/6)
-      self.circle([px,py], 15, Color.BKG_PLT, width=1) #STD_LOW
       yTx = y1
+      dirs = self.dirs[:nDist]
+      dst = np.minimum(np.array(self.distData, dtype=np.float64) *1.5,
+                       self.size[1] *2/3)
+      arcs = dirs *(dx +3 +dst[:,None,None]) +(px, py)
+      inner = dirs[:,[0,-1]] *(dx +3) +(px, py)
 
       for iDist, Dist_cm in enumerate(self.distData):
-        pts = []
-        a   = np.radians( _d["pos_deg"][iDist] -90)
-        dst = min(Dist_cm *1.5, self.size[1] *2/3)
-        pts.append(self.calcXY(a-dw, dx +3, px, py))
-        ddw = dw*2 /5.
-        for j in range(6):
-          pts.append(self.calcXY(a-dw +ddw*j, dx +3 +dst, px, py))
-          if j == 1:
-            xTx, _ = self.calcXY(a-dw +ddw*j, dx +3 +dst, px, py)
-        pts.append(self.calcXY(a+dw, dx +3, px, py))
+        pts = np.concatenate([inner[iDist,:1], arcs[iDist], inner[iDist,1:]])
+        xTx = int(arcs[iDist,1,0])
         if Dist_cm < _d["warn"]:
           cPoly = Color.DANGER2
           cTx   = Color.HIGH
@@ -807,11 +1307,201 @@ class WidgetDistanceArray(WidgetStatus):
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self, distData=None):
-    """ Update legend and redraw
+    """ Update legend and redraw, if the distances changed
     """
     if not distData is None:
-      self.distData = distData
-    self.draw()
+      if list(distData) != list(self.distData):
+        self.distData = distData
+        self._isDirty = True
+    self.redraw()
+
+# =====================================================================
+# Compact Robot Panel Widget Class
+#
+# ---------------------------------------------------------------------
+class WidgetRobotPanel(WidgetStatus):
+  """Compact overview of one robot (ID, state, battery, distance sensors,
+     thermal camera thumbnail) in a standard widget size; panels share
+     their static layer, palette and cone geometry"""
+  isLayerShared = True
+
+  def __init__(self, img, pos):
+    """ Initialize widget
+    """
+    self.state = "n/a"
+    self.rate = ""
+    self.battV = None
+    self.battFract = 0.
+    self.battRes = IS_OK
+    self.distData = []
+    self.distRes = []
+    self.img = None
+    self.isValid = True
+    self._isNewImg = False
+    self._thumb = None
+    self.setValProperties()
+    super(WidgetStatus, self).__init__(img, pos,
+                                       (WG_STATUS_WIDTH, WG_STATUS_HEIGHT))
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def setLabels(self, sID):
+    """ Set the ID of the robot (usually its GUID)
+    """
+    super(WidgetStatus, self).setLabels("", sID, "")
+
+  def setValProperties(self, battV=(0, 1), battTresh=(0, 0),
+                       distTresh=(0, 1E6), pos_deg=[], cone_deg=0,
+                       imgRange=(0, 255), cmap_name=WG_IRCAM_PALETTE):
+    """ Set the range of the battery voltage, the warning and danger levels
+        of the battery voltage (`battTresh`) and of the distances
+        (`distTresh`, too close and too far), the directions and width of
+        the distance sensors, and the range of the camera's image values
+    """
+    self.battV_range = battV
+    self.battTresh = battTresh
+    self.distTresh = distTresh
+    self.dirs = getConeDirs(pos_deg, cone_deg) if len(pos_deg) > 0 else None
+    self.imgRange = imgRange
+    self.pal, self.palLUT = getPalette(cmap_name)
+    self._isDirty = True
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getLayout(self, xy1):
+    # Centre of distance array, its inner and maximal radius, and the
+    # upper-left corner of the camera thumbnail
+    x2 = xy1[0] +int(WG_STATUS_WIDTH *0.6)
+    y2 = xy1[1] +WG_STATUS_HEIGHT -WG_FR_BD_Y*3
+    x3 = xy1[0] +WG_STATUS_WIDTH -WG_FR_BD_X*3 -WG_PANEL_THUMB
+    y3 = xy1[1] +(WG_STATUS_HEIGHT -WG_FR_BD_Y -WG_PANEL_THUMB) //2
+    return (x2, y2), 6, WG_STATUS_HEIGHT *0.75, (x3, y3)
+
+  def getBarRect(self, xy1):
+    y1 = xy1[1] +WG_DY_SPACE*3 +self.dyTxtSm +self.dyTxtLg +4
+    return [xy1[0] +WG_DX_SPACE*2, y1,
+            int(WG_STATUS_WIDTH *0.4), self.dyTxtSm +4]
+
+  def getLayerKey(self):
+    # Without the robot's ID, which is drawn with the values
+    return ("", self._isActive)
+
+  def drawStatic(self):
+    """ Draw background, battery bar and thumbnail frames, and the base of
+        the distance array
+    """
+    xy1, r1 = super(WidgetRobotPanel, self).drawStatic()
+    xyo, r0, rMax, xyImg = self.getLayout(xy1)
+    self.rect(self.getBarRect(xy1), Color.BKG_PLT, isFilled=True)
+    self.circle(xyo, r0, Color.BKG_PLT, width=1)
+    self.rect([xyImg[0] -1, xyImg[1] -1, WG_PANEL_THUMB +2,
+               WG_PANEL_THUMB +2], Color.BKG_PLT)
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetRobotPanel, self).draw()
+    xyo, r0, rMax, xyImg = self.getLayout(xy1)
+
+    # ID, state and message rate
+    x1 = xy1[0] +WG_DX_SPACE*2
+    y1 = xy1[1] +WG_DY_SPACE
+    self.putText(self.txtID, (x1, y1), self._win.smFont, self.colStd)
+    y1 += self.dyTxtSm +WG_DY_SPACE
+    self.putText(self.state, (x1, y1), self._win.lgFont, self.colHigh)
+
+    # Battery
+    rb = self.getBarRect(xy1)
+    if self.battV is not None:
+      col1, col2 = [(Color.GOOD1, Color.GOOD2), (Color.WARN1, Color.WARN2),
+                    (Color.DANGER1, Color.DANGER2)][self.battRes]
+      if not self._isActive:
+        col1, col2 = self.colBkg, Color.B_INACT
+      self.rect(rb, col1, isFilled=True)
+      self.rect([rb[0], rb[1], int(rb[2] *self.battFract), rb[3]], col2,
+                isFilled=True)
+      txt = "{0:.2f}V ({1:.0f}%)".format(self.battV, self.battFract *100)
+      self.putText(txt, (rb[0] +4, rb[1] +2), self._win.smFont, self.colStd)
+    self.putText(self.rate, (x1, rb[1] +rb[3] +WG_DY_SPACE*2),
+                 self._win.smFont, self.colStd)
+
+    # Distance sensors as cones, scaled by the measured distances
+    n = min(len(self.distData), 0 if self.dirs is None else len(self.dirs))
+    if n > 0:
+      d = np.minimum(np.array(self.distData[:n], dtype=np.float64),
+                     WG_PANEL_DIST_MAX) /WG_PANEL_DIST_MAX *(rMax -r0) +r0
+      dirs = self.dirs[:n]
+      arc = dirs *d[:,None,None] +xyo
+      inner = dirs[:,[-1,0]] *(r0 +1) +xyo
+      cols = [Color.GOOD2, Color.WARN2, Color.DANGER2]
+      for i in range(n):
+        col = cols[self.distRes[i]] if self._isActive else self.colStd
+        self.polygon(np.concatenate([arc[i], inner[i]]), col, isFilled=True)
+
+    # Thermal camera thumbnail
+    if self.img is not None:
+      if self._isNewImg:
+        self.renderThumbnail()
+      self._surf.blit(self._thumb, xyImg)
+      if not self.isValid:
+        self.rect([xyImg[0], xyImg[1], WG_PANEL_THUMB, WG_PANEL_THUMB],
+                  Color.DANGER2)
+
+  def renderThumbnail(self):
+    # Quantize image, look up colors and scale it to the thumbnail size;
+    # rotated by 90° as in `WidgetCamera`
+    imin, imax = self.imgRange
+    q = np.clip(self.img, imin, imax)
+    q -= imin
+    q *= 255 /(imax -imin +1)
+    view = np.rot90(q.astype(np.uint8).T, 3)
+    rgb = np.take(self.palLUT, view, axis=0)
+    if self._thumb is None or self._thumbSmall.get_size() != view.shape:
+      self._thumbSmall = pygame.Surface(view.shape, 0, self._surf)
+      self._thumb = pygame.Surface((WG_PANEL_THUMB, WG_PANEL_THUMB), 0,
+                                   self._surf)
+    pygame.surfarray.blit_array(self._thumbSmall, rgb)
+    pygame.transform.scale(self._thumbSmall, self._thumb.get_size(),
+                           self._thumb)
+    self._isNewImg = False
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def update(self, state=None, battV=None, distData=None, img=None,
+             size=(0,0), isValid=True, rate=None):
+    """ Update values and redraw, if they changed; `img` is the camera
+        image as a flat list (`size` = (columns, rows)); values that are
+        `None` keep their previous value
+    """
+    if state is not None and state != self.state:
+      self.state = state
+      self._isDirty = True
+    if rate is not None and rate != self.rate:
+      self.rate = rate
+      self._isDirty = True
+    if battV is not None and battV != self.battV:
+      vmin, vmax = self.battV_range
+      self.battV = battV
+      self.battFract = min(max((battV -vmin) /(vmax -vmin), 0.), 1.)
+      self.battRes = IS_OK
+      if battV < self.battTresh[0]:
+        self.battRes = IS_WARN
+      if battV < self.battTresh[1]:
+        self.battRes = IS_DANGER
+      self._isDirty = True
+    if distData is not None and list(distData) != list(self.distData):
+      self.distData = list(distData)
+      self.distRes = [IS_DANGER if v < self.distTresh[0] else
+                      (IS_WARN if v > self.distTresh[1] else IS_OK)
+                      for v in self.distData]
+      self._isDirty = True
+    if img is not None:
+      idx, idy = size
+      a = np.resize(np.asarray(img, dtype=np.float64).reshape(-1), idx*idy)
+      self.img = a.reshape(idy, idx)
+      self._isNewImg = True
+      self._isDirty = True
+    if isValid != self.isValid:
+      self.isValid = isValid
+      self._isDirty = True
+    self.redraw()
 
 # =====================================================================
 # Plot Widget Class
@@ -863,38 +1553,20 @@ class WidgetPlot(WidgetStatus):
       pass
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def plot (self, rect, _data, lims, col, txt, yTxt, doClear,
-            txtFormat="", _dataX=None, limsX=[-1., 1.]):
-    """ Plots `data` in a subwindow
+  def plotFrame(self, rect, lims, col, txt, yTxt, doClear):
+    """ Draws the static parts of a subwindow (background, label and zero
+        line)
     """
     x1 = rect[0]
     y1 = rect[1]
     dx = rect[2]
     dy = rect[3]
-    data = _data
-    dxBar = dx /float(len(_data))
     vMin = lims[0]
     vMax = lims[1]
-    y0 = y1+dy
-    if not (_dataX is None):
-      dataX = _dataX
-      vXMin = limsX[0]
-      vXMax = limsX[1]
 
     if doClear:
       self.rect(rect, Color.BKG_PLT, isFilled=True)
 
-    pts = []
-    for iVal, val in enumerate(data):
-      val1 = min(max(val, vMin), vMax)
-      pVal = int((val1 -vMin)/(vMax -vMin) *dy)
-      if not(_dataX is None):
-        pX = int((dataX[iVal] -vXMin)/(vXMax -vXMin) *dx)
-      else:
-        pX = int(iVal *dxBar)
-      pX += x1 +2
-      pts.append((pX, y0-pVal))
-
     xTx = x1 +WG_DX_SPACE*3 +dx
     yTx = y1 +WG_DY_SPACE*2 +yTxt
     self.putText(txt, (xTx, yTx), self._win.smFont, col)
@@ -902,77 +1574,138 @@ class WidgetPlot(WidgetStatus):
     pY = dy -int((0 -vMin)/(vMax -vMin) *dy)
     self.line([x1, y1 +pY, x1 +dx -1, y1 +pY], Color.BKG_WIN) #, dash=5)
 
-    if len(pts) > 0:
+  def plot (self, rect, _data, lims, col, txtFormat="", _dataX=None,
+            limsX=[-1., 1.]):
+    """ Plots `data` in a subwindow; if there are more values than pixel
+        columns, each column shows the minimum and maximum of its values
+    """
+    x1 = rect[0]
+    y1 = rect[1]
+    dx = rect[2]
+    dy = rect[3]
+    nVal = len(_data)
+    if nVal == 0:
+      return
+    vMin = lims[0]
+    vMax = lims[1]
+    y0 = y1+dy
+
+    # Clip and scale values to pixel coordinates
+    data = np.asarray(_data, dtype=np.float64)
+    pY = y0 -((np.clip(data, vMin, vMax) -vMin) /(vMax -vMin) *dy)\
+         .astype(np.int32)
+    if not(_dataX is None):
+      vXMin = limsX[0]
+      vXMax = limsX[1]
+      dataX = np.asarray(_dataX, dtype=np.float64)
+      pX = ((dataX -vXMin) /(vXMax -vXMin) *dx).astype(np.int32)
+    else:
+      pX = (np.arange(nVal) *(dx /float(nVal))).astype(np.int32)
+    pX += x1 +2
+
+    if _dataX is None and nVal > dx:
+      # Reduce to the minimum and maximum per pixel column
+      iCol = np.concatenate(([0], np.flatnonzero(np.diff(pX)) +1))
+      pts = np.empty((len(iCol) *2, 2), dtype=np.int32)
+      pts[0::2,0] = pX[iCol]
+      pts[1::2,0] = pX[iCol]
+      pts[0::2,1] = np.minimum.reduceat(pY, iCol)
+      pts[1::2,1] = np.maximum.reduceat(pY, iCol)
+    else:
+      # Skip points that fall onto the same pixel as their predecessor
+      pts = np.stack((pX, pY), axis=1)
+      if nVal > 1:
+        isNew = np.ones(nVal, dtype=bool)
+        isNew[1:] = np.any(pts[1:] != pts[:-1], axis=1)
+        pts = pts[isNew]
+
+    xTx = x1 +WG_DX_SPACE*3 +dx
+    if len(pts) > 1:
       self.polygon(pts, col, isClosed=False)
-      if len(txtFormat) > 0:
-        if not(_dataX is None):
-          vTx = txtFormat.format(val) +", " +txtFormat.format(dataX[iVal])
-        else:
-          vTx = txtFormat.format(val)
-        dxyTx = self.getTextSize(vTx, self._win.smFont)
-        dxTx  = dxyTx[0] +WG_DX_SPACE*3
-        yTx  = pts[iVal-1][1] -WG_DY_SPACE
-        yTx  = min(dy +y1 -dxyTx[1], yTx)
-        self.putText(vTx, (xTx -dxTx, yTx), self._win.smFont, col)
+    if len(txtFormat) > 0:
+      val = _data[-1]
+      if not(_dataX is None):
+        vTx = txtFormat.format(val) +", " +txtFormat.format(_dataX[-1])
+      else:
+        vTx = txtFormat.format(val)
+      dxyTx = self.getTextSize(vTx, self._win.smFont)
+      dxTx  = dxyTx[0] +WG_DX_SPACE*3
+      yTx  = pY[nVal -2] -WG_DY_SPACE
+      yTx  = min(dy +y1 -dxyTx[1], yTx)
+      self.putText(vTx, (xTx -dxTx, yTx), self._win.smFont, col)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-  def draw(self):
-    """ Draw widget
+  def getPlots(self, xy1, r1):
+    """ Yields the subwindow rectangle, the value (and x-axis value) dictionary
+        and index within the subwindow for each value to plot
     """
-    xy1, r1 = super(WidgetPlot, self).draw()
-
-    # Print header, ID and info text
-    #
-    x1 = xy1[0] +WG_DX_SPACE
-    y1 = xy1[1] +WG_DY_SPACE
-    self.putText(self.txtHeader, (x1, y1), self._win.smFont, self.colStd)
-    y1 += self.dyTxtSm +WG_DY_SPACE
-    self.putText(self.txtID, (x1, y1), self._win.lgFont, self.colHigh)
-    y1 += self.dyTxtLg +WG_DY_SPACE
-
-    # Calculate plot rectangle(s)
-    #
+    y1 = xy1[1] +WG_DY_SPACE *3 +self.dyTxtSm +self.dyTxtLg
     dxB = int((r1[2] -WG_DX_SPACE *2) /self.cols)
     dxP = int(dxB -self.dxMaxLabel -WG_DX_SPACE *5)
     dyB = int((r1[3] -(y1 -xy1[1]) -WG_DY_SPACE *8) /self.rows)
     dyP = dyB -WG_DY_SPACE
-    dyTx = np.zeros((self.rows, self.cols), dtype=np.int32)
     for iC in range(self.cols):
       for iR in range(self.rows):
         x11 = r1[0] +WG_DX_SPACE +iC*dxB
         y11 = y1 +WG_DY_SPACE*3 +dyB*iR
         r2 = [x11, y11, dxP, dyP]
+        iPlot = 0
+        for val in self.vals:
+          if not(val["enabled"]) or tuple(val["rowCol"]) != (iR, iC):
+            continue
+          valX = self.vals[val["xAxis"]] if val["xAxis"] >= 0 else None
+          if "data" not in val or (valX is not None and "data" not in valX):
+            continue
+          yield r2, val, valX, iPlot
+          iPlot += 1
+
+  def getLayerKey(self):
+    # Values are only shown once they have data
+    key = tuple([(v["label"], v["unit"], v["min"], v["max"], v["enabled"],
+                  "data" in v) for v in self.vals])
+    return super(WidgetPlot, self).getLayerKey() +key
+
+  def drawStatic(self):
+    """ Draw header, ID and the subwindows' background and labels
+    """
+    xy1, r1 = super(WidgetPlot, self).drawStatic()
+
+    # Print header, ID and info text
+    #
+    x1 = xy1[0] +WG_DX_SPACE
+    y1 = xy1[1] +WG_DY_SPACE
+    self.putText(self.txtHeader, (x1, y1), self._win.smFont, self.colStd)
+    y1 += self.dyTxtSm +WG_DY_SPACE
+    self.putText(self.txtID, (x1, y1), self._win.lgFont, self.colHigh)
+
+    for r2, val, valX, iPlot in self.getPlots(xy1, r1):
+      txt = "{0} [{1}]".format(val["label"], val["unit"])
+      self.plotFrame(r2, [val["min"], val["max"]], val["color"], txt,
+                     iPlot *(self.dyTxtSm +WG_DY_SPACE), iPlot == 0)
+
+  def draw(self):
+    """ Draw widget
+    """
+    xy1, r1 = super(WidgetPlot, self).draw()
 
-        for i, val in enumerate(self.vals):
-          try:
-            if not(val["enabled"]):
-              continue
-            if (val["rowCol"][0] == iR) and (val["rowCol"][1] == iC):
-              data = val["data"]
-              txt = "{0} [{1}]".format(val["label"], val["unit"])
-              lim = [val["min"], val["max"]]
-              dataX = None
-              limX  = [-1., 1.]
-              if val["xAxis"] >= 0:
-                valX = self.vals[val["xAxis"]]
-                dataX = valX["data"]
-                limX = [valX["min"], valX["max"]]
-              self.plot(r2, data, lim, val["color"], txt, dyTx[iR][iC],
-                        True if dyTx[iR][iC]==0 else False,
-                        txtFormat=val["format"],
-                        _dataX=dataX, limsX=limX)
-              dyTx[iR][iC] += self.dyTxtSm +WG_DY_SPACE
-          except KeyError:
-            pass
+    for r2, val, valX, iPlot in self.getPlots(xy1, r1):
+      dataX = None
+      limX  = [-1., 1.]
+      if valX is not None:
+        dataX = valX["data"]
+        limX = [valX["min"], valX["max"]]
+      self.plot(r2, val["data"], [val["min"], val["max"]], val["color"],
+                txtFormat=val["format"], _dataX=dataX, limsX=limX)
 
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def update(self, valArrays=None):
-    """ Update fields and redraw
+    """ Update fields and redraw, if new data is given
     """
     if not valArrays is None:
       for iVal, val in enumerate(valArrays):
         if iVal < len(valArrays):
           self.vals[iVal]["data"] = valArrays[iVal]
-    self.draw()
+      self._isDirty = True
+    self.redraw()
 
 # ---------------------------------------------------------------------
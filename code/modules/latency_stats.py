@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# latency_stats.py
+# Latency histograms, sequence number tracking and clock offset
+# estimation for received telemetry
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# ---------------------------------------------------------------------
+import math
+from collections import deque
+
+HIST_MIN_MS      = 0.01   # Range of latency histograms in [ms]
+HIST_MAX_MS      = 1E5
+HIST_BINS_DEC    = 20     # Bins per decade (~12% resolution)
+
+OFFS_WINDOW      = 256    # Number of samples for the clock offset
+OFFS_RESET_S     = 1.0    # Robot time jumping back by more = reboot
+
+# ---------------------------------------------------------------------
+class LatencyHistogram(object):
+  """Histogram with logarithmic bins for latencies in [ms]; percentiles
+     are returned as the geometric centre of the respective bin"""
+
+  def __init__(self, minMs=HIST_MIN_MS, maxMs=HIST_MAX_MS,
+               nBinsDec=HIST_BINS_DEC):
+    self._lgMin = math.log10(minMs)
+    self._nPerDec = nBinsDec
+    self._nBins = int(math.ceil((math.log10(maxMs) -self._lgMin) *nBinsDec))
+    self.reset()
+
+  def reset(self):
+    self._counts = [0] *(self._nBins +2)
+    self.n = 0
+    self.maxMs = 0.
+
+  def add(self, ms):
+    """ Add a latency sample in [ms]; samples outside of the range are
+        counted in the first/last bin
+    """
+    if ms > 0:
+      i = int((math.log10(ms) -self._lgMin) *self._nPerDec) +1
+      i = 0 if i < 0 else self._nBins +1 if i > self._nBins +1 else i
+    else:
+      i = 0
+    self._counts[i] += 1
+    self.n += 1
+    if ms > self.maxMs:
+      self.maxMs = ms
+
+  def percentile(self, p):
+    """ Returns the `p`-th percentile (0..100) in [ms] or `None`, if empty
+    """
+    if self.n == 0:
+      return None
+    nMin = p /100. *self.n
+    nSum = 0
+    for i, c in enumerate(self._counts):
+      nSum += c
+      if nSum >= nMin and nSum > 0:
+        break
+    if i == 0:
+      return 0.
+    if i > self._nBins:
+      return self.maxMs
+    return min(10**(self._lgMin +(i -0.5) /self._nPerDec), self.maxMs)
+
+  def percentiles(self, ps=(50, 95, 99)):
+    return [self.percentile(p) for p in ps]
+
+# ---------------------------------------------------------------------
+class SeqTracker(object):
+  """Detects lost, reordered and duplicate messages from (wrapping)
+     sequence numbers"""
+
+  def __init__(self, nBits=16):
+    self._mod = 1 << nBits
+    self.reset()
+
+  def reset(self):
+    self._last = None
+    self.nLost = 0
+    self.nReordered = 0
+    self.nDuplicate = 0
+
+  def update(self, seq):
+    """ Account for a received sequence number; returns the number of
+        messages missing before this one (-1 for a late or duplicate one)
+    """
+    if self._last is None:
+      self._last = seq
+      return 0
+    d = (seq -self._last) % self._mod
+    if d == 0:
+      self.nDuplicate += 1
+      return -1
+    if d < self._mod //2:
+      # In order, possibly after a gap
+      self._last = seq
+      self.nLost += d -1
+      return d -1
+    # Older than the latest message, i.e. it arrived late and was already
+    # counted as lost
+    self.nReordered += 1
+    if self.nLost > 0:
+      self.nLost -= 1
+    return -1
+
+# ---------------------------------------------------------------------
+class ClockOffset(object):
+  """Estimates the offset between robot and host clock as the minimum of
+     `tHost -tRobot` over the last `n` messages. Without synchronized
+     clocks, the transit latency is thereby measured relative to the
+     fastest recent message (i.e. it excludes the minimal transit time)"""
+
+  def __init__(self, n=OFFS_WINDOW):
+    self._n = n
+    self.reset()
+
+  def reset(self):
+    self._mins = deque()
+    self._i = 0
+    self._tRobot = None
+    self.offset = None
+    self.nResets = 0
+
+  def update(self, tRobot, tHost):
+    """ Add a pair of timestamps (in [s]); returns the current offset
+    """
+    if self._tRobot is not None and tRobot < self._tRobot -OFFS_RESET_S:
+      # Robot clock was restarted
+      self._mins.clear()
+      self.nResets += 1
+    self._tRobot = tRobot
+    dt = tHost -tRobot
+    mins = self._mins
+    while len(mins) > 0 and mins[-1][1] >= dt:
+      mins.pop()
+    mins.append((self._i, dt))
+    while mins[0][0] <= self._i -self._n:
+      mins.popleft()
+    self._i += 1
+    self.offset = mins[0][1]
+    return self.offset
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,561 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# mqtt_ingest.py
+# asyncio-based ingest of MQTT telemetry messages
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, `IngestCore.publish` can be called from any thread
+# 2026-10-17, `publishMany` to publish a batch of messages at once
+# 2026-10-17, `nPending`, the number of packets waiting to be written
+# 2026-10-17, `PahoTransport` connects in an executor thread (the event
+#             loop is not blocked); failing handlers are counted
+# 2026-10-17, `PahoTransport` tracks published messages until the client
+#             reports them as sent (`on_publish`); `waitWritable` lets a
+#             publisher wait for a connection and for sent messages
+#
+# `IngestCore` receives messages from a transport (`PahoTransport` for a
+# real broker, `LocalBroker` as an in-process stand-in, e.g. for tests or
+# replay) and delivers each message to the matching subscriptions. Every
+# subscription has a bounded queue; if a consumer falls behind, the core
+# stops reading from the transport (backpressure) instead of dropping or
+# overwriting messages.
+#
+# Note that messages are dispatched in order of arrival: while the queue
+# of one subscription is full, no message is delivered to any other
+# subscription (head-of-line blocking). Consumers that may stall should
+# therefore have their own core (and connection) or a queue long enough
+# to bridge the stall.
+#
+# Usage (in a coroutine):
+#   core = IngestCore(PahoTransport(broker, port, alive_s))
+#   core.addHandler("robotling_b4e62da1dccd/raw", onMsg)
+#   await core.run()
+#
+# ---------------------------------------------------------------------
+import time
+import asyncio
+import threading
+from collections import deque
+
+INBOX_HIGH       = 256 # Stop reading from transport above this many ...
+INBOX_LOW        = 32  # ... and resume below this many pending messages
+RECONNECT_S      = 0.5
+SUB_QUEUE_LEN    = 64
+
+# ---------------------------------------------------------------------
+def topicMatches(pattern, topic):
+  """ Check if `topic` matches the MQTT topic filter `pattern`, which can
+      contain the wildcards `+` (one level) and `#` (all remaining levels)
+  """
+  p = pattern.split("/")
+  t = topic.split("/")
+  for i, s in enumerate(p):
+    if s == "#":
+      return True
+    if i >= len(t) or (s != "+" and s != t[i]):
+      return False
+  return len(p) == len(t)
+
+# ---------------------------------------------------------------------
+class Message(object):
+  """Message as delivered by `LocalBroker` (same attributes as paho's
+     `MQTTMessage` that are used here)"""
+  __slots__ = ("topic", "payload", "timestamp")
+
+  def __init__(self, topic, payload):
+    self.topic = topic
+    self.payload = payload
+    self.timestamp = time.monotonic()
+
+# =====================================================================
+# Transports
+#
+# ---------------------------------------------------------------------
+class LocalBroker(object):
+  """In-process stand-in for an MQTT broker; messages published (from any
+     thread) are delivered to all connected ingest cores with a matching
+     subscription"""
+
+  def __init__(self, name="local"):
+    self.name = name
+    self.isOnline = True
+    self._cores = []
+    self._Lock = threading.RLock()
+
+  # Transport interface
+  async def connect(self, core):
+    if not self.isOnline:
+      return False
+    with self._Lock:
+      self._cores.append([core, asyncio.get_running_loop(), set(), False,
+                          deque()])
+    core._onConnect(True)
+    return True
+
+  async def disconnect(self, core):
+    with self._Lock:
+      self._cores = [c for c in self._cores if c[0] is not core]
+
+  def subscribe(self, core, topic):
+    with self._Lock:
+      for c in self._cores:
+        if c[0] is core:
+          c[2].add(topic)
+
+  def pauseReading(self, core):
+    self._setPaused(core, True)
+
+  def resumeReading(self, core):
+    self._setPaused(core, False)
+
+  def _setPaused(self, core, isPaused):
+    with self._Lock:
+      for c in self._cores:
+        if c[0] is core:
+          c[3] = isPaused
+          while not c[3] and len(c[4]) > 0:
+            core._onMessage(c[4].popleft())
+
+  # Broker
+  def publish(self, topic, payload, qos=0, retain=False):
+    """ Publish a message (thread-safe); `payload` can be bytes or str
+    """
+    if isinstance(payload, str):
+      payload = payload.encode("utf-8")
+    with self._Lock:
+      cores = list(self._cores)
+    for core, loop, topics, _, _ in cores:
+      if any(topicMatches(p, topic) for p in topics):
+        loop.call_soon_threadsafe(self._deliver, core, Message(topic, payload))
+
+  def publishMany(self, msgs, qos=0, retain=False):
+    """ Publish a list of (topic, payload) tuples
+    """
+    for topic, payload in msgs:
+      self.publish(topic, payload, qos, retain)
+
+  def dropConnections(self):
+    """ Disconnect all cores, as if the connection was lost (they then
+        reconnect, unless `isOnline` is False)
+    """
+    with self._Lock:
+      cores = self._cores
+      self._cores = []
+    for core, loop, _, _, _ in cores:
+      loop.call_soon_threadsafe(core._onDisconnect)
+
+  def _deliver(self, core, msg):
+    with self._Lock:
+      for c in self._cores:
+        if c[0] is core and c[3]:
+          c[4].append(msg)
+          return
+    core._onMessage(msg)
+
+# ---------------------------------------------------------------------
+class PahoTransport(object):
+  """Connection to an MQTT broker via paho-mqtt; the client's socket is
+     serviced by the asyncio event loop (no extra network thread). Only
+     the (blocking) connect runs in an executor thread"""
+
+  def __init__(self, broker, port=1883, alive_s=60, clientID=""):
+    import paho.mqtt.client as mqtt
+    self._mqtt = mqtt
+    self.name = broker
+    self._broker = broker
+    self._port = port
+    self._alive_s = alive_s
+    self._client = mqtt.Client(clientID)
+    self._sock = None
+    self._misc = None
+    self._loop = None
+    self._core = None
+    self._isPaused = False
+    self._inFlight = set()
+
+  # Transport interface
+  async def connect(self, core):
+    self._core = core
+    self._loop = asyncio.get_running_loop()
+    c = self._client
+    c.on_connect = self._onConnect
+    c.on_disconnect = self._onDisconnect
+    c.on_message = lambda client, userdata, msg: core._onMessage(msg)
+    c.on_publish = self._onPublish
+    c.on_socket_open = self._onSocketOpen
+    c.on_socket_close = self._onSocketClose
+    c.on_socket_register_write = self._onSocketRegisterWrite
+    c.on_socket_unregister_write = self._onSocketUnregisterWrite
+    try:
+      await self._loop.run_in_executor(None, lambda: c.connect(
+        self._broker, port=self._port, keepalive=self._alive_s))
+      return True
+    except (ConnectionRefusedError, OSError):
+      return False
+
+  def _inLoop(self, func, *args):
+    # Socket callbacks may come from the executor thread during connect
+    if self._isInLoop():
+      func(*args)
+    else:
+      self._loop.call_soon_threadsafe(func, *args)
+
+  def _isInLoop(self):
+    try:
+      return asyncio.get_running_loop() is self._loop
+    except RuntimeError:
+      return False
+
+  async def disconnect(self, core):
+    self._client.disconnect()
+
+  def subscribe(self, core, topic):
+    self._client.subscribe(topic)
+
+  def publish(self, topic, payload, qos=0, retain=False):
+    info = self._client.publish(topic, payload=payload, qos=qos,
+                                retain=retain)
+    if info.rc == self._mqtt.MQTT_ERR_SUCCESS:
+      self._inFlight.add(info.mid)
+    return info
+
+  def publishMany(self, msgs, qos=0, retain=False):
+    # The packets are only queued by the client; they are written together
+    # when the event loop finds the socket writable
+    for topic, payload in msgs:
+      self.publish(topic, payload, qos, retain)
+
+  @property
+  def nPending(self):
+    # Messages published but not yet reported as sent by the client (QoS 0:
+    # written to the socket, QoS 1/2: acknowledged by the broker)
+    return len(self._inFlight)
+
+  def pauseReading(self, core):
+    if self._sock is not None and not self._isPaused:
+      self._loop.remove_reader(self._sock)
+    self._isPaused = True
+
+  def resumeReading(self, core):
+    if self._sock is not None and self._isPaused:
+      self._loop.add_reader(self._sock, self._client.loop_read)
+    self._isPaused = False
+
+  # paho callbacks
+  def _onConnect(self, client, userdata, flags, rc):
+    self._core._onConnect(rc == 0, rc)
+
+  def _onDisconnect(self, client, userdata, rc):
+    self._core._onDisconnect()
+
+  def _onPublish(self, client, userdata, mid):
+    self._inFlight.discard(mid)
+    self._core._onPublished()
+
+  def _onSocketOpen(self, client, userdata, sock):
+    self._inLoop(self._openSocket, sock)
+
+  def _openSocket(self, sock):
+    self._sock = sock
+    if not self._isPaused:
+      self._loop.add_reader(sock, self._client.loop_read)
+    self._misc = self._loop.create_task(self._miscLoop())
+
+  def _onSocketClose(self, client, userdata, sock):
+    self._inLoop(self._closeSocket, sock)
+
+  def _closeSocket(self, sock):
+    if not self._isPaused:
+      self._loop.remove_reader(sock)
+    self._sock = None
+    # Unsent QoS 0 messages are discarded by the client
+    self._inFlight.clear()
+    if self._misc:
+      self._misc.cancel()
+
+  def _onSocketRegisterWrite(self, client, userdata, sock):
+    self._inLoop(self._loop.add_writer, sock, client.loop_write)
+
+  def _onSocketUnregisterWrite(self, client, userdata, sock):
+    self._inLoop(self._loop.remove_writer, sock)
+
+  async def _miscLoop(self):
+    while self._client.loop_misc() == self._mqtt.MQTT_ERR_SUCCESS:
+      try:
+        await asyncio.sleep(1)
+      except asyncio.CancelledError:
+        break
+
+# =====================================================================
+# Subscriptions and ingest core
+#
+# ---------------------------------------------------------------------
+class Subscription(object):
+  """Bounded queue of messages for one consumer; can be used as async
+     iterator (`async for msg in sub`)"""
+
+  def __init__(self, topic, nQueue=SUB_QUEUE_LEN):
+    self.topic = topic
+    self.queue = asyncio.Queue(maxsize=nQueue)
+    self.handler = None
+    self.nDelivered = 0
+    self.nBlocked = 0
+    self.nErrors = 0
+    self.highWater = 0
+
+  def matches(self, topic):
+    return topicMatches(self.topic, topic)
+
+  async def _put(self, msg):
+    if self.queue.full():
+      self.nBlocked += 1
+    await self.queue.put(msg)
+    self.nDelivered += 1
+    self.highWater = max(self.highWater, self.queue.qsize())
+
+  async def get(self):
+    return await self.queue.get()
+
+  def __aiter__(self):
+    return self
+
+  async def __anext__(self):
+    return await self.queue.get()
+
+# ---------------------------------------------------------------------
+class IngestCore(object):
+  """Receives messages from a transport and delivers them to the
+     subscriptions (see module description)"""
+
+  def __init__(self, transport, isVerbose=True):
+    self._tr = transport
+    self._subs = []
+    self._topics = []
+    self._tasks = []
+    self._inbox = deque()
+    self._isPaused = False
+    self._isVerbose = isVerbose
+    self._loop = None
+    self._evInbox = None
+    self._evStop = None
+    self._evConnected = None
+    self._evWritable = None
+    self._thread = None
+    self.isConnected = False
+    self.nReceived = 0
+    self.nPaused = 0
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def subscribe(self, topic, nQueue=SUB_QUEUE_LEN):
+    """ Add a subscription for the topic (filter) and return it; the
+        consumer reads messages from it
+    """
+    sub = Subscription(topic, nQueue)
+    self._subs.append(sub)
+    if topic not in self._topics:
+      self._topics.append(topic)
+      if self.isConnected:
+        self._tr.subscribe(self, topic)
+    return sub
+
+  def addHandler(self, topic, handler, nQueue=SUB_QUEUE_LEN):
+    """ Subscribe to the topic (filter) and call `handler(msg)` (a function
+        or a coroutine function) for each message, in order. Call before
+        `run` or from within the event loop
+    """
+    sub = self.subscribe(topic, nQueue)
+    sub.handler = handler
+    if self._loop is not None:
+      self._tasks.append(self._loop.create_task(self._handle(sub)))
+    return sub
+
+  def publish(self, topic, payload, qos=0, retain=False):
+    """ Publish a message via the transport; if called from another thread
+        than the event loop's (e.g. a worker), it is handed to the loop
+    """
+    if self._loop is not None and not self._isInLoop():
+      self._loop.call_soon_threadsafe(
+        lambda: self._tr.publish(topic, payload, qos=qos, retain=retain))
+      return None
+    return self._tr.publish(topic, payload, qos=qos, retain=retain)
+
+  def publishMany(self, msgs, qos=0, retain=False):
+    """ Publish a list of (topic, payload) tuples; from another thread than
+        the event loop's, the whole batch is handed to the loop at once
+    """
+    if self._loop is not None and not self._isInLoop():
+      self._loop.call_soon_threadsafe(
+        lambda: self._tr.publishMany(msgs, qos=qos, retain=retain))
+    else:
+      self._tr.publishMany(msgs, qos=qos, retain=retain)
+
+  def _isInLoop(self):
+    try:
+      return asyncio.get_running_loop() is self._loop
+    except RuntimeError:
+      return False
+
+  @property
+  def nPending(self):
+    """ Number of published messages the transport has not yet sent (0
+        for transports that deliver immediately)
+    """
+    return getattr(self._tr, "nPending", 0)
+
+  async def waitWritable(self, nMax):
+    """ Wait until the core is connected and at most `nMax` published
+        messages are pending (call from the event loop)
+    """
+    ev = self._getWritableEvent()
+    while not self.isConnected or self.nPending > nMax:
+      ev.clear()
+      await ev.wait()
+
+  def _getWritableEvent(self):
+    # Set when the core connects or the transport sent messages; created
+    # in the event loop's thread
+    if self._evWritable is None:
+      self._evWritable = asyncio.Event()
+    return self._evWritable
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  async def run(self):
+    """ Connect (and reconnect, if needed) to the transport and deliver
+        messages until `stop` is called
+    """
+    self._loop = asyncio.get_running_loop()
+    self._evInbox = asyncio.Event()
+    self._evStop = asyncio.Event()
+    self._evConnected = asyncio.Event()
+    self._getWritableEvent()
+    self._tasks.append(self._loop.create_task(self._dispatch()))
+    for sub in self._subs:
+      if sub.handler is not None:
+        self._tasks.append(self._loop.create_task(self._handle(sub)))
+    try:
+      while not self._evStop.is_set():
+        if not self.isConnected:
+          if self._isVerbose:
+            print("Trying to connect to `{0}` ...".format(self._tr.name))
+          if await self._tr.connect(self):
+            await self._waitFor(self._evConnected, RECONNECT_S *10)
+          if not self.isConnected:
+            await self._waitFor(self._evStop, RECONNECT_S)
+            continue
+        await self._waitFor(self._evStop, RECONNECT_S)
+    finally:
+      for task in self._tasks:
+        task.cancel()
+      self._tasks = []
+      if self.isConnected:
+        await self._tr.disconnect(self)
+      self.isConnected = False
+
+  async def _waitFor(self, event, timeout):
+    try:
+      await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+      pass
+
+  def stop(self):
+    """ Stop `run` (can be called from any thread)
+    """
+    if self._loop is not None:
+      self._loop.call_soon_threadsafe(self._evStop.set)
+
+  def runInThread(self):
+    """ Run the core in a new event loop in a daemon thread (e.g. for the
+        pygame GUI); handlers are then called in that thread
+    """
+    def _run():
+      asyncio.run(self.run())
+    self._thread = threading.Thread(target=_run, daemon=True)
+    self._thread.start()
+    return self._thread
+
+  def join(self, timeout=None):
+    if self._thread:
+      self._thread.join(timeout)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _onConnect(self, isOk, rc=0):
+    if isOk:
+      if self._isVerbose:
+        print("Successfully connected to `{0}`".format(self._tr.name))
+      for topic in self._topics:
+        if self._isVerbose:
+          print("Subscribing to `{0}` ...".format(topic))
+        self._tr.subscribe(self, topic)
+      self.isConnected = True
+      self._evConnected.set()
+      self._onPublished()
+    elif self._isVerbose:
+      print("Broker `{0}` replied `{1}`".format(self._tr.name, rc))
+
+  def _onDisconnect(self):
+    if self._isVerbose:
+      print("Disconnected from broker `{0}`".format(self._tr.name))
+    self.isConnected = False
+    self._evConnected.clear()
+
+  def _onPublished(self):
+    # Called by the transport (in the event loop's thread) when messages
+    # were sent
+    self._getWritableEvent().set()
+
+  def _onMessage(self, msg):
+    # Called in the event loop's thread for each received message
+    self.nReceived += 1
+    self._inbox.append(msg)
+    self._evInbox.set()
+    if not self._isPaused and len(self._inbox) >= INBOX_HIGH:
+      self._isPaused = True
+      self.nPaused += 1
+      self._tr.pauseReading(self)
+
+  async def _dispatch(self):
+    while True:
+      if len(self._inbox) == 0:
+        self._evInbox.clear()
+        await self._evInbox.wait()
+        continue
+      msg = self._inbox.popleft()
+      for sub in self._subs:
+        if sub.matches(msg.topic):
+          await sub._put(msg)
+      if self._isPaused and len(self._inbox) <= INBOX_LOW:
+        self._isPaused = False
+        self._tr.resumeReading(self)
+
+  async def _handle(self, sub):
+    while True:
+      msg = await sub.queue.get()
+      try:
+        res = sub.handler(msg)
+        if asyncio.iscoroutine(res):
+          await res
+      except Exception as e:
+        # Report only the first failure of a handler; all are counted
+        if sub.nErrors == 0:
+          print("ERROR: Handler for `{0}` failed ({1})".format(sub.topic, e))
+        sub.nErrors += 1
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  @property
+  def nErrors(self):
+    """ Number of messages for which a handler raised an exception
+    """
+    return sum([sub.nErrors for sub in self._subs])
+
+  def getStatsStr(self):
+    """ Return statistics as a string
+    """
+    return ("{0} received, {1} pending, {2} paused, max. queue {3}, "
+            "{4} handler errors".format(
+      self.nReceived, len(self._inbox), self.nPaused,
+      max([sub.highWater for sub in self._subs] +[0]), self.nErrors))
+
+# ---------------------------------------------------------------------
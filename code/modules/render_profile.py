@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# render_profile.py
+# Timing of the sections of a GUI frame (widget updates and drawing,
+# telemetry decoding, display update) with rolling percentiles
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# Each section (e.g. "Compass.draw") keeps the durations of its last
+# `PROF_WINDOW` calls, from which the percentiles are computed, and the
+# number and total duration of all calls. Sections are timed with:
+#   t0 = prof.tic()
+#   ...
+#   prof.toc("Compass.draw", t0)
+#
+# ---------------------------------------------------------------------
+import time
+import numpy as np
+from collections import deque
+
+PROF_WINDOW      = 500    # Number of samples for the percentiles
+PROF_PERCENTILES = [50, 95, 99]
+
+# ---------------------------------------------------------------------
+class RenderProfiler(object):
+  """Rolling durations of named sections in [ms]"""
+
+  def __init__(self, nWin=PROF_WINDOW):
+    self._nWin = nWin
+    self._samples = dict()
+    self._nTotal = dict()
+    self._msTotal = dict()
+
+  def reset(self):
+    self._samples.clear()
+    self._nTotal.clear()
+    self._msTotal.clear()
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def tic(self):
+    return time.perf_counter()
+
+  def toc(self, name, t0):
+    """ Add the time since `t0` (as returned by `tic`) to section `name`
+    """
+    self.add(name, (time.perf_counter() -t0) *1000)
+
+  def add(self, name, ms):
+    """ Add a duration in [ms] to section `name`
+    """
+    s = self._samples.get(name)
+    if s is None:
+      s = self._samples[name] = deque(maxlen=self._nWin)
+      self._nTotal[name] = 0
+      self._msTotal[name] = 0.
+    s.append(ms)
+    self._nTotal[name] += 1
+    self._msTotal[name] += ms
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  @property
+  def names(self):
+    return list(self._samples.keys())
+
+  def getStats(self, name):
+    """ Returns mean, percentiles (see `PROF_PERCENTILES`) and maximum of
+        the last durations of section `name` in [ms]
+    """
+    s = np.array(self._samples[name])
+    return [s.mean()] +list(np.percentile(s, PROF_PERCENTILES)) +[s.max()]
+
+  def getTable(self):
+    """ Returns a list with one row per section: name, number and total
+        duration of all calls, and the statistics of the last calls (see
+        `getStats`); sorted by the highest percentile, descending
+    """
+    rows = [[name, self._nTotal[name], self._msTotal[name]]
+            +self.getStats(name) for name in self._samples]
+    rows.sort(key=lambda r: r[-2], reverse=True)
+    return rows
+
+  def getLines(self, nMax=0):
+    """ Returns the table as text lines (for the top `nMax` sections)
+    """
+    rows = self.getTable()
+    if nMax > 0:
+      rows = rows[:nMax]
+    lines = ["p{0}/{1}/{2} [ms]".format(*PROF_PERCENTILES)]
+    for r in rows:
+      lines.append("{0}: {4:.2f}/{5:.2f}/{6:.2f}".format(*r))
+    return lines
+
+  def saveCSV(self, path):
+    """ Write the table into a CSV file
+    """
+    header = ["section", "n", "total_ms", "mean_ms"] \
+             +["p{0}_ms".format(p) for p in PROF_PERCENTILES] +["max_ms"]
+    with open(path, "w") as f:
+      f.write(",".join(header) +"\n")
+      for r in self.getTable():
+        f.write("\"{0}\",{1}".format(r[0], r[1]))
+        f.write("".join([",{0:.4f}".format(v) for v in r[2:]]) +"\n")
+    return path
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# telemetry_db.py
+# Local time-series store for telemetry leaves in an SQLite database
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+#
+# Each leaf of a message (e.g. "power/battery_V") is stored as one row
+# (guid, topic, t, value) in the table `leaves`, which is indexed by
+# (guid, topic, t). Numbers are stored as such, all other values as JSON
+# text. The database is opened in WAL mode, so that it can be queried
+# while it is being written.
+#
+# `add` only queues the leaves of a message; a writer thread, which owns
+# the connection, inserts the queued leaves every `DB_BATCH_S` seconds in
+# one transaction.
+#
+# ---------------------------------------------------------------------
+import json
+import sqlite3
+import threading
+import numpy as np
+import modules.frame_queue as fq
+
+DB_QUEUE_LEN     = 4096   # Messages waiting to be written
+DB_BATCH_S       = 0.5    # Interval between two transactions in [s]
+
+SCHEMA           = (
+  "CREATE TABLE IF NOT EXISTS leaves ("
+  "guid TEXT NOT NULL, topic TEXT NOT NULL, t REAL NOT NULL, value)",
+  "CREATE INDEX IF NOT EXISTS ix_leaves ON leaves (guid, topic, t)")
+
+# ---------------------------------------------------------------------
+def _toDB(v):
+  if isinstance(v, (int, float)):
+    return v
+  if isinstance(v, np.ndarray):
+    return json.dumps(v.tolist())
+  if isinstance(v, np.generic):
+    return v.item()
+  return json.dumps(v)
+
+def _fromDB(v):
+  if isinstance(v, str):
+    try:
+      return json.loads(v)
+    except ValueError:
+      pass
+  return v
+
+def _connect(path):
+  con = sqlite3.connect(path, check_same_thread=False)
+  con.execute("PRAGMA journal_mode=WAL")
+  con.execute("PRAGMA synchronous=NORMAL")
+  return con
+
+# ---------------------------------------------------------------------
+class TelemetryDB(object):
+  """Batched writer and simple query interface for the leaf database"""
+
+  def __init__(self, path, nQueue=DB_QUEUE_LEN):
+    self.path = path
+    self.Queue = fq.FrameQueue(nQueue, fq.DROP_NEWEST)
+    self._evStop = threading.Event()
+    self._thread = None
+    self._conRead = None
+    self.nRows = 0
+    self.nCommits = 0
+    con = _connect(path)
+    for sql in SCHEMA:
+      con.execute(sql)
+    con.commit()
+    con.close()
+
+  def start(self):
+    """ Start the writer thread
+    """
+    if self._thread is None:
+      self._evStop.clear()
+      self._thread = threading.Thread(target=self._run, daemon=True)
+      self._thread.start()
+    return self
+
+  def stop(self):
+    """ Write all queued leaves and stop the writer thread
+    """
+    if self._thread is not None:
+      self._evStop.set()
+      self._thread.join()
+      self._thread = None
+    if self._conRead is not None:
+      self._conRead.close()
+      self._conRead = None
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def add(self, guid, t, topics, vals):
+    """ Queue the leaves of a message from robot `guid` received at time
+        `t`; `topics` are the leaves' topics as relayed, i.e. the GUID
+        followed by the key path (e.g. "<GUID>/power/battery_V"). Returns
+        False if the queue is full and the message was dropped
+    """
+    return self.Queue.put((guid, t, topics, vals))
+
+  def _run(self):
+    con = _connect(self.path)
+    try:
+      while True:
+        isRunning = not self._evStop.wait(DB_BATCH_S)
+        rows = []
+        for guid, t, topics, vals in self.Queue.drain():
+          n = len(guid) +1
+          rows.extend([(guid, topic[n:], t, _toDB(v))
+                       for topic, v in zip(topics, vals)])
+        if len(rows) > 0:
+          with con:
+            con.executemany("INSERT INTO leaves VALUES (?,?,?,?)", rows)
+          self.nCommits += 1
+          self.nRows += len(rows)
+        if not isRunning:
+          break
+    finally:
+      con.close()
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _query(self, sql, args=()):
+    if self._conRead is None:
+      self._conRead = _connect(self.path)
+    return self._conRead.execute(sql, args).fetchall()
+
+  def guids(self):
+    """ Returns the GUIDs of all robots in the database
+    """
+    return [r[0] for r in self._query("SELECT DISTINCT guid FROM leaves")]
+
+  def topics(self, guid):
+    """ Returns the topics (key paths) stored for robot `guid`
+    """
+    return [r[0] for r in self._query(
+      "SELECT DISTINCT topic FROM leaves WHERE guid=?", (guid,))]
+
+  def query(self, guid, topic, t0=None, t1=None, nMax=0):
+    """ Returns the times and values of `topic` of robot `guid` in the
+        time range [`t0`, `t1`] as two lists, oldest first; if `nMax` > 0,
+        only the latest `nMax` values are returned
+    """
+    sql = "SELECT t, value FROM leaves WHERE guid=? AND topic=?"
+    args = [guid, topic]
+    if t0 is not None:
+      sql += " AND t>=?"
+      args.append(t0)
+    if t1 is not None:
+      sql += " AND t<=?"
+      args.append(t1)
+    if nMax > 0:
+      sql = "SELECT * FROM ({0} ORDER BY t DESC LIMIT ?) ORDER BY t".format(sql)
+      args.append(nMax)
+    else:
+      sql += " ORDER BY t"
+    rows = self._query(sql, args)
+    return [r[0] for r in rows], [_fromDB(r[1]) for r in rows]
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self):
+    """ Return statistics as a string
+    """
+    return "{0} rows in {1} transactions, {2}".format(
+      self.nRows, self.nCommits, self.Queue.getStatsStr())
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# telemetry_log.py
+# Append-only, memory-mapped recorder for telemetry messages and the
+# respective reader
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, a recorder only writes into a new or empty directory
+# 2026-10-17, record times never decrease (see below)
+#
+# A log is a directory with segment files ("seg_000000.tlog", ...) of
+# fixed-size records. Each message is stored as its raw payload (i.e. as
+# received, so that it can be replayed through the same decoding path),
+# split into as many consecutive records as needed, together with the
+# time of reception and the topic (as an index into the segment's topic
+# table, which is stored in topic records). Messages are written in the
+# order they were queued; as they can be queued by several threads (e.g.
+# the decoding workers of a fleet) with slightly out-of-order times, a
+# message's time is raised to that of the previous message, if needed.
+# Hence, times never decrease within a log, which the reader relies on
+# for seeking and time ranges.
+#
+# Segment layout (little-endian):
+#   header (64 bytes): magic, version, record size, capacity, number of
+#     records, time of first and last message; the number of records is
+#     only written when the segment is closed (0 = not closed properly)
+#   records: time (d), topic index (H), payload bytes (H), flags (B) and
+#     seal (B), followed by the payload. The seal is written last; after
+#     a crash, the valid records are those up to the first unsealed one
+#
+# Every `INDEX_EVERY` records, the start of a message and its time are
+# added to a sparse index, which is saved next to the segment (".tidx",
+# rebuilt if missing) and allows seeking in O(log n).
+#
+# ---------------------------------------------------------------------
+import os
+import mmap
+import time
+import glob
+import struct
+import threading
+import numpy as np
+import modules.frame_queue as fq
+
+LOG_MAGIC        = b"RTLG"
+LOG_VERSION      = 1
+
+REC_SIZE         = 512         # Bytes per record
+SEG_RECORDS      = 1 << 16     # Records per segment (32 MB at 512 bytes)
+INDEX_EVERY      = 64          # Records per index entry
+REC_QUEUE_LEN    = 4096        # Messages waiting to be written
+FLUSH_S          = 2.0         # Interval for flushing to disk
+
+REC_FIRST        = 0x01        # First record of a message
+REC_LAST         = 0x02        # Last record of a message
+REC_TOPIC        = 0x04        # Topic definition
+REC_SEAL         = 0xA5
+
+FILE_HEAD        = struct.Struct("<4sHHIIdd")
+FILE_HEAD_SIZE   = 64
+REC_HEAD         = struct.Struct("<dHHBB")
+REC_HEAD_SIZE    = 16
+
+REC_DTYPE        = np.dtype([("t", "<f8"), ("topic", "<u2"), ("n", "<u2"),
+                             ("flags", "u1"), ("seal", "u1")])
+
+# ---------------------------------------------------------------------
+def _segmentName(path, iSeg):
+  return os.path.join(path, "seg_{0:06d}.tlog".format(iSeg))
+
+def _indexName(fName):
+  return os.path.splitext(fName)[0] +".tidx"
+
+# =====================================================================
+# Writing
+#
+# ---------------------------------------------------------------------
+class _SegmentWriter(object):
+  """One segment file that is being written"""
+
+  def __init__(self, fName, recSize, nRec):
+    self.fName = fName
+    self.recSize = recSize
+    self.nRecMax = nRec
+    self.n = 0
+    self.tFirst = 0.
+    self.tLast = 0.
+    self.topics = dict()
+    self.index = []
+    self._tIndexMax = -np.inf
+    self._nSinceIndex = INDEX_EVERY
+    self._f = open(fName, "w+b")
+    self._f.truncate(FILE_HEAD_SIZE +nRec *recSize)
+    self._mm = mmap.mmap(self._f.fileno(), 0)
+    self._writeHead(0)
+
+  def _writeHead(self, n):
+    FILE_HEAD.pack_into(self._mm, 0, LOG_MAGIC, LOG_VERSION, self.recSize,
+                        self.nRecMax, n, self.tFirst, self.tLast)
+
+  def nRecordsFor(self, nBytes):
+    nPay = self.recSize -REC_HEAD_SIZE
+    return max((nBytes +nPay -1) //nPay, 1)
+
+  def free(self):
+    return self.nRecMax -self.n
+
+  def _put(self, t, iTopic, data, flags):
+    nPay = self.recSize -REC_HEAD_SIZE
+    nRec = self.nRecordsFor(len(data))
+    for j in range(nRec):
+      chunk = data[j*nPay:(j+1)*nPay]
+      f = flags if j == 0 else flags & ~REC_FIRST
+      if j == nRec -1:
+        f |= REC_LAST
+      offs = FILE_HEAD_SIZE +self.n *self.recSize
+      self._mm[offs +REC_HEAD_SIZE:offs +REC_HEAD_SIZE +len(chunk)] = chunk
+      REC_HEAD.pack_into(self._mm, offs, t, iTopic, len(chunk), f, 0)
+      self._mm[offs +REC_HEAD.size -1] = REC_SEAL
+      self.n += 1
+
+  def append(self, t, topic, payload):
+    """ Write a message; returns False if the segment has not enough space
+        left (the caller rotates the segment)
+    """
+    iTopic = self.topics.get(topic)
+    nNeed = self.nRecordsFor(len(payload))
+    if iTopic is None:
+      nNeed += self.nRecordsFor(len(topic))
+    if nNeed > self.free():
+      return False
+    if iTopic is None:
+      iTopic = len(self.topics)
+      self.topics[topic] = iTopic
+      self._put(t, iTopic, topic.encode("utf-8"), REC_FIRST | REC_TOPIC)
+    if self._nSinceIndex >= INDEX_EVERY:
+      self._tIndexMax = max(self._tIndexMax, t)
+      self.index.append((self._tIndexMax, self.n))
+      self._nSinceIndex = 0
+    n0 = self.n
+    self._put(t, iTopic, payload, REC_FIRST)
+    self._nSinceIndex += self.n -n0
+    if self.tFirst == 0:
+      self.tFirst = t
+    self.tLast = max(self.tLast, t)
+    return True
+
+  def flush(self):
+    self._mm.flush()
+
+  def close(self):
+    """ Finalize segment (write header and index, truncate file to the
+        used size)
+    """
+    self._writeHead(self.n)
+    self._mm.flush()
+    self._mm.close()
+    self._f.truncate(FILE_HEAD_SIZE +self.n *self.recSize)
+    self._f.close()
+    np.save(_indexName(self.fName), np.array(self.index, dtype=np.float64),
+            allow_pickle=False)
+    os.replace(_indexName(self.fName) +".npy", _indexName(self.fName))
+
+# ---------------------------------------------------------------------
+class TelemetryRecorder(object):
+  """Writes messages into a new log; `record` only queues the message and
+     returns immediately, a writer thread writes them in batches"""
+
+  def __init__(self, path, recSize=REC_SIZE, nSegRecords=SEG_RECORDS,
+               nQueue=REC_QUEUE_LEN, isVerbose=True):
+    """ `path` must be a new or empty directory; otherwise, a
+        `FileExistsError` is raised (a log holds a single session)
+    """
+    if os.path.isdir(path) and len(os.listdir(path)) > 0:
+      raise FileExistsError("`{0}` is not empty".format(path))
+    self.path = path
+    self._recSize = max(recSize, REC_HEAD_SIZE +16)
+    self._nSegRec = nSegRecords
+    self._isVerbose = isVerbose
+    self.Queue = fq.FrameQueue(nQueue, fq.DROP_NEWEST)
+    self._evData = threading.Event()
+    self._isRunning = False
+    self._thread = None
+    self._seg = None
+    self._iSeg = 0
+    self._tLast = -np.inf
+    self.nWritten = 0
+    self.nReordered = 0
+    self.nBytes = 0
+    self.nSegments = 0
+    os.makedirs(path, exist_ok=True)
+
+  def start(self):
+    """ Start the writer thread
+    """
+    if self._thread is None:
+      self._isRunning = True
+      self._thread = threading.Thread(target=self._run, daemon=True)
+      self._thread.start()
+    return self
+
+  def stop(self):
+    """ Write all queued messages, close the current segment and stop the
+        writer thread
+    """
+    if self._thread is not None:
+      self._isRunning = False
+      self._evData.set()
+      self._thread.join()
+      self._thread = None
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def record(self, topic, payload, t=None):
+    """ Queue a message for writing (can be called from any thread); returns
+        False if the queue is full and the message was dropped
+    """
+    ok = self.Queue.put((time.time() if t is None else t, topic, payload))
+    self._evData.set()
+    return ok
+
+  def _run(self):
+    tFlush = time.time()
+    try:
+      while True:
+        self._evData.wait(FLUSH_S)
+        self._evData.clear()
+        isRunning = self._isRunning
+        for item in self.Queue.drain():
+          self._write(*item)
+        t = time.time()
+        if self._seg is not None and t -tFlush > FLUSH_S:
+          self._seg.flush()
+          tFlush = t
+        if not isRunning:
+          break
+    finally:
+      if self._seg is not None:
+        self._seg.close()
+        self._seg = None
+
+  def _write(self, t, topic, payload):
+    if t < self._tLast:
+      # Keep times in order (see module description)
+      t = self._tLast
+      self.nReordered += 1
+    self._tLast = t
+    if self._seg is None or not self._seg.append(t, topic, payload):
+      if self._seg is not None:
+        self._seg.close()
+      self._seg = _SegmentWriter(_segmentName(self.path, self._iSeg),
+                                 self._recSize, self._nSegRec)
+      self._iSeg += 1
+      self.nSegments += 1
+      if self._isVerbose:
+        print("Recording to `{0}` ...".format(self._seg.fName))
+      if not self._seg.append(t, topic, payload):
+        print("ERROR: Message too large for segment, dropped")
+        return
+    self.nWritten += 1
+    self.nBytes += len(payload)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def getStatsStr(self):
+    """ Return statistics as a string
+    """
+    return ("{0} recorded ({1:.1f} MB, {2} segment(s), {3} out of order), "
+            "{4}".format(self.nWritten, self.nBytes /1E6, self.nSegments,
+                         self.nReordered, self.Queue.getStatsStr()))
+
+# =====================================================================
+# Reading
+#
+# ---------------------------------------------------------------------
+class _SegmentReader(object):
+  """One (read-only, memory-mapped) segment"""
+
+  def __init__(self, fName):
+    self.fName = fName
+    self._f = open(fName, "rb")
+    self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, ver, recSize, nMax, n, tFirst, tLast = \
+      FILE_HEAD.unpack_from(self._mm, 0)
+    if magic != LOG_MAGIC or ver != LOG_VERSION:
+      raise ValueError("`{0}` is not a telemetry log segment".format(fName))
+    self.recSize = recSize
+    nAvail = (len(self._mm) -FILE_HEAD_SIZE) //recSize
+    dt = np.dtype({"names": REC_DTYPE.names,
+                   "formats": [REC_DTYPE.fields[k][0] for k in REC_DTYPE.names],
+                   "offsets": [REC_DTYPE.fields[k][1] for k in REC_DTYPE.names],
+                   "itemsize": recSize})
+    self.recs = np.ndarray((nAvail,), dtype=dt, buffer=self._mm,
+                           offset=FILE_HEAD_SIZE)
+    if n == 0:
+      # Not closed properly, valid records are those up to the first one
+      # that is not sealed
+      bad = np.flatnonzero(self.recs["seal"] != REC_SEAL)
+      n = int(bad[0]) if len(bad) > 0 else nAvail
+    self.n = min(n, nAvail)
+    self.topics = dict()
+    for i in np.flatnonzero(self.recs["flags"][:self.n] & REC_TOPIC):
+      self.topics[int(self.recs["topic"][i])] = \
+        bytes(self._payload(i)).decode("utf-8")
+    self.index = self._loadIndex()
+    ts = self.recs["t"][:self.n]
+    self.tFirst = float(ts.min()) if self.n > 0 else 0.
+    self.tLast = float(ts.max()) if self.n > 0 else 0.
+
+  def _loadIndex(self):
+    try:
+      idx = np.load(_indexName(self.fName), allow_pickle=False)
+      if idx.ndim == 2 and (len(idx) == 0 or idx[-1,1] < self.n):
+        return idx
+    except (OSError, ValueError):
+      pass
+    # Rebuild index from the message starts
+    flags = self.recs["flags"][:self.n]
+    iFirst = np.flatnonzero(((flags & REC_FIRST) != 0) &
+                            ((flags & REC_TOPIC) == 0))
+    if len(iFirst) > 0:
+      iFirst = iFirst[::max(INDEX_EVERY *len(iFirst) //self.n, 1)]
+    t = np.maximum.accumulate(self.recs["t"][iFirst]) if len(iFirst) else []
+    return np.column_stack([t, iFirst]).astype(np.float64).reshape(-1, 2)
+
+  def _payload(self, i):
+    offs = FILE_HEAD_SIZE +i *self.recSize +REC_HEAD_SIZE
+    return self._mm[offs:offs +int(self.recs["n"][i])]
+
+  def seek(self, t0):
+    """ Returns the index of a record at or before the first message with
+        a time >= `t0`
+    """
+    if len(self.index) == 0:
+      return 0
+    j = int(np.searchsorted(self.index[:,0], t0, side="left"))
+    return int(self.index[max(j -1, 0), 1]) if j > 0 else 0
+
+  def messages(self, iRec=0):
+    """ Yields (time, topic, payload) for the messages from record `iRec` on
+    """
+    recs = self.recs
+    i = iRec
+    while i < self.n:
+      flags = int(recs["flags"][i])
+      if not flags & REC_FIRST or flags & REC_TOPIC:
+        i += 1
+        continue
+      if flags & REC_LAST:
+        data = self._payload(i)
+        i += 1
+      else:
+        parts = []
+        while i < self.n:
+          parts.append(self._payload(i))
+          isLast = recs["flags"][i] & REC_LAST
+          i += 1
+          if isLast:
+            break
+        else:
+          return
+        data = b"".join(parts)
+      yield (float(recs["t"][i -1]), self.topics.get(int(recs["topic"][i -1])),
+             data)
+
+  def close(self):
+    self.recs = None
+    self._mm.close()
+    self._f.close()
+
+# ---------------------------------------------------------------------
+class TelemetryLog(object):
+  """Reader for a log written by `TelemetryRecorder`"""
+
+  def __init__(self, path):
+    self.path = path
+    self.Segments = []
+    for fName in sorted(glob.glob(os.path.join(path, "seg_*.tlog"))):
+      seg = _SegmentReader(fName)
+      if seg.n > 0:
+        self.Segments.append(seg)
+      else:
+        seg.close()
+    self._tFirst = np.array([s.tFirst for s in self.Segments])
+
+  @property
+  def tFirst(self):
+    return self.Segments[0].tFirst if len(self.Segments) else 0.
+
+  @property
+  def tLast(self):
+    return max([s.tLast for s in self.Segments] +[0.])
+
+  @property
+  def nRecords(self):
+    return sum([s.n for s in self.Segments])
+
+  def messages(self, t0=None, t1=None):
+    """ Yields (time, topic, payload) for all messages with a time in the
+        range [`t0`, `t1`], in the order they were recorded
+    """
+    iSeg = 0
+    iRec = 0
+    if t0 is not None and len(self.Segments) > 0:
+      iSeg = max(int(np.searchsorted(self._tFirst, t0, side="right")) -1, 0)
+      iRec = self.Segments[iSeg].seek(t0)
+    for seg in self.Segments[iSeg:]:
+      for msg in seg.messages(iRec):
+        if t0 is not None and msg[0] < t0:
+          continue
+        if t1 is not None and msg[0] > t1:
+          # Times never decrease (see module description)
+          return
+        yield msg
+      iRec = 0
+
+  def __iter__(self):
+    return self.messages()
+
+  def close(self):
+    for seg in self.Segments:
+      seg.close()
+    self.Segments = []
+
+# ---------------------------------------------------------------------
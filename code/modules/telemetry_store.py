@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------
+# telemetry_store.py
+# Preallocated columnar ring buffer for telemetry time series
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, readers get copies taken under the lock; values of the wrong
+#             shape are counted and replaced by the field's last value
+#
+# Each field is kept in a NumPy array of twice the store's length; every
+# sample is written to position `i` and `i +n`, so the latest `n` samples
+# are always a contiguous slice, which is copied in one step. Samples are
+# appended by the thread that receives the messages, hence readers (e.g.
+# the GUI) get copies that are taken under the lock.
+#
+# ---------------------------------------------------------------------
+import threading
+import numpy as np
+
+# ---------------------------------------------------------------------
+class TelemetryStore(object):
+  """Columnar store of the last `n` telemetry samples with a shared
+     timestamp column"""
+
+  def __init__(self, n):
+    self._nMax = max(n, 2)
+    self._iNext = 0
+    self._nData = 0
+    self._time = np.zeros(2*self._nMax)
+    self._cols = dict()
+    self._Lock = threading.Lock()
+    self.nInvalid = 0
+
+  def addField(self, name, width=1, initVal=0, dtype=np.float64):
+    """ Add a field; fields with `width` > 1 store a vector per sample
+        (e.g. the two motor loads)
+    """
+    if width < 1:
+      raise ValueError("Field `{0}` needs a width >= 1".format(name))
+    shape = (2*self._nMax,) if width == 1 else (2*self._nMax, width)
+    self._cols[name] = np.full(shape, initVal, dtype=dtype)
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def append(self, t, values):
+    """ Append a sample at time `t`; `values` is a dictionary with the
+        field values. Fields missing in `values` repeat their last value,
+        as do values that are not a scalar (width 1) or a sequence of the
+        field's width; these are counted in `nInvalid`
+    """
+    with self._Lock:
+      i = self._iNext
+      j = i +self._nMax
+      iPrev = (i -1) % self._nMax
+      self._time[i] = self._time[j] = t
+      for name, col in self._cols.items():
+        v = values.get(name)
+        if v is not None:
+          try:
+            if np.shape(v) != col.shape[1:]:
+              raise ValueError
+            col[i] = col[j] = v
+            continue
+          except (ValueError, TypeError):
+            self.nInvalid += 1
+        col[i] = col[j] = col[iPrev]
+      self._iNext = (i +1) % self._nMax
+      self._nData = min(self._nData +1, self._nMax)
+
+  def clear(self):
+    with self._Lock:
+      self._iNext = 0
+      self._nData = 0
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _slice(self, n):
+    n = self._nMax if n is None else min(n, self._nMax)
+    i = self._iNext +self._nMax
+    return slice(i -n, i)
+
+  def view(self, name, n=None):
+    """ Returns a copy of the latest `n` samples (default: all, including
+        the initial values if the store is not yet filled), oldest first
+    """
+    with self._Lock:
+      return self._cols[name][self._slice(n)].copy()
+
+  def times(self, n=None):
+    """ Returns a copy of the latest `n` timestamps
+    """
+    with self._Lock:
+      return self._time[self._slice(n)].copy()
+
+  def mean(self, name, n=None):
+    """ Returns the mean of the latest `n` valid samples of a field
+    """
+    with self._Lock:
+      n = self._nData if n is None else min(n, self._nData)
+      if n == 0:
+        return 0
+      return np.mean(self._cols[name][self._slice(n)], axis=0)
+
+  def since(self, t0):
+    """ Returns the number of valid samples with a timestamp >= `t0`
+    """
+    with self._Lock:
+      t = self._time[self._slice(self._nData)]
+      return self._nData -int(np.searchsorted(t, t0, side="left"))
+
+  def window(self, names, t0, t1=None):
+    """ Returns a dictionary with copies of the fields in `names` and of
+        the timestamps (key "t") for samples in the time range [`t0`, `t1`]
+    """
+    with self._Lock:
+      sl = self._slice(self._nData)
+      t = self._time[sl]
+      i0 = int(np.searchsorted(t, t0, side="left"))
+      i1 = len(t) if t1 is None else int(np.searchsorted(t, t1, side="right"))
+      res = {"t": t[i0:i1].copy()}
+      for name in names:
+        res[name] = self._cols[name][sl][i0:i1].copy()
+    return res
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def __len__(self):
+    return self._nData
+
+  @property
+  def capacity(self):
+    return self._nMax
+
+  @property
+  def fields(self):
+    return list(self._cols.keys())
+
+# ---------------------------------------------------------------------
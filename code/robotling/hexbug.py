@@ -50,6 +50,12 @@
 # 2021-04-21, Now uses `RobotlingBase`
 # 2021-04-29, Some refactoring (e.g. fewer `from xy import *`); configuration
 #             parameters now clearly marked as such (`cfg.xxx`)
+# 2026-10-17, Optionally, telemetry is sent as compact binary frame instead
+#             of JSON (`cfg.TELEMETRY_BINARY`, see `telemetry_frame.py`)
+# 2026-10-17, Camera image sent as quantized keyframes and sparse deltas
+#             (`cfg.TELEMETRY_IMG_N`, quantization `cfg.TELEMETRY_IMG_Q`)
+# 2026-10-17, Telemetry messages carry a sequence number (`KEY_SEQ`), which
+#             allows the receiver to detect lost and reordered messages
 #
 # ----------------------------------------------------------------------------
 import array
@@ -186,6 +192,14 @@ class HexBug(Robotling):
       self._t = Telemetry(self.ID)
       self._t.connect()
       self.onboardLED.off()
+      self._tSeq = 0xFFFF
+      if cfg.TELEMETRY_BINARY:
+        from telemetry_frame import FrameEncoder
+        self._tEnc = FrameEncoder()
+      if cfg.TELEMETRY_IMG_N > 0 and self.Camera:
+        from telemetry_frame import ImageDeltaEncoder
+        self._tImg = ImageDeltaEncoder(64, cfg.TELEMETRY_IMG_N,
+                                       *cfg.TELEMETRY_IMG_Q)
 
     # Create filters for smoothing the pitch and roll readings
     self.PitchFilter = TemporalFilter(8)
@@ -236,40 +250,85 @@ class HexBug(Robotling):
       self.lightDiff = int(self.LightDiffFilter.mean(dL))
 
     if cfg.SEND_TELEMETRY and self._t._isReady:
-      # Collect the data ...
-      mqttd[KEY_STATE] = self.state
-      mqttd[KEY_TIMESTAMP] = time.ticks_ms() /1000.
-      mqttd[KEY_POWER] = {KEY_BATTERY: self.Battery_V}
-      if cfg.USE_LOAD_SENSING:
-        mqttd[KEY_POWER].update({KEY_MOTORLOAD: list(self._loadData)})
-      mqttd[KEY_SENSOR] = {KEY_DISTANCE: list(self._distData)}
-      _temp = {
-          KEY_HEADING:
-          ehpr[1], KEY_PITCH: ehpr[2], KEY_ROLL: ehpr[3]
-        }
-      mqttd[KEY_SENSOR].update({KEY_COMPASS: _temp})
-      if cfg.DO_FIND_LIGHT:
-        _temp = {
-            KEY_INTENSITY:
-            [aid[cfg.AI_CH_LIGHT_L], aid[cfg.AI_CH_LIGHT_R]]
-          }
-        mqttd[KEY_SENSOR].update({KEY_PHOTODIODE: _temp})
-      if cfg.DO_FOLLOW_BLOB and self.Camera:
-        mqttd[KEY_CAM_IR] = {
-            KEY_SIZE:
-            (8,8), KEY_BLOBS: self.Camera.blobs_raw
-          }
-        mqttd[KEY_CAM_IR].update({KEY_IMAGE: self.Camera.image_linear})
-      if len(self.debug) > 0:
-        mqttd[KEY_DEBUG] = self.debug
-        self.debug = []
-      # ... and publish
-      self._t.publishDict(KEY_RAW, mqttd)
+      self._tSeq = (self._tSeq +1) & 0xFFFF
+      if cfg.TELEMETRY_BINARY and len(self.debug) == 0:
+        # Send as binary frame; messages with debug information always
+        # fall back to JSON
+        self._publishBinary(ehpr, aid)
+      else:
+        self._publishJSON(ehpr, aid)
 
     # Change NeoPixel according to state
     i = self.state *3
     self.startPulsePixel(STATE_COLORS[i:i+3])
 
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _publishJSON(self, ehpr, aid):
+    """ Collect telemetry data in a dictionary and publish it as JSON
+    """
+    # Collect the data ...
+    mqttd[KEY_STATE] = self.state
+    mqttd[KEY_TIMESTAMP] = time.ticks_ms() /1000.
+    mqttd[KEY_SEQ] = self._tSeq
+    mqttd[KEY_POWER] = {KEY_BATTERY: self.Battery_V}
+    if cfg.USE_LOAD_SENSING:
+      mqttd[KEY_POWER].update({KEY_MOTORLOAD: list(self._loadData)})
+    mqttd[KEY_SENSOR] = {KEY_DISTANCE: list(self._distData)}
+    _temp = {
+        KEY_HEADING:
+        ehpr[1], KEY_PITCH: ehpr[2], KEY_ROLL: ehpr[3]
+      }
+    mqttd[KEY_SENSOR].update({KEY_COMPASS: _temp})
+    if cfg.DO_FIND_LIGHT:
+      _temp = {
+          KEY_INTENSITY:
+          [aid[cfg.AI_CH_LIGHT_L], aid[cfg.AI_CH_LIGHT_R]]
+        }
+      mqttd[KEY_SENSOR].update({KEY_PHOTODIODE: _temp})
+    if cfg.DO_FOLLOW_BLOB and self.Camera:
+      mqttd[KEY_CAM_IR] = {
+          KEY_SIZE:
+          (8,8), KEY_BLOBS: self.Camera.blobs_raw
+        }
+      if cfg.TELEMETRY_IMG_N > 0:
+        self._tImg.encode(self.Camera.image_linear)
+        self._tImg.toDict(mqttd[KEY_CAM_IR])
+      else:
+        mqttd[KEY_CAM_IR].update({KEY_IMAGE: self.Camera.image_linear})
+    if len(self.debug) > 0:
+      mqttd[KEY_DEBUG] = self.debug
+      self.debug = []
+    # ... and publish
+    self._t.publishDict(KEY_RAW, mqttd)
+
+  def _publishBinary(self, ehpr, aid):
+    """ Pack telemetry data into a binary frame (see `TLM_FIELDS` in
+        `hexbug_global.py`) and publish it
+    """
+    enc = self._tEnc
+    enc.clear()
+    enc.set(TLM_STATE, self.state)
+    enc.set(TLM_TIMESTAMP, time.ticks_ms() /1000.)
+    enc.set(TLM_SEQ, self._tSeq)
+    enc.set(TLM_BATTERY, self.Battery_V)
+    if cfg.USE_LOAD_SENSING:
+      enc.set(TLM_MOTORLOAD, self._loadData)
+    enc.set(TLM_DISTANCE, self._distData)
+    enc.set(TLM_HEADING, ehpr[1])
+    enc.set(TLM_PITCH, ehpr[2])
+    enc.set(TLM_ROLL, ehpr[3])
+    if cfg.DO_FIND_LIGHT:
+      enc.set(TLM_INTENSITY, (aid[cfg.AI_CH_LIGHT_L], aid[cfg.AI_CH_LIGHT_R]))
+    if cfg.DO_FOLLOW_BLOB and self.Camera:
+      enc.set(TLM_CAM_SIZE, (8,8))
+      enc.set(TLM_CAM_BLOBS, self.Camera.blobs_raw)
+      if cfg.TELEMETRY_IMG_N > 0:
+        self._tImg.encode(self.Camera.image_linear)
+        self._tImg.toFrame(enc)
+      else:
+        enc.set(TLM_CAM_IMAGE, self.Camera.image_linear)
+    self._t.publish(KEY_RAW, enc.encode())
+
   # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
   def onLoopStart(self):
     """ To measure the performance of the loops, call this function once at
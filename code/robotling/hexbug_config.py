@@ -79,6 +79,11 @@ SPEED_BACK_DELAY = const(500)  # Duration for backing up (cliff)
 USE_LOAD_SENSING = const(1)    # Use AI channels #6,7 for load-sensing (> v1.1)
 USE_POWER_SHD    = const(0)    # Use ENAB_5V (voltage regulator off)   (> v1.1)
 SEND_TELEMETRY   = const(0)    # only w/ESP32
+TELEMETRY_BINARY = const(0)    # 1=compact binary frames instead of JSON
+TELEMETRY_IMG_N  = const(0)    # Camera image: keyframe every n images and
+                               # .. deltas in between (0=always full image)
+TELEMETRY_IMG_Q  = (0.0, 0.25) # .. quantization as (offset, scale); values
+                               # .. saturate at offset +255*scale (63.75 C)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # "Behaviours" and their parameters
@@ -63,6 +63,65 @@ KEY_IMAGE        = "image"
 KEY_SIZE         = "size"
 KEY_DEBUG        = "debug"
 KEY_BLOBS        = "blobs"
+KEY_IMG_QHEAD    = "image_qh"
+KEY_IMG_KEY      = "image_key"
+KEY_IMG_DIDX     = "image_didx"
+KEY_IMG_DVAL     = "image_dval"
+KEY_SEQ          = "seq"
+
+# Binary telemetry frame (alternative to JSON, see `TELEMETRY_BINARY`)
+# Layout (little-endian): magic (B), version (B), flags (I), a value count
+# (H) for each field present (flags bit i set = field i present), followed
+# by the values of the present fields. A field is defined by its key path,
+# its `struct` type, a scaling factor (value = raw *scale; 0 = not scaled)
+# and a shape (0 = scalar, 1 = list, n > 1 = list of n-tuples)
+TLM_MAGIC        = const(0xB5)
+TLM_VERSION      = const(2)
+TLM_FIELDS       = (
+  ((KEY_STATE,),                                "B", 0,     0),
+  ((KEY_TIMESTAMP,),                            "I", 0.001, 0),
+  ((KEY_POWER, KEY_BATTERY),                    "H", 0.001, 0),
+  ((KEY_POWER, KEY_MOTORLOAD),                  "h", 0,     1),
+  ((KEY_SENSOR, KEY_DISTANCE),                  "h", 0,     1),
+  ((KEY_SENSOR, KEY_COMPASS, KEY_HEADING),      "h", 0.1,   0),
+  ((KEY_SENSOR, KEY_COMPASS, KEY_PITCH),        "h", 0.1,   0),
+  ((KEY_SENSOR, KEY_COMPASS, KEY_ROLL),         "h", 0.1,   0),
+  ((KEY_SENSOR, KEY_PHOTODIODE, KEY_INTENSITY), "H", 0,     1),
+  ((KEY_CAM_IR, KEY_SIZE),                      "B", 0,     1),
+  ((KEY_CAM_IR, KEY_IMAGE),                     "h", 0.01,  1),
+  ((KEY_CAM_IR, KEY_BLOBS),                     "f", 0,     5),
+  ((KEY_CAM_IR, KEY_IMG_QHEAD),                 "f", 0,     1),
+  ((KEY_CAM_IR, KEY_IMG_KEY),                   "B", 0,     1),
+  ((KEY_CAM_IR, KEY_IMG_DIDX),                  "H", 0,     1),
+  ((KEY_CAM_IR, KEY_IMG_DVAL),                  "B", 0,     1),
+  ((KEY_SEQ,),                                  "H", 0,     0))
+TLM_STATE        = const(0)
+TLM_TIMESTAMP    = const(1)
+TLM_BATTERY      = const(2)
+TLM_MOTORLOAD    = const(3)
+TLM_DISTANCE     = const(4)
+TLM_HEADING      = const(5)
+TLM_PITCH        = const(6)
+TLM_ROLL         = const(7)
+TLM_INTENSITY    = const(8)
+TLM_CAM_SIZE     = const(9)
+TLM_CAM_IMAGE    = const(10)
+TLM_CAM_BLOBS    = const(11)
+TLM_IMG_QHEAD    = const(12)
+TLM_IMG_KEY      = const(13)
+TLM_IMG_DIDX     = const(14)
+TLM_IMG_DVAL     = const(15)
+TLM_SEQ          = const(16)
+
+# Quantized camera images (see `TELEMETRY_IMG_N`): pixel values are sent
+# as uint8 (value = raw *scale +offset) with a header `KEY_IMG_QHEAD` =
+# [sequence #, sequence # of last keyframe, offset, scale], followed either
+# by all pixels (`KEY_IMG_KEY`, keyframe) or by the indices and values of
+# the pixels that changed since the previous image (delta). With the
+# default offset and scale, values range from 0 to 63.75 (deg C) and higher
+# values saturate; use `cfg.TELEMETRY_IMG_Q` to change the quantization
+TLM_IMG_OFFS     = 0.0
+TLM_IMG_SCALE    = 0.25
 
 # Limits for telemetry data
 LIPO_MAX_V       = 4.2
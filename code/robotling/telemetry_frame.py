@@ -0,0 +1,161 @@
+# ----------------------------------------------------------------------------
+# telemetry_frame.py
+# Encoder for compact binary telemetry frames; the fields and the frame
+# layout are defined by `TLM_FIELDS` in `hexbug_global.py`
+#
+# The MIT License (MIT)
+# Copyright (c) 2026 Thomas Euler
+# 2026-10-17, v1
+# 2026-10-17, `ImageDeltaEncoder` for quantized keyframe/delta images
+# 2026-10-17, 32-bit flags field (frame version 2)
+# 2026-10-17, fields with more than 255 values can be encoded
+#
+# ----------------------------------------------------------------------------
+import array
+import struct
+from hexbug_global import *
+
+# ----------------------------------------------------------------------------
+class FrameEncoder(object):
+  """Packs telemetry values into a binary frame. The `struct` format is only
+     rebuilt if the set of fields or the number of values per field changes
+     (e.g. if the number of detected blobs changes)"""
+
+  def __init__(self):
+    self._nF = len(TLM_FIELDS)
+    self._vals = [None] *self._nF
+    self._counts = [0] *self._nF
+    self._flags = -1
+    self._head = []
+    self._fmt = None
+    self._buf = None
+
+  def clear(self):
+    """ Mark all fields as not present
+    """
+    for i in range(self._nF):
+      self._vals[i] = None
+
+  def set(self, iField, value):
+    """ Set value of field `iField` (e.g. `TLM_BATTERY`); for fields with
+        a shape > 1 (e.g. blobs), `value` is a list of tuples
+    """
+    self._vals[iField] = value
+
+  # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+  def _updateFormat(self, flags, counts):
+    fmt = "<BBI"
+    fmtVals = ""
+    head = [TLM_MAGIC, TLM_VERSION, flags]
+    for iF in range(self._nF):
+      if flags & (1 << iF):
+        n = counts[iF]
+        fmt += "H"
+        fmtVals += "{0}{1}".format(n, TLM_FIELDS[iF][1])
+        head.append(n)
+    self._head = head
+    self._fmt = fmt +fmtVals
+    self._buf = bytearray(struct.calcsize(self._fmt))
+    self._flags = flags
+    self._counts = counts
+
+  def encode(self):
+    """ Pack the current values and return the frame as a `bytearray`
+        (which is reused by the next call)
+    """
+    flags = 0
+    # Counts are stored as uint16 in the header
+    counts = [0] *self._nF
+    args = []
+    for iF, v in enumerate(self._vals):
+      if v is None:
+        continue
+      _, _, scale, shape = TLM_FIELDS[iF]
+      if shape == 0:
+        v = (v,)
+      elif shape > 1:
+        v = [x for row in v for x in row]
+      flags |= 1 << iF
+      counts[iF] = len(v)
+      if scale:
+        for x in v:
+          args.append(int(round(x /scale)))
+      else:
+        args.extend(v)
+    if flags != self._flags or counts != self._counts:
+      self._updateFormat(flags, counts)
+    struct.pack_into(self._fmt, self._buf, 0, *(self._head +args))
+    return self._buf
+
+# ----------------------------------------------------------------------------
+class ImageDeltaEncoder(object):
+  """Quantizes camera images to uint8 and encodes them as keyframe (every
+     `nKey` images or if most pixels changed) or as sparse delta to the
+     previously sent image (see `KEY_IMG_QHEAD` in `hexbug_global.py`)"""
+
+  def __init__(self, nPix, nKey, offs=TLM_IMG_OFFS, scale=TLM_IMG_SCALE):
+    self._nPix = nPix
+    self._nKey = max(nKey, 1)
+    self._offs = offs
+    self._scale = scale
+    self._ref = bytearray(nPix)
+    self._seq = 0xFFFF
+    self._keySeq = 0
+    self.head = [0, 0, offs, scale]
+    self.key = None
+    self.dIdx = array.array("H")
+    self.dVal = bytearray()
+
+  def encode(self, img):
+    """ Encode image (as a flat list of values); afterwards, `head` and
+        either `key` (keyframe) or `dIdx`/`dVal` (delta) are set. Returns
+        True for a keyframe
+    """
+    self._seq = (self._seq +1) & 0xFFFF
+    o = self._offs
+    s = self._scale
+    ref = self._ref
+    dIdx = array.array("H")
+    dVal = bytearray()
+    for i in range(self._nPix):
+      q = int((img[i] -o) /s +0.5)
+      q = 0 if q < 0 else 255 if q > 255 else q
+      if q != ref[i]:
+        ref[i] = q
+        dIdx.append(i)
+        dVal.append(q)
+    isKey = ((self._seq -self._keySeq) & 0xFFFF) >= self._nKey
+    if isKey or self._seq == self._keySeq or len(dIdx) > self._nPix //2:
+      # Send complete (quantized) image
+      isKey = True
+      self._keySeq = self._seq
+      self.key = ref
+      self.dIdx = None
+      self.dVal = None
+    else:
+      self.key = None
+      self.dIdx = dIdx
+      self.dVal = dVal
+    self.head[0] = self._seq
+    self.head[1] = self._keySeq
+    return isKey
+
+  def toDict(self, d):
+    """ Add the encoded image to the dictionary `d` (for JSON)
+    """
+    d[KEY_IMG_QHEAD] = self.head
+    if self.key is not None:
+      d[KEY_IMG_KEY] = list(self.key)
+    else:
+      d[KEY_IMG_DIDX] = list(self.dIdx)
+      d[KEY_IMG_DVAL] = list(self.dVal)
+
+  def toFrame(self, enc):
+    """ Set the respective fields of the `FrameEncoder` `enc`
+    """
+    enc.set(TLM_IMG_QHEAD, self.head)
+    enc.set(TLM_IMG_KEY, self.key)
+    enc.set(TLM_IMG_DIDX, self.dIdx)
+    enc.set(TLM_IMG_DVAL, self.dVal)
+
+# ----------------------------------------------------------------------------
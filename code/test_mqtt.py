@@ -8,12 +8,12 @@
 # The MIT License (MIT)
 # Copyright (c) 2019 Thomas Euler
 # 2019-07-25, v1
+# 2026-10-17, based on the asyncio ingest core (`modules/mqtt_ingest.py`)
 #
 # ---------------------------------------------------------------------
 import json
-import threading
-import time
-import paho.mqtt.client as mqtt
+import asyncio
+from modules.mqtt_ingest import IngestCore, PahoTransport
 
 # ---------------------------------------------------------------------
 # USER SECTION ==>
@@ -25,88 +25,38 @@ MQTT_PORT       = 1883
 MQTT_ALIVE_S    = 60
 
 # ---------------------------------------------------------------------
-def onConnect(client, userdata, flags, rc):
-  global isConnected
-  if rc == 0:
-    print("Successfully connected to `{0}`".format(MQTT_BROKER))
-    print("Subscribing to `{0}` ...".format(MQTT_ROOT_TOPIC))
-    client.subscribe(MQTT_ROOT_TOPIC +"/raw")
-    isConnected = True
-  else:
-    print("Broker `{0}` replied `{1}`".format(MQTT_BROKER, rc))
+async def main():
+  # Create ingest core, subscribe to the robotling's telemetry and start
+  # receiving (the core connects and, if needed, reconnects to the broker)
+  Core = IngestCore(PahoTransport(MQTT_BROKER, MQTT_PORT, MQTT_ALIVE_S))
+  Sub = Core.subscribe(MQTT_ROOT_TOPIC +"/raw")
+  task = asyncio.create_task(Core.run())
 
-def onDisconnect(client, userdata, rc):
-  global isConnected
-  print("Disconnected from broker `{0}`".format(MQTT_BROKER))
-  isConnected = False
-
-def onMessage(client, userdata, msg):
-  global lastMsg, isNewMsg
   try:
-    Lock.acquire()
-    lastMsg = msg.payload.decode('utf-8')
-    isNewMsg = True
+    async for msg in Sub:
+      # Decode message (convert it into a dictionary)
+      try:
+        data = json.loads(msg.payload.decode('utf-8'))
+      except ValueError:
+        print("Corrupt message")
+        continue
+
+      # New valid data available, print some data
+      print("sensor/distance_cm=", data["sensor"]["distance_cm"])
+      print("power/battery_V=", data["power"]["battery_V"])
+
   finally:
-    Lock.release()
+    # Stop ingest core and disconnect
+    print("Stop ingest core and disconnect ...")
+    Core.stop()
+    await task
 
 # ---------------------------------------------------------------------
 if __name__ == '__main__':
-
-  # Create MQTT client
-  Client = mqtt.Client()
-  Client.on_connect = onConnect
-  Client.on_message = onMessage
-  Client.on_disconnect = onDisconnect
-
-  # Initialize variables
-  Lock = threading.Lock()
-  isConnected = False
-  isNewMsg = False
-  lastMsg = ""
-
   try:
-    while True:
-      if not isConnected:
-        # If not connected, try to connect to broker and start the client's
-        # internal loop thread ...
-        try:
-          print("Trying to connect to `{0}` ...".format(MQTT_BROKER))
-          Client.connect(MQTT_BROKER, port=MQTT_PORT, keepalive=MQTT_ALIVE_S)
-          Client.loop_start()
-          isConnected = True
-        except ConnectionRefusedError:
-          time.sleep(0.5)
-      else:
-        # Is connected to broker ...
-        data = None
-        if isNewMsg and len(lastMsg) > 0:
-          try:
-            Lock.acquire()
-            try:
-              # Load data from last message and decode it
-              # (convert it into a dictionary)
-              data = json.loads(str(lastMsg))
-            except:
-              print("Corrupt message")
-          finally:
-            Lock.release()
-            isNewMsg = False
-
-        if data:
-          # New valid data available, print some data
-          print("sensor/distance_cm=", data["sensor"]["distance_cm"])
-          print("power/battery_V=", data["power"]["battery_V"])
-
-      # Sleep for a bit
-      time.sleep(0.05)
-
+    asyncio.run(main())
   except KeyboardInterrupt:
     print("User aborted loop")
-
-  # Stop MQTT client and disconnect
-  print("Stop MQTT client loop and disconnect ...")
-  Client.loop_stop()
-  Client.disconnect()
   print("... done.")
 
 # ---------------------------------------------------------------------
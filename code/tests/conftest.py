@@ -0,0 +1,16 @@
+# ---------------------------------------------------------------------
+# conftest.py
+# Makes the host modules (`code`) and the robotling's modules
+# (`code/robotling`) importable for the tests; run from `code` with:
+#   python -m pytest tests
+# ---------------------------------------------------------------------
+import os
+import sys
+
+_CODE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# `code` must come first, otherwise `robotling` would be imported from
+# `code/robotling/robotling.py` instead of as a package
+sys.path.insert(0, _CODE)
+sys.path.append(os.path.join(_CODE, "robotling"))
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,25 @@
+# ---------------------------------------------------------------------
+# test_fleet.py
+# Per-robot decoding of a fleet's telemetry (`hexbug_fleet.py`)
+# ---------------------------------------------------------------------
+from hexbug_fleet import HexBugFleet
+from modules.mqtt_ingest import Message
+
+def test_worker_errors_are_counted_per_robot(capsys):
+  def _onFrame(m, frame):
+    if m.guid == "rb1" and frame.seq %2:
+      raise ValueError("bad frame")
+
+  fleet = HexBugFleet(fOnFrame=_onFrame, nWorkers=4, nShardMin=1,
+                      nQueue=1000, isVerbose=True)
+  for i in range(10):
+    for j in range(3):
+      payload = '{{"seq": {0}}}'.format(i)
+      fleet.setNewMQTTMsg(Message("rb{0}/raw".format(j), payload.encode()))
+  fleet.stop()
+  nErr = {m.guid: m.nErrors for m in fleet.members}
+  assert nErr == {"rb0": 0, "rb1": 5, "rb2": 0}
+  assert fleet.nErrors == 5
+  assert capsys.readouterr().out.count("ERROR:") == 1
+  assert "rb1: 10 @" in fleet.getStatsStr()
+  assert "5 errors" in fleet.getStatsStr()
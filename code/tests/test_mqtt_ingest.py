@@ -0,0 +1,118 @@
+# ---------------------------------------------------------------------
+# test_mqtt_ingest.py
+# Ingest core with the in-process broker (`modules/mqtt_ingest.py`)
+# ---------------------------------------------------------------------
+import asyncio
+import threading
+import modules.mqtt_ingest as ingest
+
+TIMEOUT_S = 5.0
+
+async def _waitUntil(cond, timeout=TIMEOUT_S):
+  t = 0.
+  while not cond():
+    assert t < timeout, "timeout"
+    await asyncio.sleep(0.01)
+    t += 0.01
+
+async def _start(core):
+  task = asyncio.create_task(core.run())
+  await _waitUntil(lambda: core.isConnected)
+  return task
+
+async def _stop(core, task):
+  core.stop()
+  await asyncio.wait_for(task, TIMEOUT_S)
+
+def _publishInThread(broker, msgs):
+  thr = threading.Thread(target=broker.publishMany, args=(msgs,))
+  thr.start()
+  return thr
+
+# ---------------------------------------------------------------------
+def test_messages_are_delivered_in_order():
+  async def _run():
+    broker = ingest.LocalBroker()
+    core = ingest.IngestCore(broker, isVerbose=False)
+    got = []
+    core.addHandler("rbA/raw", lambda msg: got.append(msg.payload))
+    other = []
+    core.addHandler("rbB/#", lambda msg: other.append(msg.payload))
+    task = await _start(core)
+    msgs = [("rbA/raw" if i %3 else "rbB/raw", str(i)) for i in range(1000)]
+    _publishInThread(broker, msgs).join()
+    await _waitUntil(lambda: len(got) +len(other) == 1000)
+    await _stop(core, task)
+    assert got == [p.encode() for t, p in msgs if t == "rbA/raw"]
+    assert other == [p.encode() for t, p in msgs if t == "rbB/raw"]
+  asyncio.run(_run())
+
+def test_slow_consumer_pauses_and_resumes_reading():
+  async def _run():
+    broker = ingest.LocalBroker()
+    core = ingest.IngestCore(broker, isVerbose=False)
+    sub = core.subscribe("rbA/raw", nQueue=4)
+    task = await _start(core)
+    n = ingest.INBOX_HIGH *2
+    _publishInThread(broker, [("rbA/raw", str(i)) for i in range(n)]).join()
+
+    # Nothing is consumed: the core stops reading from the transport
+    await _waitUntil(lambda: core._isPaused)
+    assert core.nPaused == 1
+    assert core.nReceived < n
+
+    # Consume all messages: reading resumes and nothing is lost
+    got = []
+    while len(got) < n:
+      msg = await asyncio.wait_for(sub.get(), TIMEOUT_S)
+      got.append(int(msg.payload))
+    assert got == list(range(n))
+    assert not core._isPaused
+    assert core.nReceived == n
+    assert sub.nBlocked > 0
+    await _stop(core, task)
+  asyncio.run(_run())
+
+def test_reconnect_restores_subscriptions():
+  async def _run():
+    broker = ingest.LocalBroker()
+    broker.isOnline = False
+    core = ingest.IngestCore(broker, isVerbose=False)
+    got = []
+    core.addHandler("rbA/raw", lambda msg: got.append(msg.payload))
+    task = asyncio.create_task(core.run())
+    await asyncio.sleep(ingest.RECONNECT_S *1.5)
+    assert not core.isConnected
+
+    # Broker comes online, then the connection is lost
+    broker.isOnline = True
+    await _waitUntil(lambda: core.isConnected)
+    broker.publish("rbA/raw", "1")
+    await _waitUntil(lambda: len(got) == 1)
+    broker.dropConnections()
+    await _waitUntil(lambda: not core.isConnected)
+    await _waitUntil(lambda: core.isConnected)
+    broker.publish("rbA/raw", "2")
+    await _waitUntil(lambda: len(got) == 2)
+    await _stop(core, task)
+    assert got == [b"1", b"2"]
+  asyncio.run(_run())
+
+def test_handler_errors_are_counted():
+  async def _run():
+    broker = ingest.LocalBroker()
+    core = ingest.IngestCore(broker, isVerbose=False)
+    got = []
+    def _onMsg(msg):
+      if int(msg.payload) %2:
+        raise ValueError("odd")
+      got.append(msg.payload)
+    core.addHandler("rbA/raw", _onMsg)
+    task = await _start(core)
+    broker.publishMany([("rbA/raw", str(i)) for i in range(10)])
+    await _waitUntil(lambda: len(got) == 5 and core.nErrors == 5)
+    await _stop(core, task)
+    assert "5 handler errors" in core.getStatsStr()
+  asyncio.run(_run())
+
+# ---------------------------------------------------------------------
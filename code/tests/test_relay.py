@@ -0,0 +1,158 @@
+# ---------------------------------------------------------------------
+# test_relay.py
+# Relaying of decoded telemetry (`hexbug_relay.py`)
+# ---------------------------------------------------------------------
+import json
+import time
+import asyncio
+import threading
+import numpy as np
+import hexbug_mqtt as hx
+import hexbug_relay as hr
+from hexbug_fleet import HexBugFleet
+from modules.mqtt_ingest import Message, LocalBroker, IngestCore
+from telemetry_frame import FrameEncoder, ImageDeltaEncoder
+from hexbug_global import *
+
+GUID = "robotling_test"
+
+class _Outbound(object):
+  # Collects the messages the relay would publish
+  def __init__(self):
+    self.msgs = []
+
+  def put(self, msgs):
+    self.msgs += msgs
+
+def _frames(imgs, nKey):
+  enc = FrameEncoder()
+  imgEnc = ImageDeltaEncoder(len(imgs[0]), nKey)
+  for i, img in enumerate(imgs):
+    enc.clear()
+    enc.set(TLM_SEQ, i)
+    enc.set(TLM_CAM_SIZE, (8, 8))
+    imgEnc.encode(img)
+    imgEnc.toFrame(enc)
+    yield Message(GUID +"/raw", bytes(enc.encode()))
+
+def test_relay_reconstructs_delta_coded_images():
+  rng = np.random.default_rng(1)
+  img = 20 +rng.random(64) *10
+  imgs = []
+  for _ in range(5):
+    img = img.copy()
+    img[rng.integers(0, 64, 4)] += 2
+    imgs.append(img)
+
+  out = _Outbound()
+  relay = hr.Relay(None, rollups=(), publisher=out)
+  for msg in _frames(imgs, 10):
+    relay.onMessage(msg)
+    topics = dict(out.msgs)
+    out.msgs = []
+    assert not any(t.rsplit("/", 1)[-1] in hr.IMG_WIRE_KEYS for t in topics)
+    assert topics[GUID +"/camera_IR/" +hx.KEY_IMG_VALID] == "True"
+    relayed = np.array(eval(topics[GUID +"/camera_IR/image"]))
+    assert np.allclose(relayed, imgs[relay.nMsg -1], atol=TLM_IMG_SCALE/2)
+
+def test_relay_drops_image_after_lost_delta():
+  imgs = [np.full(64, 20.) for _ in range(4)]
+  for i, img in enumerate(imgs):
+    img[:i] += 1
+  out = _Outbound()
+  relay = hr.Relay(None, rollups=(), publisher=out)
+  for i, msg in enumerate(_frames(imgs, 10)):
+    if i == 1:
+      continue
+    out.msgs = []
+    relay.onMessage(msg)
+  topics = dict(out.msgs)
+  assert topics[GUID +"/camera_IR/" +hx.KEY_IMG_VALID] == "False"
+  assert GUID +"/camera_IR/image" not in topics
+
+def test_fleet_workers_relay_all_messages():
+  # Several workers relay concurrently through one relay and change filter
+  out = _Outbound()
+  filt = hr.ChangeFilter([("#", 0, 0.)])
+  relay = hr.Relay(None, filt, rollups=(), publisher=out)
+  fleet = HexBugFleet(fOnFrame=relay.onFleetFrame, nWorkers=4, nShardMin=1,
+                      nQueue=100000, isVerbose=False)
+  nRobots, nMsg = 8, 500
+  for i in range(nMsg):
+    for j in range(nRobots):
+      payload = '{{"seq": {0}, "power": {{"battery_V": {1}}}}}'.format(i, i)
+      fleet.setNewMQTTMsg(Message("rb{0}/raw".format(j), payload.encode()))
+  fleet.stop()
+  assert fleet.nDropped == 0
+  assert relay.nMsg == nRobots *nMsg
+  assert filt.nIn == relay.nLeaves == 2 *nRobots *nMsg
+  assert len(out.msgs) == relay.nLeaves
+
+def test_new_root_topic_gets_one_table(monkeypatch):
+  # Threads that relay the first messages of a robot at the same time
+  # must share one topic table (and one set of rollups)
+  tables = []
+  TopicTable = hr.TopicTable
+  class _SlowTable(TopicTable):
+    def __init__(self, rootTopic):
+      time.sleep(0.01)
+      TopicTable.__init__(self, rootTopic)
+      tables.append(self)
+  monkeypatch.setattr(hr, "TopicTable", _SlowTable)
+
+  relay = hr.Relay(None, rollups=(3600,), publisher=_Outbound())
+  nThreads = 8
+  barrier = threading.Barrier(nThreads)
+  def _relay():
+    barrier.wait()
+    relay.relay(GUID, {"power": {"battery_V": 4.0}})
+  threads = [threading.Thread(target=_relay) for _ in range(nThreads)]
+  for th in threads:
+    th.start()
+  for th in threads:
+    th.join()
+  assert len(tables) == 1
+  assert relay.nMsg == nThreads
+  res = dict(relay._rollups[GUID][0].flush(time.time() +3600))
+  batt = json.loads(res[GUID +"/rollup/3600s/power/battery_V"])
+  assert batt["n"] == nThreads
+
+def test_publisher_waits_for_connection():
+  async def _run():
+    broker = LocalBroker()
+    broker.isOnline = False
+    core = IngestCore(broker, isVerbose=False)
+    got = []
+    core.addHandler("rbA/#", lambda msg: got.append(msg.payload))
+    out = hr.Publisher(core)
+    tasks = [asyncio.create_task(core.run()), asyncio.create_task(out.run())]
+    out.put([("rbA/x", str(i)) for i in range(100)])
+    await asyncio.sleep(0.2)
+    assert out.nPublished == 0
+
+    broker.isOnline = True
+    for _ in range(500):
+      if len(got) == 100:
+        break
+      await asyncio.sleep(0.01)
+    assert got == [str(i).encode() for i in range(100)]
+    core.stop()
+    tasks[1].cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+  asyncio.run(_run())
+
+def test_rollup_only_listed_fields():
+  r = hr.Rollup(GUID, 1.0)
+  topics = [GUID +"/" +k for k in ("state", "seq", "timestamp_s",
+                                   "power/battery_V", "sensor/distance_cm")]
+  r.add(topics, [1, 0, 10.0, 4.0, [10, 20]], 0.5)
+  r.add(topics, [2, 1, 10.1, 3.8, [12, 18]], 0.6)
+  res = dict(r.flush(1.0))
+  assert sorted(res) == [GUID +"/rollup/1s/power/battery_V",
+                         GUID +"/rollup/1s/sensor/distance_cm"]
+  batt = json.loads(res[GUID +"/rollup/1s/power/battery_V"])
+  assert batt["n"] == 2 and batt["min"] == 3.8 and batt["max"] == 4.0
+  dist = json.loads(res[GUID +"/rollup/1s/sensor/distance_cm"])
+  assert dist["min"] == [10, 18] and dist["max"] == [12, 20]
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,78 @@
+# ---------------------------------------------------------------------
+# test_replay.py
+# Replay of recorded telemetry (`hexbug_replay.py`)
+# ---------------------------------------------------------------------
+import re
+import json
+import time
+import pytest
+import threading
+import hexbug_mqtt as hx
+import modules.telemetry_log as tlog
+from hexbug_replay import TelemetryReplay
+
+N_MSG = 300
+
+def _record(path):
+  rec = tlog.TelemetryRecorder(str(path)).start()
+  for i in range(N_MSG):
+    rec.record("rbA/raw", json.dumps({"seq": i}).encode(), 100. +i *0.05)
+  rec.stop()
+
+def test_replay_waits_for_consumer(tmp_path):
+  # With `evReady`, a small queue is not flooded, even at full speed
+  _record(tmp_path /"log")
+  robot = hx.HexBug(isVerbose=False, nQueue=4)
+  evReady = threading.Event()
+  replay = TelemetryReplay(str(tmp_path /"log"), robot, 0, evReady=evReady)
+  replay.start()
+  seqs = []
+  while not replay.isDone or len(robot.Queue) > 0:
+    if robot.evNewFrame.wait(0.1):
+      robot.evNewFrame.clear()
+    seqs += [f.seq for f in robot.processMQTTMsgs()]
+    evReady.set()
+  replay.stop()
+  assert replay.nReplayed == N_MSG
+  assert robot.nDropped == 0
+  assert seqs == list(range(N_MSG))
+
+def test_replay_keeps_recorded_transit_times(tmp_path):
+  # At any speed, clock offset and transit times are those of the
+  # recording (host time 50 s ahead, transit 5..14 ms)
+  rec = tlog.TelemetryRecorder(str(tmp_path /"log")).start()
+  for i in range(N_MSG):
+    tRobot = 50. +i *0.05
+    payload = json.dumps({"seq": i, "timestamp_s": tRobot}).encode()
+    rec.record("rbA/raw", payload, tRobot +50.005 +(i %10) *0.001)
+  rec.stop()
+  robot = hx.HexBug(isVerbose=False, nQueue=N_MSG)
+  replay = TelemetryReplay(str(tmp_path /"log"), robot, 0)
+  replay.run()
+  assert replay.nReplayed == N_MSG
+  assert robot.Clock.offset == pytest.approx(50.005, abs=1E-6)
+  assert 8. < robot.LatTransit.maxMs < 10.
+
+def test_replay_stats_while_running(tmp_path):
+  # Throughput is reported before the replay has finished
+  _record(tmp_path /"log")
+  robot = hx.HexBug(isVerbose=False)
+  evReady = threading.Event()
+  replay = TelemetryReplay(str(tmp_path /"log"), robot, 0, evReady=evReady)
+  replay.start()
+  while replay.nReplayed == 0:
+    time.sleep(0.01)
+  time.sleep(0.05)
+  s = replay.getStatsStr()
+  replay.stop()
+  assert s.startswith("1 replayed")
+  assert float(re.search(r"\((\d+) msg/s", s).group(1)) > 0
+
+def test_recorder_refuses_existing_log(tmp_path):
+  # A log holds one session; recording again must not append to it
+  _record(tmp_path /"log")
+  with pytest.raises(FileExistsError):
+    tlog.TelemetryRecorder(str(tmp_path /"log"))
+  assert len(list(tlog.TelemetryLog(str(tmp_path /"log")))) == N_MSG
+
+# ---------------------------------------------------------------------
@@ -0,0 +1,97 @@
+# ---------------------------------------------------------------------
+# test_telemetry_frame.py
+# Round trip of binary telemetry frames (robotling encoder -> host decoder)
+# ---------------------------------------------------------------------
+import json
+import pytest
+import numpy as np
+import hexbug_mqtt as hx
+from modules.mqtt_ingest import Message
+from telemetry_frame import FrameEncoder, ImageDeltaEncoder
+from hexbug_global import *
+
+def test_roundtrip_small_fields():
+  enc = FrameEncoder()
+  enc.set(TLM_STATE, 1)
+  enc.set(TLM_TIMESTAMP, 12.345)
+  enc.set(TLM_BATTERY, 3.9)
+  enc.set(TLM_DISTANCE, [10, 12, 9])
+  enc.set(TLM_SEQ, 7)
+  d = hx.FrameDecoder().decode(bytes(enc.encode()))
+  assert d[KEY_STATE] == 1
+  assert abs(d[KEY_TIMESTAMP] -12.345) < 1E-3
+  assert abs(d[KEY_POWER][KEY_BATTERY] -3.9) < 1E-3
+  assert list(d[KEY_SENSOR][KEY_DISTANCE]) == [10, 12, 9]
+  assert d[KEY_SEQ] == 7
+
+def test_roundtrip_field_longer_than_255():
+  # E.g. a 32x24 camera image; the number of values per field is stored
+  # as uint16 in the frame header
+  img = [20 +(i %100) *0.1 for i in range(32*24)]
+  enc = FrameEncoder()
+  enc.set(TLM_CAM_SIZE, (32, 24))
+  enc.set(TLM_CAM_IMAGE, img)
+  dec = hx.FrameDecoder()
+  for _ in range(2):
+    # Second frame reuses the compiled layouts on both sides
+    d = dec.decode(bytes(enc.encode()))
+    cam = d[KEY_CAM_IR]
+    assert list(cam[KEY_SIZE]) == [32, 24]
+    assert len(cam[KEY_IMAGE]) == 768
+    assert np.allclose(cam[KEY_IMAGE], img, atol=0.006)
+
+def _deltaFrames(nFrames=3):
+  # Keyframe followed by deltas, each changing a few pixels
+  enc = FrameEncoder()
+  imgEnc = ImageDeltaEncoder(64, 10)
+  img = [20.] *64
+  for i in range(nFrames):
+    img[i] += 1
+    enc.clear()
+    enc.set(TLM_CAM_SIZE, (8, 8))
+    imgEnc.encode(img)
+    imgEnc.toFrame(enc)
+    yield Message("rbA/raw", bytes(enc.encode()))
+
+def test_delta_coded_image_roundtrip():
+  robot = hx.HexBug(isVerbose=False)
+  for msg in _deltaFrames():
+    cam = robot.setNewMQTTMsg(msg).data[KEY_CAM_IR]
+    assert cam[hx.KEY_IMG_VALID]
+  assert np.allclose(cam[KEY_IMAGE][:4], [21, 21, 21, 20])
+  assert robot.ImgDecoder.nDeltas == 2
+  assert robot.nMsgCorrupt == 0
+
+@pytest.mark.parametrize("didx, dval", [
+  ([70], [80]),         # Pixel index out of range (8x8 image)
+  ([-1], [80]),         # Negative index
+  ([3, 4], [80]),       # More indices than values
+  ([3], None),          # Values missing
+  ([3], [300])])        # Value out of range
+def test_malformed_delta_invalidates_image(didx, dval):
+  robot = hx.HexBug(isVerbose=False)
+  msgs = list(_deltaFrames(3))
+  robot.setNewMQTTMsg(msgs[0])
+  data = hx.decodePayload(msgs[1].payload)
+  cam = data[KEY_CAM_IR]
+  cam[hx.KEY_IMG_DIDX] = didx
+  if dval is None:
+    cam.pop(hx.KEY_IMG_DVAL, None)
+  else:
+    cam[hx.KEY_IMG_DVAL] = dval
+  bad = Message("rbA/raw", json.dumps(
+    data, default=lambda v: np.asarray(v).tolist()).encode())
+  frame = robot.setNewMQTTMsg(bad)
+  assert frame is not None
+  assert not frame.data[KEY_CAM_IR][hx.KEY_IMG_VALID]
+  assert robot.nMsgCorrupt == 1
+  assert robot.ImgDecoder.nCorrupt == 1
+  assert robot.ImgDecoder.nResync == 1
+
+  # Invalid until the next keyframe
+  frame = robot.setNewMQTTMsg(msgs[2])
+  assert not frame.data[KEY_CAM_IR][hx.KEY_IMG_VALID]
+  frame = robot.setNewMQTTMsg(msgs[0])
+  assert frame.data[KEY_CAM_IR][hx.KEY_IMG_VALID]
+
+# ---------------------------------------------------------------------
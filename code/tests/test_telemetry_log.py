@@ -0,0 +1,77 @@
+# ---------------------------------------------------------------------
+# test_telemetry_log.py
+# Recorder and reader of telemetry logs (`modules/telemetry_log.py`)
+# ---------------------------------------------------------------------
+import os
+import threading
+import modules.telemetry_log as tlog
+
+def _msgs(n):
+  # Payloads of varying length; some span several records
+  return [(100. +i *0.01, "rb{0}/raw".format(i %3),
+           bytes([i %256]) *(10 +(i *37) %1500)) for i in range(n)]
+
+def test_roundtrip_over_several_segments(tmp_path):
+  path = str(tmp_path /"log")
+  msgs = _msgs(500)
+  rec = tlog.TelemetryRecorder(path, recSize=256, nSegRecords=400,
+                               isVerbose=False).start()
+  for t, topic, payload in msgs:
+    assert rec.record(topic, payload, t)
+  rec.stop()
+  assert rec.nWritten == len(msgs) and rec.nReordered == 0
+  assert rec.nSegments > 1
+
+  log = tlog.TelemetryLog(path)
+  assert [(t, tp, bytes(p)) for t, tp, p in log] == msgs
+  assert log.tFirst == msgs[0][0] and log.tLast == msgs[-1][0]
+
+  # Time ranges (also across segment boundaries)
+  t0, t1 = msgs[123][0], msgs[321][0]
+  got = [(t, tp, bytes(p)) for t, tp, p in log.messages(t0, t1)]
+  assert got == [m for m in msgs if t0 <= m[0] <= t1]
+  log.close()
+
+def test_unsealed_segment_is_readable(tmp_path):
+  # A segment that was not closed (e.g. after a crash) is read up to the
+  # last complete record
+  path = str(tmp_path /"log")
+  os.makedirs(path)
+  seg = tlog._SegmentWriter(tlog._segmentName(path, 0), 256, 100)
+  for t, topic, payload in _msgs(20):
+    seg.append(t, topic, payload)
+  seg.flush()
+  log = tlog.TelemetryLog(path)
+  assert len(list(log)) == 20
+  log.close()
+
+def test_out_of_order_times_from_several_threads(tmp_path):
+  # Messages queued by several threads with slightly out-of-order times;
+  # a time range must not lose messages recorded after a late one
+  path = str(tmp_path /"log")
+  rec = tlog.TelemetryRecorder(path, isVerbose=False).start()
+  nThreads, n = 4, 250
+  def _run(k):
+    for i in range(n):
+      rec.record("rb{0}/raw".format(k), b"%d" %i, 100. +i *0.01 -k *0.003)
+  threads = [threading.Thread(target=_run, args=(k,)) for k in range(nThreads)]
+  for thr in threads:
+    thr.start()
+  for thr in threads:
+    thr.join()
+  rec.stop()
+  assert rec.nWritten == nThreads *n
+
+  log = tlog.TelemetryLog(path)
+  allMsgs = list(log)
+  ts = [m[0] for m in allMsgs]
+  assert ts == sorted(ts)
+  t0, t1 = 100.5, 101.5
+  assert len(list(log.messages(t0, t1))) == \
+         len([t for t in ts if t0 <= t <= t1])
+  for k in range(nThreads):
+    seqs = [int(p) for _, tp, p in allMsgs if tp == "rb{0}/raw".format(k)]
+    assert seqs == list(range(n))
+  log.close()
+
+# ---------------------------------------------------------------------
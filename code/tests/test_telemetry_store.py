@@ -0,0 +1,43 @@
+# ---------------------------------------------------------------------
+# test_telemetry_store.py
+# Columnar ring buffer (`modules/telemetry_store.py`)
+# ---------------------------------------------------------------------
+import numpy as np
+from modules.telemetry_store import TelemetryStore
+
+def _store(n=4):
+  st = TelemetryStore(n)
+  st.addField("battery_V")
+  st.addField("motor_load", 2)
+  return st
+
+def test_ring_buffer_keeps_latest_samples():
+  st = _store()
+  for i in range(6):
+    st.append(float(i), {"battery_V": 4. -i *0.1, "motor_load": (i, -i)})
+  assert len(st) == 4
+  assert st.times().tolist() == [2., 3., 4., 5.]
+  assert np.allclose(st.view("battery_V", 2), [3.6, 3.5])
+  assert st.view("motor_load")[:,1].tolist() == [-2, -3, -4, -5]
+  assert st.since(4.) == 2
+  w = st.window(["battery_V"], 3., 4.)
+  assert w["t"].tolist() == [3., 4.]
+
+def test_view_is_a_copy():
+  st = _store()
+  st.append(0., {"battery_V": 3.9})
+  v = st.view("battery_V")
+  st.append(1., {"battery_V": 3.8})
+  assert v[-1] == 3.9
+  assert st.view("battery_V")[-1] == 3.8
+
+def test_wrong_width_repeats_last_value():
+  st = _store()
+  st.append(0., {"battery_V": 3.9, "motor_load": [10, 20]})
+  st.append(1., {"battery_V": [3.8, 3.7], "motor_load": [1, 2, 3]})
+  st.append(2., {"battery_V": "n/a", "motor_load": 5})
+  assert st.nInvalid == 4
+  assert st.view("battery_V", 3).tolist() == [3.9] *3
+  assert st.view("motor_load", 3).tolist() == [[10, 20]] *3
+
+# ---------------------------------------------------------------------